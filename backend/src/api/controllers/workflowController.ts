@@ -233,7 +233,11 @@ export class WorkflowController {
       res.json({
         queue: metrics,
         health,
-        activeWorkflows: this.activeWorkflows.size
+        activeWorkflows: this.activeWorkflows.size,
+        process: {
+          ...process.memoryUsage(),
+          uptime: process.uptime()
+        }
       });
 
     } catch (error) {
@@ -29,6 +29,35 @@ export function createWorkflowRoutes(controller: WorkflowController): Router {
   const workflowLimiter = createWorkflowRateLimiter();
   const userLimiter = createUserRateLimiter();
 
+  // Allow either JWT or API key authentication
+  const apiKeyOrJwt = (req: any, res: any, next: any) => {
+    const hasApiKey = req.headers['x-api-key'];
+    const hasJwt = req.headers.authorization;
+    
+    if (hasApiKey && apiKeyMiddleware) {
+      apiKeyMiddleware(req, res, next);
+    } else if (hasJwt) {
+      auth(req, res, next);
+    } else {
+      // For development/testing, allow unauthenticated access if no auth is configured
+      if (process.env.NODE_ENV === 'development' && !apiKeys.size && jwtSecret === 'development-secret') {
+        // Set a mock user for development
+        req.user = {
+          id: 'dev-user',
+          email: 'dev@localhost',
+          role: 'developer',
+          permissions: ['workflow:run', 'workflow:read', 'workflow:cancel', 'queue:read']
+        };
+        next();
+      } else {
+        res.status(401).json({
+          error: 'Authentication required',
+          message: 'Please provide either a JWT token or API key'
+        });
+      }
+    }
+  };
+
   /**
    * Health check endpoint
    * GET /api/health
@@ -46,34 +75,7 @@ export function createWorkflowRoutes(controller: WorkflowController): Router {
   router.post('/run-soc2-workflow',
     generalLimiter,
     workflowLimiter,
-    // Allow either JWT or API key authentication
-    (req, res, next) => {
-      const hasApiKey = req.headers['x-api-key'];
-      const hasJwt = req.headers.authorization;
-      
-      if (hasApiKey && apiKeyMiddleware) {
-        apiKeyMiddleware(req, res, next);
-      } else if (hasJwt) {
-        auth(req, res, next);
-      } else {
-        // For development/testing, allow unauthenticated access if no auth is configured
-        if (process.env.NODE_ENV === 'development' && !apiKeys.size && jwtSecret === 'development-secret') {
-          // Set a mock user for development
-          req.user = {
-            id: 'dev-user',
-            email: 'dev@localhost',
-            role: 'developer',
-            permissions: ['workflow:run', 'workflow:read', 'workflow:cancel', 'queue:read']
-          };
-          next();
-        } else {
-          res.status(401).json({
-            error: 'Authentication required',
-            message: 'Please provide either a JWT token or API key'
-          });
-        }
-      }
-    },
+    apiKeyOrJwt,
     requirePermission('workflow:run'),
     controller.runWorkflow.bind(controller)
   );
@@ -123,10 +125,12 @@ export function createWorkflowRoutes(controller: WorkflowController): Router {
   /**
    * Get queue metrics
    * GET /api/queue/metrics
+   * 
+   * Accepts either JWT authentication or API key, so soak tests can scrape it
    */
   router.get('/queue/metrics',
     generalLimiter,
-    auth,
+    apiKeyOrJwt,
     requirePermission('queue:read'),
     controller.getQueueMetrics.bind(controller)
   );
@@ -398,25 +398,77 @@ export const attacks: Attack[] = [
 ];
 
 // Precomputed embeddings for attacks (to be generated by scripts/generate-embeddings.py)
-// Load precomputed embeddings
-import { readFileSync } from 'fs';
+// Load precomputed embeddings from the binary matrix (embeddings.npy + embeddings.meta.json),
+// falling back to the legacy embeddings.json
+import { existsSync, readFileSync } from 'fs';
 import { join, dirname } from 'path';
 import { fileURLToPath } from 'url';
 
 const __dirname = dirname(fileURLToPath(import.meta.url));
+const embeddingsDir = join(__dirname, '../../../..');
 
 let attackEmbeddingsData: { [attackId: string]: number[] } = {};
 
+// IEEE 754 half precision, as written by --dtype float16
+function halfToFloat(bits: number): number {
+  const sign = bits & 0x8000 ? -1 : 1;
+  const exponent = (bits >> 10) & 0x1f;
+  const fraction = bits & 0x3ff;
+  if (exponent === 0) return sign * fraction * 2 ** -24;
+  if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+  return sign * (1 + fraction / 1024) * 2 ** (exponent - 15);
+}
+
+// Row reader over a C-ordered little-endian float32/float16 .npy matrix
+function readNpyMatrix(path: string): (row: number) => number[] {
+  const buffer = readFileSync(path);
+  if (buffer.toString('latin1', 0, 6) !== '\x93NUMPY') {
+    throw new Error(`${path} is not a .npy file`);
+  }
+  const headerStart = buffer[6] === 1 ? 10 : 12;
+  const headerLength = buffer[6] === 1 ? buffer.readUInt16LE(8) : buffer.readUInt32LE(8);
+  const header = buffer.toString('latin1', headerStart, headerStart + headerLength);
+  const dtype = /'descr':\s*'([^']+)'/.exec(header)?.[1];
+  const shape = /'shape':\s*\((\d+),\s*(\d+)\)/.exec(header);
+  if (!shape || /'fortran_order':\s*True/.test(header) || (dtype !== '<f4' && dtype !== '<f2')) {
+    throw new Error(`Unsupported matrix layout in ${path}: ${header.trim()}`);
+  }
+  const columns = Number(shape[2]);
+  const width = dtype === '<f4' ? 4 : 2;
+  const dataStart = headerStart + headerLength;
+  return (row: number) => {
+    const values = new Array<number>(columns);
+    for (let column = 0; column < columns; column++) {
+      const offset = dataStart + (row * columns + column) * width;
+      values[column] = width === 4 ? buffer.readFloatLE(offset) : halfToFloat(buffer.readUInt16LE(offset));
+    }
+    return values;
+  };
+}
+
 try {
-  const embeddingsPath = join(__dirname, '../../../../embeddings.json');
-  const embeddingsContent = readFileSync(embeddingsPath, 'utf-8');
-  const embeddingsJson = JSON.parse(embeddingsContent);
+  const matrixPath = join(embeddingsDir, 'embeddings.npy');
+  const sidecarPath = join(embeddingsDir, 'embeddings.meta.json');
   
-  // Extract attack pattern embeddings
-  if (embeddingsJson.attack_patterns) {
-    for (const [attackId, data] of Object.entries(embeddingsJson.attack_patterns)) {
-      if ((data as any).embedding) {
-        attackEmbeddingsData[attackId] = (data as any).embedding;
+  if (existsSync(matrixPath) && existsSync(sidecarPath)) {
+    // Row i of the matrix belongs to records[i] in the sidecar
+    const sidecar = JSON.parse(readFileSync(sidecarPath, 'utf-8'));
+    const row = readNpyMatrix(matrixPath);
+    sidecar.records.forEach((record: { section: string; key: string }, i: number) => {
+      if (record.section === 'attack_patterns') {
+        attackEmbeddingsData[record.key] = row(i);
+      }
+    });
+  } else {
+    const embeddingsContent = readFileSync(join(embeddingsDir, 'embeddings.json'), 'utf-8');
+    const embeddingsJson = JSON.parse(embeddingsContent);
+    
+    // Extract attack pattern embeddings
+    if (embeddingsJson.attack_patterns) {
+      for (const [attackId, data] of Object.entries(embeddingsJson.attack_patterns)) {
+        if ((data as any).embedding) {
+          attackEmbeddingsData[attackId] = (data as any).embedding;
+        }
       }
     }
   }
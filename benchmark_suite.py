@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark Suite - seeded workloads and regression baselines for the workflow API
+Runs fixed load profiles, stores versioned baseline files and compares runs with a Mann-Whitney U test
+"""
+
+import glob
+import json
+import math
+import os
+import platform
+import re
+import subprocess
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from latency_histogram import LatencyHistogram
+
+BASELINE_SCHEMA = 1
+BASELINE_DIR = os.path.join('benchmarks', 'baselines')
+
+# Fixed, seeded workloads; changing one invalidates its baselines, so add a new name instead
+WORKLOADS: Dict[str, Dict[str, Any]] = {
+    'smoke': {'mode': 'open', 'peak': 20, 'ramp_up': 2, 'hold': 10, 'ramp_down': 0, 'seed': 1101},
+    'steady': {'mode': 'open', 'peak': 50, 'ramp_up': 5, 'hold': 30, 'ramp_down': 0, 'seed': 1102},
+    'users': {'mode': 'closed', 'peak': 16, 'ramp_up': 2, 'hold': 20, 'ramp_down': 0,
+              'think_time': 0.05, 'seed': 1103},
+}
+
+# Stub backend settings used with --stub, recorded in every baseline taken against it
+STUB_CONFIG = {'latency': 0.02, 'jitter': 0.005, 'failure_rate': 0.0, 'event_rate': 5.0, 'seed': 1100}
+
+
+def mann_whitney_u(baseline: Sequence[float], current: Sequence[float]) -> Tuple[float, float]:
+    """One-sided Mann-Whitney U test that `current` tends to be larger than `baseline`.
+
+    Returns (U statistic for current, p-value) using the normal approximation
+    with tie correction, which is accurate for the sample sizes benchmarks produce.
+    """
+    n1, n2 = len(baseline), len(current)
+    if not n1 or not n2:
+        return 0.0, 1.0
+
+    combined = sorted([(v, 0) for v in baseline] + [(v, 1) for v in current])
+    ranks = [0.0] * len(combined)
+    tie_term = 0.0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        size = j - i + 1
+        tie_term += size ** 3 - size
+        i = j + 1
+
+    rank_sum = sum(r for r, (_, group) in zip(ranks, combined) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)  # continuity correction
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _median(values: Sequence[float]) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def capture_run(workload: str, results: List[Dict[str, Any]], duration: float,
+                target: str, stub: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Benchmark record: config, environment, raw latency samples and summary metrics"""
+    samples = sorted(r['timings']['total'] for r in results if r['success'] and r.get('timings'))
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(value)
+    errors = sum(1 for r in results if not r['success'])
+
+    return {
+        'schema': BASELINE_SCHEMA,
+        'workload': workload,
+        'config': WORKLOADS[workload],
+        'target': target,
+        'stub': stub,
+        'created': datetime.now().isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'metrics': {
+            'requests': len(results),
+            'errors': errors,
+            'error_rate': errors / len(results) if results else 0.0,
+            'throughput': (len(results) - errors) / duration if duration else 0.0,
+            'latency': histogram.summary()
+        },
+        'samples': [round(v, 6) for v in samples],
+        'histogram': histogram.to_dict()
+    }
+
+
+def baseline_versions(directory: str, workload: str) -> List[Tuple[int, str]]:
+    """(version, path) pairs for a workload, oldest first"""
+    versions = []
+    for path in glob.glob(os.path.join(directory, workload, 'v*.json')):
+        match = re.search(r'v(\d+)\.json$', path)
+        if match:
+            versions.append((int(match.group(1)), path))
+    return sorted(versions)
+
+
+def load_baseline(directory: str, workload: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    versions = baseline_versions(directory, workload)
+    if version is not None:
+        versions = [v for v in versions if v[0] == version]
+    if not versions:
+        return None
+    with open(versions[-1][1]) as f:
+        baseline = json.load(f)
+    if baseline.get('schema') != BASELINE_SCHEMA:
+        raise ValueError(f"{versions[-1][1]} uses baseline schema {baseline.get('schema')}, "
+                         f"expected {BASELINE_SCHEMA}")
+    baseline['version'] = versions[-1][0]
+    return baseline
+
+
+def save_baseline(directory: str, run: Dict[str, Any]) -> str:
+    """Write the run as the next version for its workload; earlier versions are kept"""
+    versions = baseline_versions(directory, run['workload'])
+    version = versions[-1][0] + 1 if versions else 1
+    path = os.path.join(directory, run['workload'], f"v{version}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(dict(run, version=version), f, indent=2)
+    return path
+
+
+def compare_runs(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10,
+                 alpha: float = 0.01) -> List[Dict[str, Any]]:
+    """Checks of current against baseline; a check regresses only past `threshold`.
+
+    Latency must also be significantly slower (Mann-Whitney p < alpha), so
+    run-to-run noise below the threshold never fails a build.
+    """
+    checks = []
+    base_samples, samples = baseline['samples'], current['samples']
+    _, p_value = mann_whitney_u(base_samples, samples)
+
+    for label, q in (('median latency', None), ('p90 latency', 'p90'), ('p99 latency', 'p99')):
+        before = _median(base_samples) if q is None else baseline['metrics']['latency'][q]
+        after = _median(samples) if q is None else current['metrics']['latency'][q]
+        change = (after - before) / before if before else 0.0
+        checks.append({
+            'metric': label,
+            'baseline': before,
+            'current': after,
+            'change': change,
+            'p_value': p_value,
+            'regressed': change > threshold and p_value < alpha
+        })
+
+    before, after = baseline['metrics']['throughput'], current['metrics']['throughput']
+    change = (after - before) / before if before else 0.0
+    checks.append({
+        'metric': 'throughput',
+        'baseline': before,
+        'current': after,
+        'change': change,
+        'p_value': None,
+        'regressed': change < -threshold
+    })
+
+    before, after = baseline['metrics']['error_rate'], current['metrics']['error_rate']
+    checks.append({
+        'metric': 'error rate',
+        'baseline': before,
+        'current': after,
+        'change': after - before,
+        'p_value': None,
+        'regressed': after - before > threshold / 10
+    })
+    return checks
+
+
+def print_comparison(baseline: Dict[str, Any], checks: List[Dict[str, Any]]) -> bool:
+    """Print the comparison table; returns True if anything regressed"""
+    print(f"\n📏 Compared with baseline v{baseline['version']} "
+          f"({baseline.get('git_revision') or 'unknown revision'}, {baseline['created'][:19]})")
+    print(f"{'metric':<16} {'baseline':>10} {'current':>10} {'change':>9} {'p-value':>9}  verdict")
+    for check in checks:
+        is_latency = 'latency' in check['metric']
+        scale, unit = (1000, 'ms') if is_latency else (1, '')
+        p_value = f"{check['p_value']:.4f}" if check['p_value'] is not None else '-'
+        change = f"{check['change'] * 100:+.1f}%" if check['metric'] != 'error rate' else f"{check['change'] * 100:+.2f}pp"
+        print(f"{check['metric']:<16} {check['baseline'] * scale:>8.2f}{unit:<2} {check['current'] * scale:>8.2f}{unit:<2}"
+              f" {change:>9} {p_value:>9}  {'❌ REGRESSION' if check['regressed'] else '✅'}")
+    return any(check['regressed'] for check in checks)
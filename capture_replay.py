@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+
+"""
+Capture Replay - feeds recorded monitor sessions back through a consumer
+Loads JSONL event captures, ai-analysis summaries and ai-test-outputs workflow results,
+replays them at original timing, N× speed or flat out, and reports per-type handling latency
+"""
+
+import asyncio
+import glob
+import inspect
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from event_capture import iter_capture
+from latency_histogram import LatencyHistogram
+
+# Connection bookkeeping rather than workflow events; never replayed
+CONTROL_TYPES = {'subscribed', 'unsubscribed', 'ping', 'pong', 'connected', 'connection'}
+CAPTURE_SUFFIXES = ('.jsonl', '.jsonl.gz', '.jsonl.zst')
+
+Event = Tuple[float, Dict[str, Any]]
+
+
+def parse_speed(value: str) -> float:
+    """'max' (or 0) replays as fast as possible; otherwise a multiple of the original timing"""
+    if value.lower() in ('max', 'inf', '0'):
+        return 0.0
+    speed = float(value.rstrip('xX'))
+    if speed <= 0:
+        raise ValueError(f"Replay speed must be positive or 'max', got {value}")
+    return speed
+
+
+def epoch_seconds(value: Any) -> Optional[float]:
+    """ISO-8601 string or epoch seconds/milliseconds -> epoch seconds"""
+    if isinstance(value, (int, float)):
+        return value / 1000 if value > 1e11 else float(value)
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return (parsed if parsed.tzinfo else parsed.astimezone()).timestamp()
+
+
+def _load_lenient(path: str) -> Dict[str, Any]:
+    """Parse a JSON document, salvaging what it can from the shell-assembled ai-test-outputs files.
+
+    Those files embed raw curl output (HTML error pages, stray braces), so
+    when strict parsing fails each top-level "key": value pair is decoded on
+    its own and undecodable values are skipped.
+    """
+    with open(path, encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    try:
+        doc = json.loads(text)
+        return doc if isinstance(doc, dict) else {}
+    except ValueError:
+        pass
+
+    decoder = json.JSONDecoder()
+    doc: Dict[str, Any] = {}
+    for match in re.finditer(r'^\s{0,2}"(\w+)":\s*', text, re.MULTILINE):
+        try:
+            doc[match.group(1)], _ = decoder.raw_decode(text, match.end())
+        except ValueError:
+            continue
+    return doc
+
+
+def _relative(timed: List[Tuple[Optional[float], Dict[str, Any]]]) -> List[Event]:
+    """Turn absolute (possibly missing) times into offsets; untimed events follow their predecessor"""
+    known = [t for t, _ in timed if t is not None]
+    origin = min(known) if known else 0.0
+    events: List[Event] = []
+    previous = 0.0
+    for t, msg in timed:
+        previous = max(previous, t - origin) if t is not None else previous
+        events.append((previous, msg))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def _from_analysis(doc: Dict[str, Any], base_dir: str) -> List[Event]:
+    """Events from an ai-analysis-*.json summary, preferring its capture files when present"""
+    capture = doc.get('capture') or {}
+    files = [f if os.path.exists(f) else os.path.join(base_dir, f) for f in capture.get('files', [])]
+    if files and all(os.path.exists(f) for f in files):
+        return load_capture(files)
+
+    timed: List[Tuple[Optional[float], Dict[str, Any]]] = [
+        (epoch_seconds(t.get('timestamp')), {'type': 'ai:thinking', 'phase': t.get('phase', 'general'),
+                                      'content': t.get('thought', '')})
+        for t in doc.get('aiThoughts') or []
+    ]
+    if doc.get('testPlan'):
+        timed.append((None, {'type': 'test:plan', 'plan': doc['testPlan']}))
+    for finding in doc.get('findings') or []:
+        timed.append((epoch_seconds(finding.get('timestamp')), dict(finding, type='finding')))
+    events = _relative(timed)
+    end = max([events[-1][0] if events else 0.0, float(doc.get('duration') or 0)])
+    events.append((end, {'type': 'workflow:complete', 'status': 'completed'}))
+    return events
+
+
+def _find_result(doc: Any, depth: int = 0) -> Optional[Dict[str, Any]]:
+    """The workflow result (the object holding `phases`) wherever the capture nested it"""
+    if not isinstance(doc, dict) or depth > 3:
+        return None
+    if isinstance(doc.get('phases'), list):
+        return doc
+    for key in ('result', 'initialResponse', 'statusResponse'):
+        found = _find_result(doc.get(key), depth + 1)
+        if found:
+            return found
+    return None
+
+
+def _from_workflow_output(doc: Dict[str, Any]) -> List[Event]:
+    """Synthesise the event stream a monitor would have seen from a finished workflow result"""
+    timed: List[Tuple[Optional[float], Dict[str, Any]]] = []
+    thoughts = doc.get('aiThoughts')
+    for thought in thoughts if isinstance(thoughts, list) else []:
+        if isinstance(thought, dict):
+            timed.append((epoch_seconds(thought.get('timestamp')), {
+                'type': 'ai:thinking', 'phase': thought.get('phase', 'general'),
+                'content': thought.get('thought') or thought.get('content', '')
+            }))
+    if isinstance(doc.get('aiAnalysis'), dict):
+        timed.append((None, dict(doc['aiAnalysis'], type='ai:classification')))
+    if isinstance(doc.get('testPlan'), dict):
+        timed.append((None, {'type': 'test:plan', 'plan': doc['testPlan']}))
+
+    result = _find_result(doc)
+    if result:
+        for phase in result['phases']:
+            for run in phase.get('results') or []:
+                timed.append((epoch_seconds(run.get('startTime')), {
+                    'type': 'test:start', 'test': run.get('tool', 'Unknown'), 'phase': phase.get('phase')
+                }))
+                for finding in run.get('findings') or []:
+                    timed.append((epoch_seconds(run.get('endTime')), dict(
+                        finding, type='finding', findingType=finding.get('type'), category=run.get('tool'),
+                        description=finding.get('description') or finding.get('title', '')
+                    )))
+        timed.append((epoch_seconds(result.get('endTime')), {
+            'type': 'workflow:complete', 'status': result.get('status', 'completed')
+        }))
+    return _relative(timed)
+
+
+def load_capture(paths: List[str]) -> List[Event]:
+    """(offset seconds, message) pairs from JSONL capture files, in capture order"""
+    records = [r for r in iter_capture(paths) if isinstance(r.get('message'), dict)]
+    if not records:
+        return []
+    origin = records[0]['receivedAt']
+    return [(r['receivedAt'] - origin, r['message']) for r in records
+            if r['message'].get('type') not in CONTROL_TYPES]
+
+
+def load_session(path: str) -> List[Event]:
+    """Load any supported capture, detecting its format.
+
+    A JSONL capture path may name one rotated file or its common prefix
+    (`ai-capture-<id>`), in which case every rotated file is read in order.
+    """
+    if path.endswith(CAPTURE_SUFFIXES):
+        return load_capture([path])
+    rotated = sorted(p for p in glob.glob(f"{glob.escape(path)}-*") if p.endswith(CAPTURE_SUFFIXES))
+    if rotated:
+        return load_capture(rotated)
+
+    doc = _load_lenient(path)
+    if 'aiThoughts' in doc and ('counts' in doc or 'capture' in doc or isinstance(doc.get('findings'), list)):
+        return _from_analysis(doc, os.path.dirname(path))
+    return [(offset, msg) for offset, msg in _from_workflow_output(doc) if msg.get('type') not in CONTROL_TYPES]
+
+
+class ReplayReport:
+    """Throughput, per-type handling latency and schedule lag for one replay"""
+
+    def __init__(self, source: str, speed: float):
+        self.source = source
+        self.speed = speed
+        self.handling: Dict[str, LatencyHistogram] = {}
+        self.lag = LatencyHistogram()
+        self.events = 0
+        self.recorded_span = 0.0
+        self.elapsed = 0.0
+
+    def record(self, msg_type: str, seconds: float) -> None:
+        self.handling.setdefault(msg_type, LatencyHistogram()).record(seconds)
+        self.events += 1
+
+    @property
+    def throughput(self) -> float:
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'source': self.source,
+            'speed': self.speed or 'max',
+            'events': self.events,
+            'recordedSpan': self.recorded_span,
+            'elapsed': self.elapsed,
+            'throughput': self.throughput,
+            'handling': {t: h.summary() for t, h in sorted(self.handling.items())},
+            'lag': self.lag.summary() if self.speed else None
+        }
+
+
+async def replay(events: List[Event], handler: Callable[[Dict[str, Any]], Union[Any, Awaitable[Any]]],
+                 speed: float = 1.0, source: str = '', finish: Optional[Callable[[], Awaitable[None]]] = None
+                 ) -> ReplayReport:
+    """Deliver events to `handler` on the recorded schedule divided by `speed` (0 = no waiting).
+
+    The handler may be sync or async; returning False stops the replay, as
+    handle_message() does on workflow:complete. Every event yields to the
+    loop once, as a socket read would, so consumers' background tasks keep
+    running even at max speed. `finish` is awaited before the clock stops,
+    e.g. to drain a render queue.
+    """
+    report = ReplayReport(source, speed)
+    report.recorded_span = events[-1][0] if events else 0.0
+    started = time.perf_counter()
+    for offset, msg in events:
+        if speed:
+            due = started + offset / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            report.lag.record(max(0.0, time.perf_counter() - due))
+        else:
+            await asyncio.sleep(0)
+
+        handled = time.perf_counter()
+        result = handler(msg)
+        if inspect.isawaitable(result):
+            result = await result
+        report.record(msg.get('type', 'unknown'), time.perf_counter() - handled)
+        if result is False:
+            break
+    if finish:
+        await finish()
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def print_report(report: ReplayReport) -> None:
+    speed = f"{report.speed:g}x" if report.speed else 'max speed'
+    print(f"\n⏯️  Replayed {report.events} events from {report.source} at {speed}")
+    print(f"   recorded span {report.recorded_span:.2f}s, replay took {report.elapsed:.3f}s "
+          f"→ {report.throughput:,.0f} events/s")
+    print(f"   {'event type':<22} {'count':>7} {'mean':>9} {'p50':>9} {'p99':>9} {'max':>9}   (µs)")
+    for msg_type, histogram in sorted(report.handling.items(), key=lambda item: -item[1].sum_us):
+        s = histogram.summary()
+        print(f"   {msg_type:<22} {s['count']:>7} {s['mean'] * 1e6:>9.1f} {s['p50'] * 1e6:>9.0f} "
+              f"{s['p99'] * 1e6:>9.0f} {s['max'] * 1e6:>9.0f}")
+    if report.speed and report.lag.total_count:
+        s = report.lag.summary()
+        print(f"   schedule lag p50 {s['p50'] * 1000:.2f}ms, p99 {s['p99'] * 1000:.2f}ms, max {s['max'] * 1000:.2f}ms")
@@ -68,6 +68,18 @@ CREATE TABLE IF NOT EXISTS soc2.embedding_cache (
   expires_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP + INTERVAL '30 days'
 );
 
+-- Trust Service Criteria and Common Criteria descriptions with embeddings
+CREATE TABLE IF NOT EXISTS soc2.control_embeddings (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  control_type VARCHAR(16) NOT NULL CHECK (control_type IN ('tsc', 'cc')),
+  control_id VARCHAR(255) NOT NULL,
+  description TEXT NOT NULL,
+  embedding vector(768),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (control_type, control_id)
+);
+
 -- User intents for classification history
 CREATE TABLE IF NOT EXISTS soc2.user_intents (
   id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -102,6 +114,10 @@ CREATE INDEX IF NOT EXISTS idx_user_intents_embedding ON soc2.user_intents
   USING hnsw (embedding vector_cosine_ops)
   WITH (m = 16, ef_construction = 64);
 
+CREATE INDEX IF NOT EXISTS idx_control_embeddings_embedding ON soc2.control_embeddings 
+  USING hnsw (embedding vector_cosine_ops)
+  WITH (m = 16, ef_construction = 64);
+
 -- Create update trigger for updated_at
 CREATE OR REPLACE FUNCTION soc2.update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -114,4 +130,9 @@ $$ language 'plpgsql';
 CREATE TRIGGER update_findings_updated_at 
   BEFORE UPDATE ON soc2.findings 
   FOR EACH ROW 
-  EXECUTE FUNCTION soc2.update_updated_at_column(); 
\ No newline at end of file
+  EXECUTE FUNCTION soc2.update_updated_at_column(); 
+
+CREATE TRIGGER update_control_embeddings_updated_at 
+  BEFORE UPDATE ON soc2.control_embeddings 
+  FOR EACH ROW 
+  EXECUTE FUNCTION soc2.update_updated_at_column();
\ No newline at end of file
@@ -0,0 +1,27 @@
+-- Migration: 003_control_embeddings.sql
+-- Description: Store TSC and CC description embeddings alongside attack patterns
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS soc2.control_embeddings (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  control_type VARCHAR(16) NOT NULL CHECK (control_type IN ('tsc', 'cc')),
+  control_id VARCHAR(255) NOT NULL,
+  description TEXT NOT NULL,
+  embedding vector(768),
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (control_type, control_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_control_embeddings_embedding ON soc2.control_embeddings 
+  USING hnsw (embedding vector_cosine_ops)
+  WITH (m = 16, ef_construction = 64);
+
+DROP TRIGGER IF EXISTS update_control_embeddings_updated_at ON soc2.control_embeddings;
+CREATE TRIGGER update_control_embeddings_updated_at 
+  BEFORE UPDATE ON soc2.control_embeddings 
+  FOR EACH ROW 
+  EXECUTE FUNCTION soc2.update_updated_at_column();
+
+COMMIT;
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+"""
+Distributed Load - coordinator and worker processes for test-user-input-runner.py
+Splits a load profile across local worker processes and optional remote workers over TCP, then merges
+their latency histograms, counters and per-request results without loss
+"""
+
+import hmac
+import ipaddress
+import json
+import os
+import secrets
+import socket
+import subprocess
+import time
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from latency_histogram import LatencyRecorder
+
+# Jobs start this long after a worker receives them, so every worker begins together
+START_DELAY = 2.0
+# Workers read the shared token from here; local workers get it this way instead of on the command line
+TOKEN_ENV = 'LOAD_WORKER_TOKEN'
+# Per-request fields returned by workers; the server's response body stays behind
+RESULT_FIELDS = ('success', 'workflowId', 'scenario', 'testType', 'status_code', 'submitted_at', 'latency',
+                 'timings', 'error', 'offset', 'finished', 'schedule_lag', 'response_time')
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _send(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    stream.write(json.dumps(message, separators=(',', ':'), default=str).encode() + b'\n')
+    stream.flush()
+
+
+def _receive(stream: BinaryIO) -> Dict[str, Any]:
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Peer closed the connection")
+    return json.loads(line)
+
+
+def split_level(peak: float, mode: str, count: int) -> List[float]:
+    """Each worker's share of the peak: arrival rate split evenly, whole virtual users spread as evenly as possible"""
+    if mode == 'open':
+        return [peak / count] * count
+    users = int(peak)
+    return [users // count + (1 if i < users % count else 0) for i in range(count)]
+
+
+def slim_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: result[key] for key in RESULT_FIELDS if key in result}
+
+
+class Coordinator:
+    """Hand one share of a load test to each connected worker and merge what comes back.
+
+    Workers connect over TCP and exchange newline-delimited JSON: the worker
+    says hello, receives a job with its share of the profile and a distinct
+    seed, and answers with its results and latency histograms. Local workers
+    are spawned as subprocesses; workers on other hosts run the same worker
+    command pointed at this coordinator's address.
+
+    Jobs carry the test inputs and API key, so a worker's hello must include
+    the shared `token`; connections without it are dropped. Without a token,
+    only loopback binds are allowed, with a random token handed to local
+    workers. The protocol is not encrypted: across untrusted networks, run
+    remote workers through an SSH tunnel.
+    """
+
+    def __init__(self, listen: str = '127.0.0.1:0', connect_timeout: float = 60.0, token: Optional[str] = None):
+        host, port = parse_address(listen)
+        if not token and not is_loopback(host):
+            raise ValueError(f"Refusing to accept workers on {listen} without a shared token")
+        self.token = token or secrets.token_urlsafe(16)
+        self.rejected = 0
+        self.server = socket.create_server((host, port))
+        self.host, self.port = self.server.getsockname()[:2]
+        self.connect_timeout = connect_timeout
+        self.processes: List[subprocess.Popen] = []
+        self.workers: List[Tuple[socket.socket, BinaryIO, Dict[str, Any]]] = []
+
+    @property
+    def address(self) -> str:
+        # Local workers reach a wildcard listener over loopback
+        host = '127.0.0.1' if self.host in ('0.0.0.0', '::') else self.host
+        return f"{host}:{self.port}"
+
+    def spawn_local(self, count: int, command: List[str]) -> None:
+        """Start `count` worker processes running `command --worker <address>`"""
+        for _ in range(count):
+            self.processes.append(subprocess.Popen(command + ['--worker', self.address],
+                                                   env=dict(os.environ, **{TOKEN_ENV: self.token})))
+
+    def accept(self, count: int) -> None:
+        """Wait until `count` workers have connected and said hello with the right token"""
+        self.server.settimeout(self.connect_timeout)
+        while len(self.workers) < count:
+            try:
+                connection, peer = self.server.accept()
+            except socket.timeout:
+                raise TimeoutError(f"Only {len(self.workers)} of {count} workers connected "
+                                   f"within {self.connect_timeout:g}s") from None
+            # A peer that never says hello must not hold up the others for longer than the connect timeout
+            connection.settimeout(self.connect_timeout)
+            stream = connection.makefile('rwb')
+            try:
+                hello = _receive(stream)
+            except (OSError, ValueError):
+                hello = {}
+            if not hmac.compare_digest(str(hello.get('token', '')).encode(), self.token.encode()):
+                self.rejected += 1
+                print(f"⚠️  Rejected worker connection from {peer[0]}:{peer[1]} (missing or wrong token)")
+                stream.close()
+                connection.close()
+                continue
+            connection.settimeout(None)
+            hello.pop('token')
+            self.workers.append((connection, stream, hello))
+
+    def run(self, job: Dict[str, Any], peak: float, mode: str, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Send every worker its share of `job` and return their replies in worker order"""
+        shares = split_level(peak, mode, len(self.workers))
+        for index, ((_, stream, _), share) in enumerate(zip(self.workers, shares)):
+            _send(stream, dict(job, type='job', index=index, mode=mode, peak=share,
+                               seed=None if seed is None else seed + index, start_in=START_DELAY))
+        replies = []
+        for _, stream, hello in self.workers:
+            reply = _receive(stream)
+            if reply.get('type') == 'error':
+                raise RuntimeError(f"Worker {hello.get('host')}:{hello.get('pid')} failed: {reply.get('error')}")
+            replies.append(dict(reply, host=hello.get('host'), pid=hello.get('pid')))
+        return replies
+
+    def close(self) -> None:
+        for connection, stream, _ in self.workers:
+            stream.close()
+            connection.close()
+        self.server.close()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def merge_replies(replies: List[Dict[str, Any]], recorder: LatencyRecorder) -> Tuple[List[Dict[str, Any]], int]:
+    """Fold worker replies into `recorder`; returns (all results sorted by offset, requests offered)"""
+    results: List[Dict[str, Any]] = []
+    offered = 0
+    for reply in replies:
+        recorder.merge(LatencyRecorder.from_json(reply['latency']))
+        results += reply['results']
+        offered += reply['offered']
+    return sorted(results, key=lambda r: r['offset']), offered
+
+
+def serve_worker(address: str, run_job: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 token: Optional[str] = None) -> int:
+    """Connect to a coordinator, run one job and send back its result; returns an exit code.
+
+    `token` (default: $LOAD_WORKER_TOKEN) must match the coordinator's.
+    `run_job` receives the job with `start_at`, the time.perf_counter() value at
+    which load should begin, and returns offered, results and latency.
+    """
+    token = token or os.getenv(TOKEN_ENV)
+    if not token:
+        print(f"❌ No worker token: pass --worker-token or set {TOKEN_ENV}")
+        return 2
+    connection = socket.create_connection(parse_address(address), timeout=30)
+    connection.settimeout(None)
+    stream = connection.makefile('rwb')
+    try:
+        _send(stream, {'type': 'hello', 'host': socket.gethostname(), 'pid': os.getpid(), 'cpus': os.cpu_count(),
+                       'token': token})
+        try:
+            job = _receive(stream)
+        except ConnectionError:
+            print(f"❌ Coordinator at {address} closed the connection; check the worker token")
+            return 1
+        job['start_at'] = time.perf_counter() + job['start_in']
+        try:
+            reply = run_job(job)
+        except Exception as e:
+            _send(stream, {'type': 'error', 'error': repr(e)})
+            return 1
+        _send(stream, dict(reply, type='result', index=job['index']))
+        return 0
+    finally:
+        stream.close()
+        connection.close()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+"""
+Event Capture - streams received WebSocket messages to rotating JSONL files
+Optional gzip/zstd compression, bounded in-memory history and incrementally maintained summary counters
+"""
+
+import gzip
+import io
+import json
+import os
+import time
+from collections import Counter, deque
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Deque, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def _open_writer(path: str, compression: str) -> IO[bytes]:
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=6)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'))
+    return open(path, 'wb')
+
+
+def _flush(stream: IO[bytes], compression: str) -> None:
+    # gzip and zstd flush a complete block, so everything written so far can be read back after a crash
+    if compression == 'zstd':
+        stream.flush(zstandard.FLUSH_BLOCK)
+    else:
+        stream.flush()
+
+
+def open_capture(path: str) -> IO[str]:
+    """Open a capture file for reading as text, choosing the codec from its suffix"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("zstandard is not installed. Install it with: pip install zstandard")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')), encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def iter_capture(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield {receivedAt, message} records from capture files in order.
+
+    A file cut short by a crash ends at its last complete line instead of
+    raising, so captures from killed monitors stay usable.
+    """
+    for path in paths:
+        with open_capture(path) as f:
+            try:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    yield json.loads(line)
+            except (EOFError, ValueError):
+                continue
+
+
+class EventCapture:
+    """Append every message to `<prefix>-NNNN.jsonl[.gz|.zst]`, rotating at `max_bytes`.
+
+    Each line is {"receivedAt": epoch seconds, "message": ...}. `max_bytes`
+    counts uncompressed bytes so rotation does not depend on the codec. The
+    stream is flushed at most every `flush_interval` seconds and on rotation
+    or close. Writes only flush when the interval has passed, so the owner
+    must also call flush_if_due() on a timer; otherwise the tail of a burst
+    stays buffered for as long as the stream is quiet. With both in place, a
+    killed process loses at most `flush_interval` seconds of events.
+    """
+
+    def __init__(self, prefix: str, compression: str = 'gzip', max_bytes: int = 64 * 1024 * 1024,
+                 flush_interval: float = 1.0):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression}; expected one of {COMPRESSIONS}")
+        if compression == 'zstd' and zstandard is None:
+            raise RuntimeError("zstandard is not installed. Install it with: pip install zstandard")
+        self.prefix = prefix
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.files: List[str] = []
+        self.events = 0
+        self.bytes_written = 0
+        self._stream: Optional[IO[bytes]] = None
+        self._file_bytes = 0
+        self._last_flush = 0.0
+        self._dirty = False
+
+    def _rotate(self) -> None:
+        self._close_stream()
+        path = f"{self.prefix}-{len(self.files) + 1:04d}.jsonl{SUFFIXES[self.compression]}"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._stream = _open_writer(path, self.compression)
+        self._file_bytes = 0
+        self.files.append(path)
+
+    def write(self, msg: Mapping, received_at: Optional[float] = None, raw: Optional[str] = None) -> None:
+        """Append one message; `raw`, the frame it was decoded from, is copied verbatim instead of re-encoded"""
+        received_at = time.time() if received_at is None else received_at
+        if raw is not None and '\n' not in raw:
+            line = f'{{"receivedAt":{received_at!r},"message":{raw.strip()}}}\n'.encode()
+        else:
+            message = msg if isinstance(msg, dict) else dict(msg)
+            line = (json.dumps({'receivedAt': received_at, 'message': message}, separators=(',', ':')) + '\n').encode()
+        if self._stream is None or (self._file_bytes and self._file_bytes + len(line) > self.max_bytes):
+            self._rotate()
+        self._stream.write(line)
+        self._file_bytes += len(line)
+        self.bytes_written += len(line)
+        self.events += 1
+        self._dirty = True
+        self.flush_if_due(received_at)
+
+    def flush_if_due(self, now: Optional[float] = None) -> bool:
+        """Flush buffered events if `flush_interval` has passed since the last flush; True if it flushed"""
+        now = time.time() if now is None else now
+        if not self._dirty or self._stream is None or now - self._last_flush < self.flush_interval:
+            return False
+        _flush(self._stream, self.compression)
+        self._last_flush = now
+        self._dirty = False
+        return True
+
+    def _close_stream(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+            self._dirty = False
+
+    def close(self) -> None:
+        self._close_stream()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'files': self.files,
+            'compression': self.compression,
+            'events': self.events,
+            'bytes': self.bytes_written
+        }
+
+
+class EventSummary:
+    """Running counters over a message stream plus the last `recent` thoughts and findings.
+
+    Memory stays constant however long the workflow runs; the full history
+    lives in the EventCapture files. Recent thoughts are kept as the messages
+    themselves and only turned into entries by recent_thought_entries(), so
+    lazily decoded content is never decoded just to be counted.
+    """
+
+    def __init__(self, recent: int = 200):
+        self.events = 0
+        self.by_type: Counter = Counter()
+        self.thoughts = 0
+        self.thoughts_by_phase: Counter = Counter()
+        self.findings = 0
+        self.findings_by_severity: Counter = Counter()
+        self.test_plan: Optional[Dict[str, Any]] = None
+        self.recent_thoughts: Deque[Tuple[float, Mapping]] = deque(maxlen=recent)
+        self.recent_findings: Deque[Mapping] = deque(maxlen=recent)
+        self.first_event_at: Optional[float] = None
+        self.last_event_at: Optional[float] = None
+
+    def add(self, msg: Mapping, received_at: Optional[float] = None) -> None:
+        received_at = time.time() if received_at is None else received_at
+        self.events += 1
+        self.first_event_at = self.first_event_at or received_at
+        self.last_event_at = received_at
+
+        msg_type = msg.get('type', 'unknown')
+        self.by_type[msg_type] += 1
+        if msg_type == 'ai:thinking':
+            phase = msg.get('phase', 'general')
+            self.thoughts += 1
+            self.thoughts_by_phase[phase] += 1
+            self.recent_thoughts.append((received_at, msg))
+        elif msg_type == 'test:plan':
+            self.test_plan = msg.get('plan', {})
+        elif msg_type == 'finding':
+            self.findings += 1
+            self.findings_by_severity[msg.get('severity', 'info')] += 1
+            self.recent_findings.append(msg)
+
+    def recent_thought_entries(self) -> List[Dict[str, Any]]:
+        return [{
+            "timestamp": datetime.fromtimestamp(received_at).isoformat(),
+            "phase": msg.get('phase', 'general'),
+            "thought": msg.get('content', '')
+        } for received_at, msg in self.recent_thoughts]
+
+    def recent_finding_entries(self) -> List[Dict[str, Any]]:
+        return [msg if isinstance(msg, dict) else dict(msg) for msg in self.recent_findings]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'events': self.events,
+            'byType': dict(self.by_type),
+            'thoughts': self.thoughts,
+            'thoughtsByPhase': dict(self.thoughts_by_phase),
+            'findings': self.findings,
+            'findingsBySeverity': dict(self.findings_by_severity),
+            'firstEventAt': self.first_event_at,
+            'lastEventAt': self.last_event_at
+        }
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+
+"""
+Event Model - typed, low-overhead decoding of workflow WebSocket messages
+Slotted event classes per message type, a type-keyed dispatch table, an optional orjson backend,
+lazy decoding of large string payloads and a decoding micro-benchmark
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+import tracemalloc
+from collections.abc import Mapping
+from json.decoder import scanstring
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DECODERS = ('auto', 'json', 'orjson')
+# Frames at least this long are decoded member by member so long strings can stay undecoded;
+# below it one C-level decode is cheaper than the scan, even counting the copied strings
+LAZY_BYTES = 16384
+# Top-level string values longer than this are kept as spans into the frame until first read
+LAZY_CHARS = 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_OPEN = re.compile(r'[ \t\n\r]*\{[ \t\n\r]*')
+_MEMBER = re.compile(r'"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*')
+_SEPARATOR = re.compile(r'[ \t\n\r]*([,}])[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+_MISSING = object()
+
+
+class Field:
+    """Typed read-only attribute backed by one key of the message, with a default when absent"""
+
+    __slots__ = ('key', 'default')
+
+    def __init__(self, key: str, default: Any = None):
+        self.key = key
+        self.default = default
+
+    def __get__(self, event: Optional["Event"], owner: type) -> Any:
+        if event is None:
+            return self
+        return event.get(self.key, self.default)
+
+
+class Event(Mapping):
+    """One decoded message; the base class also stands in for unknown types.
+
+    Subclasses add typed attributes with Field and no per-instance state, so
+    every event is one slotted object plus the dict of its top-level members.
+    A member the decoder left lazy is held as a (start, end) span into `raw`
+    and decoded on first read. `raw` also lets a capture or relay forward the
+    frame verbatim; consumers that keep events call release() once it has
+    been written. Events are read-only Mappings, so code written against plain
+    message dicts (`.get()`, `dict(event)`, equality) keeps working.
+    """
+
+    __slots__ = ('_data', 'raw')
+
+    type = Field('type', 'unknown')
+    workflow_id = Field('workflowId')
+    seq = Field('seq')
+    timestamp = Field('timestamp')
+    repeated = Field('_coalesced', 1)
+
+    def __init__(self, data: Dict[str, Any], raw: Optional[str] = None):
+        self._data = data
+        self.raw = raw
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._data[key]
+        # json never produces tuples, so a tuple can only be a lazy span
+        if value.__class__ is tuple:
+            value = self._data[key] = scanstring(self.raw, value[0] + 1)[0]
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        return self[key] if value.__class__ is tuple else value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.type!r}, {len(self._data)} fields, {self.lazy} lazy)"
+
+    @property
+    def lazy(self) -> int:
+        """Members still undecoded"""
+        return sum(1 for value in self._data.values() if value.__class__ is tuple)
+
+    def release(self) -> None:
+        """Drop the source frame unless a lazy member still points into it"""
+        if self.raw is not None and not self.lazy:
+            self.raw = None
+
+    def replace(self, **fields: Any) -> "Event":
+        """Copy with some members changed; lazy members stay lazy"""
+        return type(self)(dict(self._data, **fields), self.raw)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+# Dispatch table from message type to event class, filled by @event_type
+EVENT_TYPES: Dict[str, Type[Event]] = {}
+
+
+def event_type(name: str) -> Callable[[Type[Event]], Type[Event]]:
+    def register(cls: Type[Event]) -> Type[Event]:
+        EVENT_TYPES[name] = cls
+        return cls
+    return register
+
+
+@event_type('ai:thinking')
+class Thinking(Event):
+    __slots__ = ()
+    phase = Field('phase', 'general')
+    content = Field('content', '')
+
+
+@event_type('ai:classification')
+class Classification(Event):
+    __slots__ = ()
+    intent = Field('intent', 'Unknown')
+    confidence = Field('confidence', 0)
+
+
+@event_type('ai:strategy')
+class Strategy(Event):
+    __slots__ = ()
+    strategy = Field('strategy')
+    reasoning = Field('reasoning', 'No reasoning provided')
+
+
+class PlanStep:
+    """One step of a test plan, accepting both the `steps` and `recommendations` shapes"""
+
+    __slots__ = ('tool', 'target', 'purpose', 'priority')
+
+    def __init__(self, step: Dict[str, Any], target: str = 'N/A'):
+        self.tool = step.get('tool', step.get('name', 'Unknown'))
+        self.target = step.get('target', target)
+        self.purpose = step.get('purpose', step.get('description', 'N/A'))
+        self.priority = step.get('priority', 'Not specified')
+
+
+@event_type('test:plan')
+class TestPlan(Event):
+    __slots__ = ('_steps',)
+    plan = Field('plan')
+
+    @property
+    def steps(self) -> Tuple[PlanStep, ...]:
+        """Typed steps, built on first access; most consumers only store the plan"""
+        try:
+            return self._steps
+        except AttributeError:
+            plan = self.plan or {}
+            target = plan.get('target', 'N/A')
+            self._steps = tuple(PlanStep(step, target)
+                                for step in plan.get('steps') or plan.get('recommendations') or ())
+            return self._steps
+
+
+@event_type('test:start')
+class TestStart(Event):
+    __slots__ = ()
+    test = Field('test', 'Unknown')
+    phase = Field('phase')
+
+
+@event_type('finding')
+class Finding(Event):
+    __slots__ = ()
+    severity = Field('severity', 'info')
+    finding_type = Field('findingType')
+    category = Field('category')
+    description = Field('description', 'N/A')
+    impact = Field('impact', 'N/A')
+
+
+@event_type('workflow:complete')
+class WorkflowComplete(Event):
+    __slots__ = ()
+    status = Field('status', 'completed')
+    findings = Field('findings')
+
+
+def make_event(data: Union[Dict[str, Any], Event], raw: Optional[str] = None) -> Event:
+    """Wrap a decoded message (or pass an Event through) as the class registered for its type"""
+    if isinstance(data, Event):
+        return data
+    msg_type = data.get('type')
+    if msg_type.__class__ is tuple:
+        # A type longer than lazy_chars was left as a span; dispatch needs it now
+        msg_type = data['type'] = scanstring(raw, msg_type[0] + 1)[0]
+    return EVENT_TYPES.get(msg_type, Event)(data, raw) if msg_type.__class__ is str else Event(data, raw)
+
+
+def _string_end(raw: str, start: int) -> int:
+    """Index just past the string literal opening at `start`, found with str.find rather than decoding"""
+    end = start
+    while True:
+        end = raw.find('"', end + 1)
+        if end < 0:
+            raise ValueError(f"Unterminated string starting at {start}")
+        escapes = 0
+        while raw[end - 1 - escapes] == '\\':
+            escapes += 1
+        if not escapes % 2:
+            return end + 1
+
+
+def scan_object(raw: str, lazy_chars: int = LAZY_CHARS) -> Dict[str, Any]:
+    """Decode a JSON object member by member, leaving string values longer than `lazy_chars` as spans.
+
+    Nested objects and arrays are decoded by the C scanner as usual: skipping
+    them in Python measured several times slower than decoding them.
+    """
+    match = _OPEN.match(raw)
+    if not match:
+        raise ValueError("Expected a JSON object")
+    data: Dict[str, Any] = {}
+    pos = match.end()
+    if raw.startswith('}', pos):
+        pos += 1
+    else:
+        member = _MEMBER.match
+        while True:
+            match = member(raw, pos)
+            if not match:
+                raise ValueError(f"Expected a property name at {pos}")
+            key, pos = match.group(1), match.end()
+            if '\\' in key:
+                key = scanstring(raw, match.start(1))[0]
+            if raw.startswith('"', pos):
+                end = _string_end(raw, pos)
+                if end - pos > lazy_chars:
+                    data[key] = (pos, end)
+                else:
+                    value = raw[pos + 1:end - 1]
+                    data[key] = scanstring(raw, pos + 1)[0] if '\\' in value else value
+                pos = end
+            else:
+                data[key], pos = _DECODER.raw_decode(raw, pos)
+            match = _SEPARATOR.match(raw, pos)
+            if not match:
+                raise ValueError(f"Expected ',' or '}}' at {pos}")
+            pos = match.end()
+            if match.group(1) == '}':
+                break
+    if _WHITESPACE.match(raw, pos).end() != len(raw):
+        raise ValueError(f"Extra data at {pos}")
+    return data
+
+
+class EventDecoder:
+    """Callable turning WebSocket frames into typed events.
+
+    Frames shorter than `lazy_bytes` are decoded in one call to the backend
+    (orjson when installed and `backend` is 'auto'); longer ones go through
+    scan_object() so long strings, such as thought content and strategy
+    reasoning, are only decoded if something reads them. `lazy_bytes=0`
+    turns lazy decoding off. Raises ValueError for frames that are not a
+    JSON object, as json.loads would for bad JSON.
+    """
+
+    def __init__(self, backend: str = 'auto', lazy_bytes: int = LAZY_BYTES, lazy_chars: int = LAZY_CHARS):
+        if backend not in DECODERS:
+            raise ValueError(f"Unknown decoder {backend}; expected one of {DECODERS}")
+        if backend == 'orjson' and orjson is None:
+            raise RuntimeError("orjson is not installed. Install it with: pip install orjson")
+        self.backend = 'orjson' if backend == 'auto' and orjson is not None else ('json' if backend == 'auto' else backend)
+        self.loads = orjson.loads if self.backend == 'orjson' else json.loads
+        self.lazy_bytes = lazy_bytes
+        self.lazy_chars = lazy_chars
+        self.decoded = 0
+        self.scanned = 0
+
+    def __call__(self, raw: Union[str, bytes]) -> Event:
+        if not isinstance(raw, str):
+            raw = bytes(raw).decode('utf-8')
+        if self.lazy_bytes and len(raw) >= self.lazy_bytes:
+            data = scan_object(raw, self.lazy_chars)
+            self.scanned += 1
+        else:
+            data = self.loads(raw)
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+        self.decoded += 1
+        return make_event(data, raw)
+
+
+class Dispatcher:
+    """Route events to handlers with one dict lookup on `type` instead of an if/elif chain"""
+
+    def __init__(self, handlers: Optional[Dict[str, Callable[[Any], Any]]] = None,
+                 default: Optional[Callable[[Any], Any]] = None):
+        self.handlers = dict(handlers or {})
+        self.default = default
+
+    def on(self, msg_type: str, handler: Callable[[Any], Any]) -> None:
+        self.handlers[msg_type] = handler
+
+    def __call__(self, event: Mapping) -> Any:
+        handler = self.handlers.get(event.get('type'), self.default)
+        return handler(event) if handler is not None else None
+
+
+def sample_messages(count: int, payload_size: int = 0, seed: int = 1) -> List[str]:
+    """Serialised messages in the proportions one stub workflow produces, padded like --payload-size"""
+    rng = random.Random(seed)
+    padding = 'x' * payload_size
+    steps = [{'tool': tool, 'target': 'https://example.com', 'purpose': f"Run {tool} against the target",
+              'priority': rng.choice(['high', 'medium', 'low'])} for tool in ('nmap', 'httpx', 'ffuf', 'nuclei')]
+    script = [{'type': 'ai:thinking', 'phase': phase, 'content': f"Considering {phase}. {padding}"}
+              for phase in ('reconnaissance', 'analysis', 'planning')]
+    script += [
+        {'type': 'ai:classification', 'intent': 'comprehensive_security_test', 'confidence': 0.93},
+        {'type': 'ai:strategy', 'strategy': {'phase': 'discovery', 'recommendations': steps},
+         'reasoning': f"Start broad, then focus on exposed APIs. {padding}"},
+        {'type': 'test:plan', 'plan': {'target': 'https://example.com', 'steps': steps}}
+    ]
+    for step in steps:
+        script.append({'type': 'test:start', 'test': step['tool']})
+        script.append({'type': 'finding', 'severity': rng.choice(['critical', 'high', 'medium', 'low', 'info']),
+                       'category': step['tool'], 'description': f"Finding from {step['tool']}",
+                       'impact': 'Simulated impact'})
+    script.append({'type': 'workflow:complete', 'status': 'completed', 'findings': len(steps)})
+
+    return [json.dumps(dict(script[i % len(script)], workflowId='wf-1', seq=i + 1,
+                            timestamp='2025-01-01T00:00:00.000Z'))
+            for i in range(count)]
+
+
+def _hot_path(msg: Mapping) -> None:
+    """What the monitor's receive path reads from every message"""
+    msg.get('workflowId'), msg.get('seq'), msg.get('timestamp')
+    msg_type = msg.get('type')
+    if msg_type == 'ai:thinking':
+        msg.get('phase')
+    elif msg_type == 'finding':
+        msg.get('severity')
+
+
+def kept_after_capture(decode: Callable[[str], Event]) -> Callable[[str], Event]:
+    """Decode as the monitor does: the frame is released once the capture has it"""
+    def keep(frame: str) -> Event:
+        event = decode(frame)
+        event.release()
+        return event
+    return keep
+
+
+def benchmark(frames: List[str], variants: Dict[str, Callable[[str], Any]], repeat: int = 3) -> List[Dict[str, Any]]:
+    """Events/s (best of `repeat`) and bytes retained per event for each decoding variant
+
+    Retention is measured on fresh copies of the frames, as each one arrives
+    off the socket, so a variant that holds on to its frame is charged for it.
+    """
+    size = sum(len(frame) for frame in frames)
+    results = []
+    for name, decode in variants.items():
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for frame in frames:
+                _hot_path(decode(frame))
+            best = min(best, time.perf_counter() - started)
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [decode(frame.encode().decode()) for frame in frames]
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del kept
+        results.append({
+            'variant': name,
+            'events_per_sec': len(frames) / best,
+            'mb_per_sec': size / best / 1e6,
+            'bytes_per_event': retained / len(frames)
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark WebSocket event decoding')
+    parser.add_argument('--events', type=int, default=20000, help='Messages per run')
+    parser.add_argument('--payload-size', type=int, default=0,
+                        help='Extra characters in thought content and strategy reasoning')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per variant (best is reported)')
+    args = parser.parse_args()
+
+    frames = sample_messages(args.events, args.payload_size)
+    variants: Dict[str, Callable[[str], Any]] = {'dict (json.loads)': json.loads}
+    if orjson is not None:
+        variants['dict (orjson.loads)'] = orjson.loads
+    for backend in ('json', 'orjson'):
+        if backend == 'orjson' and orjson is None:
+            continue
+        variants[f"typed ({backend})"] = kept_after_capture(EventDecoder(backend, lazy_bytes=0))
+        variants[f"typed lazy ({backend})"] = kept_after_capture(EventDecoder(backend))
+
+    average = sum(len(frame) for frame in frames) / len(frames)
+    print(f"\n⏱️  Decoding {len(frames)} messages (mean {average:,.0f} bytes, payload {args.payload_size})")
+    print(f"   {'variant':<24} {'events/s':>12} {'MB/s':>9} {'kept B/event':>12}")
+    for result in benchmark(frames, variants, args.repeat):
+        print(f"   {result['variant']:<24} {result['events_per_sec']:>12,.0f} {result['mb_per_sec']:>9.1f} "
+              f"{result['bytes_per_event']:>12,.0f}")
+    if orjson is None:
+        print("   (orjson is not installed; pip install orjson to compare it)")
+
+
+if __name__ == '__main__':
+    main()
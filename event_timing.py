@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Event Timing - per-event latency instrumentation for the AI planning monitor
+Receive lag against server timestamps, time to each planning milestone and inter-event gaps,
+kept as mergeable histograms so percentiles accumulate across runs
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from capture_replay import epoch_seconds
+from latency_histogram import LatencyRecorder, format_table
+
+# First occurrence of each of these is a milestone, in the order a healthy workflow reaches them
+MILESTONES = ('ai:thinking', 'ai:classification', 'test:plan', 'test:start', 'finding', 'workflow:complete')
+# since_submit:    monitor clock, submission (or first event) to first occurrence of a milestone
+# server_interval: server clock, previous milestone to this one; immune to clock skew
+# receive_lag:     monitor receive time minus the event's server timestamp (WebSocket fan-out)
+# gap:             monitor clock, time since the previous event, grouped by phase
+TIMING_PHASES = ('since_submit', 'server_interval', 'receive_lag', 'gap')
+PROMETHEUS_LABELS = ('metric', 'event', 'test_type')
+
+
+class EventTiming:
+    """Instrument one workflow's event stream.
+
+    Histograms live in a LatencyRecorder keyed (metric, event type or phase,
+    testType), so runs merge exactly and export like submission latencies.
+    Together they split planning latency three ways: receive_lag is the
+    WebSocket fan-out, server_interval between ai:thinking, ai:classification
+    and test:plan is the LLM, and the rest of since_submit plus the
+    test:plan -> test:start interval is the orchestrator. Negative receive
+    lags mean the clocks disagree; they are counted in `skewed`, not recorded.
+    """
+
+    def __init__(self, test_type: str = 'comprehensive', measure_lag: bool = True):
+        self.recorder = LatencyRecorder(phases=TIMING_PHASES)
+        self.test_type = test_type
+        self.measure_lag = measure_lag
+        self.submitted_at: Optional[float] = None
+        self.first_seen: Dict[str, float] = {}
+        self.skewed = 0
+        self.stage = 'planning'
+        self._origin: Optional[float] = None
+        self._last_received: Optional[float] = None
+        self._last_milestone: Optional[float] = None
+
+    def submitted(self, at: float) -> None:
+        """Mark when the workflow was submitted (epoch seconds); without it, the first event is the origin"""
+        self.submitted_at = at
+
+    def _record(self, metric: str, group: str, seconds: float) -> None:
+        self.recorder.record(group, self.test_type, {metric: seconds})
+
+    def add(self, msg: Dict[str, Any], received_at: float) -> None:
+        msg_type = msg.get('type', 'unknown')
+        server_at = epoch_seconds(msg.get('timestamp'))
+        if self._origin is None:
+            self._origin = self.submitted_at if self.submitted_at is not None else received_at
+
+        if self.measure_lag and server_at is not None:
+            lag = received_at - server_at
+            if lag < 0:
+                self.skewed += 1
+            else:
+                self._record('receive_lag', msg_type, lag)
+        if self._last_received is not None:
+            self._record('gap', msg.get('phase') or self.stage, received_at - self._last_received)
+        self._last_received = received_at
+        if msg_type == 'test:plan':
+            self.stage = 'testing'
+
+        if msg_type in MILESTONES and msg_type not in self.first_seen:
+            self.first_seen[msg_type] = received_at - self._origin
+            self._record('since_submit', msg_type, max(0.0, received_at - self._origin))
+            if server_at is not None:
+                if self._last_milestone is not None:
+                    self._record('server_interval', msg_type, max(0.0, server_at - self._last_milestone))
+                self._last_milestone = server_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'firstSeen': self.first_seen,
+            'skewed': self.skewed,
+            'byEvent': self.recorder.to_json()['by_scenario']
+        }
+
+
+def accumulate(recorder: LatencyRecorder, filename: str) -> LatencyRecorder:
+    """Merge `recorder` into the histograms saved in `filename` (if any) and save the result"""
+    combined = LatencyRecorder(recorder.bits, TIMING_PHASES)
+    if os.path.exists(filename):
+        with open(filename) as f:
+            combined.merge(LatencyRecorder.from_json(json.load(f)))
+    combined.merge(recorder)
+    with open(filename, 'w') as f:
+        json.dump(combined.to_json(), f, indent=2)
+    return combined
+
+
+def save_prometheus(recorder: LatencyRecorder, filename: str) -> str:
+    with open(filename, 'w') as f:
+        f.write(recorder.to_prometheus('monitor_event_latency_seconds',
+                                       'AI planning monitor event timing', PROMETHEUS_LABELS))
+    return filename
+
+
+def timing_table(recorder: LatencyRecorder) -> List[str]:
+    """format_table rows per event type or phase, milestones first"""
+    view = recorder.view('scenario')
+    order = {event: i for i, event in enumerate(MILESTONES)}
+    rows = format_table(view, TIMING_PHASES)
+    header, rule, body = rows[0], rows[1], rows[2:]
+    body.sort(key=lambda row: order.get(row.split(' ', 1)[0], len(order)))
+    return [header.replace('group', 'event', 1).replace('phase ', 'metric', 1), rule] + body
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+"""
+Latency Histograms - HDR-style recording and percentile reporting
+Log-linear buckets over integer microseconds, exported as JSON or Prometheus text exposition
+"""
+
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PHASES = ('dns', 'connect', 'ttfb', 'total')
+PIPELINE_PHASES = ('first_finding', 'completion')
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+# Prometheus `le` boundaries in seconds, matching the *_seconds_bucket panels in Grafana
+PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class LatencyHistogram:
+    """HDR-style histogram with bounded relative error.
+
+    Values are recorded in microseconds. Below 2**bits every value has its own
+    bucket; above that each power of two is split into 2**(bits-1) linear
+    sub-buckets, so the relative error stays under 2**-(bits-1) (0.8% with the
+    default 8 bits) across the whole range. Counts are kept sparsely in a dict,
+    which makes merging two histograms exact.
+    """
+
+    def __init__(self, bits: int = 8):
+        self.bits = bits
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.sum_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def _key(self, value: int) -> int:
+        shift = max(0, value.bit_length() - self.bits)
+        return (shift << self.bits) | (value >> shift)
+
+    def _bounds(self, key: int) -> Tuple[int, int]:
+        """Inclusive (low, high) microsecond range of a bucket"""
+        shift = key >> self.bits
+        mantissa = key & ((1 << self.bits) - 1)
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds: float, count: int = 1) -> None:
+        value = max(0, int(round(seconds * 1_000_000)))
+        key = self._key(value)
+        self.counts[key] = self.counts.get(key, 0) + count
+        self.total_count += count
+        self.sum_us += value * count
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other.bits != self.bits:
+            raise ValueError(f"Cannot merge histograms with {other.bits} and {self.bits} bits")
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.total_count += other.total_count
+        self.sum_us += other.sum_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def percentile(self, p: float) -> float:
+        """Value in seconds at percentile p (0-100), reported as the bucket's upper bound"""
+        if not self.total_count:
+            return 0.0
+        rank = max(1, int(-(-p * self.total_count // 100)))  # ceil without float drift
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return min(self._bounds(key)[1], self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    def count_at_or_below(self, seconds: float) -> int:
+        limit = seconds * 1_000_000
+        return sum(c for key, c in self.counts.items() if self._bounds(key)[1] <= limit)
+
+    @property
+    def mean(self) -> float:
+        return self.sum_us / self.total_count / 1_000_000 if self.total_count else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        result = {
+            'count': self.total_count,
+            'min': (self.min_us or 0) / 1_000_000,
+            'mean': self.mean,
+            'max': self.max_us / 1_000_000
+        }
+        for p in PERCENTILES:
+            result[f"p{p:g}"] = self.percentile(p)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Lossless serialisation; from_dict() restores an identical histogram"""
+        return {
+            'bits': self.bits,
+            'count': self.total_count,
+            'sum_us': self.sum_us,
+            'min_us': self.min_us,
+            'max_us': self.max_us,
+            'counts': {str(k): v for k, v in sorted(self.counts.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls(data['bits'])
+        histogram.counts = {int(k): v for k, v in data['counts'].items()}
+        histogram.total_count = data['count']
+        histogram.sum_us = data['sum_us']
+        histogram.min_us = data['min_us']
+        histogram.max_us = data['max_us']
+        return histogram
+
+
+class LatencyRecorder:
+    """Thread-safe set of histograms keyed by (phase, scenario, testType).
+
+    Per-scenario, per-testType and overall views are built by merging, so
+    no sample is recorded twice.
+    """
+
+    def __init__(self, bits: int = 8, phases: Tuple[str, ...] = PHASES):
+        self.bits = bits
+        self.phases = phases
+        self.histograms: Dict[Tuple[str, str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, scenario: str, test_type: str, timings: Dict[str, float]) -> None:
+        with self._lock:
+            for phase, seconds in timings.items():
+                if phase not in self.phases or seconds is None:
+                    continue
+                key = (phase, scenario, test_type or 'unknown')
+                if key not in self.histograms:
+                    self.histograms[key] = LatencyHistogram(self.bits)
+                self.histograms[key].record(seconds)
+
+    def record_result(self, result: Dict[str, Any]) -> None:
+        """Record a SecurityTestRunner result carrying a `timings` dict"""
+        if result.get('timings'):
+            self.record(result['scenario'], result.get('testType'), result['timings'])
+
+    def merge(self, other: "LatencyRecorder") -> "LatencyRecorder":
+        with self._lock:
+            for key, histogram in other.histograms.items():
+                if key not in self.histograms:
+                    self.histograms[key] = LatencyHistogram(self.bits)
+                self.histograms[key].merge(histogram)
+        return self
+
+    def view(self, by: Optional[str] = None) -> Dict[str, Dict[str, LatencyHistogram]]:
+        """Merged histograms as {group: {phase: histogram}}; by is 'scenario', 'testType' or None"""
+        position = {'scenario': 1, 'testType': 2}.get(by)
+        grouped: Dict[str, Dict[str, LatencyHistogram]] = {}
+        with self._lock:
+            for key, histogram in self.histograms.items():
+                group = key[position] if position else 'all'
+                phases = grouped.setdefault(group, {})
+                if key[0] not in phases:
+                    phases[key[0]] = LatencyHistogram(self.bits)
+                phases[key[0]].merge(histogram)
+        return grouped
+
+    def to_json(self) -> Dict[str, Any]:
+        def summarise(view):
+            return {group: {phase: h.summary() for phase, h in phases.items()}
+                    for group, phases in sorted(view.items())}
+
+        with self._lock:
+            raw = [
+                {'phase': phase, 'scenario': scenario, 'testType': test_type, 'histogram': h.to_dict()}
+                for (phase, scenario, test_type), h in sorted(self.histograms.items())
+            ]
+        return {
+            'unit': 'seconds',
+            'phases': list(self.phases),
+            'overall': summarise(self.view()).get('all', {}),
+            'by_test_type': summarise(self.view('testType')),
+            'by_scenario': summarise(self.view('scenario')),
+            'histograms': raw
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "LatencyRecorder":
+        phases = tuple(data.get('phases', PHASES))
+        recorder = None
+        for entry in data.get('histograms', []):
+            histogram = LatencyHistogram.from_dict(entry['histogram'])
+            if recorder is None:
+                recorder = cls(histogram.bits, phases)
+            recorder.histograms[(entry['phase'], entry['scenario'], entry['testType'])] = histogram
+        return recorder or cls(phases=phases)
+
+    def to_prometheus(self, name: str = 'workflow_submission_duration_seconds',
+                      description: str = 'Workflow submission latency',
+                      label_names: Tuple[str, str, str] = ('phase', 'scenario', 'test_type')) -> str:
+        """Prometheus text exposition; one histogram series per phase, scenario and test_type.
+
+        `label_names` renames the three key labels for recorders that use
+        the (phase, scenario, testType) key for something else.
+        """
+        lines = [
+            f"# HELP {name} {description} by {label_names[0]} ({', '.join(self.phases)})",
+            f"# TYPE {name} histogram"
+        ]
+        with self._lock:
+            items = sorted(self.histograms.items())
+        for key, histogram in items:
+            labels = ','.join(f'{label}="{_escape_label(value)}"' for label, value in zip(label_names, key))
+            for le in PROMETHEUS_BUCKETS:
+                lines.append(f'{name}_bucket{{{labels},le="{le:g}"}} {histogram.count_at_or_below(le)}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.total_count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum_us / 1_000_000:.6f}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.total_count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_table(view: Dict[str, Dict[str, LatencyHistogram]], phases: Iterable[str] = PHASES) -> List[str]:
+    """Text rows of count and percentiles in milliseconds for each group and phase"""
+    phases = list(phases)
+    width = max(8, *(len(p) for p in phases))
+    header = f"{'group':<40} {'phase':<{width}} {'n':>6}" + ''.join(f" {'p' + format(p, 'g'):>8}" for p in PERCENTILES)
+    rows = [header, '-' * len(header)]
+    for group, histograms in sorted(view.items()):
+        for phase in phases:
+            histogram = histograms.get(phase)
+            if not histogram or not histogram.total_count:
+                continue
+            values = ''.join(f" {histogram.percentile(p) * 1000:>8.1f}" for p in PERCENTILES)
+            rows.append(f"{group[:40]:<40} {phase:<{width}} {histogram.total_count:>6}{values}")
+    return rows
+
+
+def save_json(recorder: LatencyRecorder, filename: str) -> str:
+    with open(filename, 'w') as f:
+        json.dump(recorder.to_json(), f, indent=2)
+    return filename
+
+
+def save_prometheus(recorder: LatencyRecorder, filename: str,
+                    pipeline: Optional[LatencyRecorder] = None) -> str:
+    with open(filename, 'w') as f:
+        f.write(recorder.to_prometheus())
+        if pipeline is not None and pipeline.histograms:
+            f.write(pipeline.to_prometheus('workflow_pipeline_duration_seconds',
+                                           'Time from submission to first finding and completion'))
+    return filename
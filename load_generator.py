@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+"""
+Load Generator - concurrent workflow submission for test-user-input-runner.py
+Open-loop (target arrival rate) and closed-loop (virtual users) runs with ramp-up/hold/ramp-down stages
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from request_timing import mount_timed_adapter
+
+LOAD_MODES = ('open', 'closed')
+IDLE_POLL = 0.05  # seconds a parked virtual user waits before re-checking the profile
+
+
+def positive_rate(value: str) -> float:
+    """argparse type for --rate: requests/s above zero"""
+    rate = float(value)
+    if rate <= 0:
+        raise ValueError(f"Arrival rate must be positive, got {value}")
+    return rate
+
+
+def positive_users(value: str) -> int:
+    """argparse type for --users: at least one virtual user"""
+    users = int(value)
+    if users < 1:
+        raise ValueError(f"Virtual users must be at least 1, got {value}")
+    return users
+
+
+class LoadProfile:
+    """Ramp-up / hold / ramp-down stages scaled to a peak level.
+
+    The level is an arrival rate (requests/s) in open-loop mode and a number
+    of active virtual users in closed-loop mode.
+    """
+
+    def __init__(self, peak: float, ramp_up: float = 0, hold: float = 60, ramp_down: float = 0):
+        self.peak = peak
+        self.ramp_up = ramp_up
+        self.hold = hold
+        self.ramp_down = ramp_down
+
+    @property
+    def duration(self) -> float:
+        return self.ramp_up + self.hold + self.ramp_down
+
+    def level_at(self, t: float) -> float:
+        if t < 0 or t >= self.duration:
+            return 0.0
+        if t < self.ramp_up:
+            return self.peak * t / self.ramp_up
+        if t < self.ramp_up + self.hold:
+            return self.peak
+        remaining = self.duration - t
+        return self.peak * remaining / self.ramp_down
+
+
+class ScenarioMix:
+    """Weighted random choice over scenarios.
+
+    Each scenario may carry a `"weight"` in test-user-inputs.json; it defaults to 1.
+    """
+
+    def __init__(self, scenarios: List[Dict[str, Any]], seed: Optional[int] = None):
+        if not scenarios:
+            raise ValueError("Scenario mix is empty")
+        self.scenarios = scenarios
+        self.weights = [float(s.get('weight', 1)) for s in scenarios]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def pick(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._rng.choices(self.scenarios, weights=self.weights)[0]
+
+    def describe(self) -> List[str]:
+        total = sum(self.weights)
+        return [f"{w / total * 100:5.1f}%  {s['scenario']}" for s, w in zip(self.scenarios, self.weights)]
+
+
+def build_mix(test_inputs: Dict[str, Any], include_edge_cases: bool = False,
+              quick_only: bool = False, seed: Optional[int] = None) -> ScenarioMix:
+    """Scenario mix from test-user-inputs.json, including the performance_test_batch targets"""
+    scenarios = list(test_inputs.get('test_scenarios', []))
+    for i, test_input in enumerate(test_inputs.get('performance_test_batch', []), 1):
+        scenarios.append({
+            'scenario': f"Performance Batch {i}",
+            'description': test_input.get('description', ''),
+            'input': test_input,
+            'weight': test_input.get('weight', 1)
+        })
+    if include_edge_cases:
+        scenarios += test_inputs.get('edge_cases', [])
+    if quick_only:
+        scenarios = [s for s in scenarios if s['input'].get('testType') == 'quick']
+    return ScenarioMix(scenarios, seed)
+
+
+def share_connection_pool(session, size: int) -> None:
+    """Size the session's keep-alive pool so every worker can hold a connection"""
+    mount_timed_adapter(session, size)
+
+
+class LoadGenerator:
+    """Drive `submit(scenario) -> result` concurrently according to a profile.
+
+    Open loop schedules arrivals as a Poisson process whose rate follows the
+    profile, independent of how quickly the backend answers. Each result keeps
+    its intended start time, so queueing inside the pool counts as latency
+    instead of silently lowering the offered rate. Closed loop runs one thread
+    per virtual user that submits, waits for the response, then thinks.
+    """
+
+    def __init__(self, submit: Callable[[Dict[str, Any]], Dict[str, Any]], mix: ScenarioMix,
+                 profile: LoadProfile, mode: str = 'open', workers: int = 32,
+                 think_time: float = 0.0, seed: Optional[int] = None):
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode {mode}; expected one of {LOAD_MODES}")
+        self.submit = submit
+        self.mix = mix
+        self.profile = profile
+        self.mode = mode
+        self.workers = workers if mode == 'open' else int(profile.peak)
+        self.think_time = think_time
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.results: List[Dict[str, Any]] = []
+        self.offered = 0
+        self.start = 0.0
+
+    def _execute(self, scenario: Dict[str, Any], intended: float) -> None:
+        started = time.perf_counter()
+        result = self.submit(scenario)
+        finished = time.perf_counter()
+        result['offset'] = intended - self.start
+        result['finished'] = finished - self.start
+        result['schedule_lag'] = started - intended
+        result['response_time'] = finished - intended
+        with self._lock:
+            self.results.append(result)
+
+    def _arrivals(self):
+        """Thinned Poisson arrival offsets following profile.level_at()"""
+        peak = self.profile.peak
+        if peak <= 0:
+            return
+        t = 0.0
+        while True:
+            t += self._rng.expovariate(peak)
+            if t >= self.profile.duration:
+                return
+            if self._rng.random() * peak < self.profile.level_at(t):
+                yield t
+
+    def _run_open(self) -> None:
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='load') as pool:
+            for offset in self._arrivals():
+                intended = self.start + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                self.offered += 1
+                pool.submit(self._execute, self.mix.pick(), intended)
+
+    def _virtual_user(self, index: int) -> None:
+        end = self.start + self.profile.duration
+        while True:
+            now = time.perf_counter()
+            if now >= end:
+                return
+            # User `index` is active while the profile calls for more than `index` users
+            if self.profile.level_at(now - self.start) <= index:
+                time.sleep(IDLE_POLL)
+                continue
+            with self._lock:
+                self.offered += 1
+            self._execute(self.mix.pick(), now)
+            if self.think_time:
+                time.sleep(self._rng.uniform(0.5, 1.5) * self.think_time)
+
+    def _run_closed(self) -> None:
+        users = [threading.Thread(target=self._virtual_user, args=(i,), name=f"vu-{i}", daemon=True)
+                 for i in range(self.workers)]
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+
+    def run(self) -> List[Dict[str, Any]]:
+        self.results = []
+        self.offered = 0
+        self.start = time.perf_counter()
+        if self.mode == 'open':
+            self._run_open()
+        else:
+            self._run_closed()
+        return sorted(self.results, key=lambda r: r['offset'])
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def timeline(results: List[Dict[str, Any]], profile: LoadProfile, window: float = 5.0) -> List[Dict[str, Any]]:
+    """Per-window offered level, achieved throughput, response-time percentiles and errors.
+
+    Requests are bucketed by intended start; throughput counts completions
+    inside the window, so it falls behind the offered rate once the backend saturates.
+    """
+    windows = []
+    start = 0.0
+    while start < profile.duration:
+        end = min(start + window, profile.duration)
+        batch = [r for r in results if start <= r['offset'] < end]
+        response_times = [r['response_time'] for r in batch]
+        windows.append({
+            'start': start,
+            'level': profile.level_at((start + end) / 2),
+            'requests': len(batch),
+            'throughput': sum(1 for r in results if start <= r['finished'] < end) / (end - start),
+            'errors': sum(1 for r in batch if not r['success']),
+            'p50': _percentile(response_times, 0.50),
+            'p95': _percentile(response_times, 0.95),
+            'max_lag': max((r['schedule_lag'] for r in batch), default=0.0)
+        })
+        start = end
+    return windows
+
+
+def find_saturation(windows: List[Dict[str, Any]], error_rate: float = 0.05,
+                    latency_factor: float = 3.0) -> Optional[Dict[str, Any]]:
+    """First window where errors or p95 response time break away from the early baseline"""
+    baseline = next((w['p95'] for w in windows if w['requests']), None)
+    if baseline is None:
+        return None
+    for w in windows:
+        if not w['requests']:
+            continue
+        if w['errors'] / w['requests'] > error_rate or w['p95'] > baseline * latency_factor:
+            return w
+    return None
+
+
+def print_timeline(windows: List[Dict[str, Any]], mode: str) -> None:
+    level = 'rate/s' if mode == 'open' else 'users'
+    print(f"\n📈 Load Timeline")
+    print("===============")
+    print(f"{'t(s)':>6} {level:>7} {'req':>5} {'thru/s':>7} {'err':>4} {'p50(s)':>7} {'p95(s)':>7} {'lag(s)':>7}")
+    for w in windows:
+        print(f"{w['start']:>6.0f} {w['level']:>7.1f} {w['requests']:>5} {w['throughput']:>7.2f} "
+              f"{w['errors']:>4} {w['p50']:>7.3f} {w['p95']:>7.3f} {w['max_lag']:>7.3f}")
+
+    saturated = find_saturation(windows)
+    if saturated:
+        print(f"\n⚠️  Saturation from t={saturated['start']:.0f}s at {saturated['level']:.1f} {level} "
+              f"(p95 {saturated['p95']:.3f}s, {saturated['errors']} errors)")
+    else:
+        print("\n✅ No saturation detected within this profile")
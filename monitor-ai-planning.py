@@ -7,8 +7,8 @@ for security testing workflows.
 
 import json
 import asyncio
-import websockets
 import aiohttp
+import os
 import sys
 import uuid
 import argparse
@@ -23,25 +23,65 @@ from rich.text import Text
 from rich.progress import Progress, SpinnerColumn, TextColumn
 import time
 
+from monitor_multiplex import MultiplexMonitor, parse_attach
+from monitor_render import DROP_POLICIES, RenderPipeline
+from event_capture import COMPRESSIONS, EventCapture, EventSummary
+from capture_replay import load_session, parse_speed, print_report, replay
+from event_model import DECODERS, LAZY_BYTES, Dispatcher, Event, EventDecoder, make_event
+from event_timing import EventTiming, accumulate, save_prometheus, timing_table
+from ws_client import ResilientWebSocket
+
 console = Console()
 
 class AITestMonitor:
     """Monitor and capture AI's planning and thought process"""
     
-    def __init__(self, backend_url="http://localhost:8001", ws_url="ws://localhost:8001"):
+    def __init__(self, backend_url="http://localhost:8001", ws_url="ws://localhost:8001",
+                 fps: float = 10.0, queue_size: int = 1000, drop_policy: str = 'sample',
+                 capture: str = 'gzip', capture_dir: str = '.', capture_max_mb: float = 64,
+                 recent: int = 200, save_results: bool = True, max_reconnects: int = 10,
+                 decoder: str = 'auto', lazy_bytes: int = LAZY_BYTES):
         self.backend_url = backend_url
         self.ws_url = ws_url
+        self.fps = fps
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.pipeline = None
+        self.max_reconnects = max_reconnects
+        self.client = None
+        self.decoder = EventDecoder(decoder, lazy_bytes)
+        self.renderers = Dispatcher({
+            'ai:thinking': self.display_ai_thought,
+            'ai:strategy': self.display_strategy,
+            'ai:classification': self.display_classification,
+            'test:plan': self.display_test_plan,
+            'test:start': self.display_test_start,
+            'finding': self.display_finding,
+            'workflow:complete': lambda event: self.display_summary()
+        })
         self.workflow_id = str(uuid.uuid4())
-        self.ai_thoughts = []
-        self.test_plan = None
+        # Only the latest `recent` thoughts and findings stay in memory; every event goes to the capture
+        self.summary = EventSummary(recent)
+        self.timing = EventTiming()
+        self.capture = None
+        if capture:
+            self.capture = EventCapture(
+                os.path.join(capture_dir, f"ai-capture-{self.workflow_id}"), compression=capture,
+                max_bytes=int(capture_max_mb * 1024 * 1024)
+            )
+        self.save_results = save_results
         self.current_phase = "Initializing"
-        self.findings = []
         self.start_time = None
+    
+    @property
+    def test_plan(self):
+        return self.summary.test_plan
         
     async def send_test_request(self, target: str, description: str, scope: str = "/*"):
         """Send the initial test request to the backend"""
         
         self.start_time = datetime.now()
+        self.timing.submitted(time.time())
         
         request_data = {
             "workflowId": self.workflow_id,
@@ -79,81 +119,134 @@ class AITestMonitor:
                 return result
     
     async def monitor_websocket(self):
-        """Connect to WebSocket and monitor AI communication"""
+        """Connect to WebSocket and monitor AI communication, reconnecting and resuming if it drops"""
         
+        self.client = ResilientWebSocket(
+            f"{self.ws_url}/ws", [self.workflow_id], max_attempts=self.max_reconnects,
+            on_connect=self.on_connect, on_disconnect=self.on_disconnect, decode=self.decoder
+        )
+        flusher = asyncio.create_task(self.flush_capture()) if self.capture else None
         try:
-            async with websockets.connect(f"{self.ws_url}/ws") as websocket:
-                # Subscribe to workflow
-                await websocket.send(json.dumps({
-                    "type": "subscribe",
-                    "workflowId": self.workflow_id
-                }))
-                
-                console.print("[green]✅ WebSocket connected[/green]")
-                
-                while True:
-                    try:
-                        message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
-                        await self.handle_message(json.loads(message))
-                    except asyncio.TimeoutError:
-                        continue
-                    except websockets.ConnectionClosed:
+            self.start_pipeline()
+            try:
+                async for msg in self.client:
+                    if await self.handle_message(msg) is False:
                         break
-                        
+            finally:
+                if flusher:
+                    flusher.cancel()
+                await self.stop_pipeline()
+                await self.client.close()
+                if self.capture:
+                    self.capture.close()
+                    
         except Exception as e:
             console.print(f"[red]WebSocket error: {e}[/red]")
     
+    async def flush_capture(self):
+        """Flush the capture while the stream is quiet, so a killed monitor keeps the end of the last burst"""
+        
+        while True:
+            await asyncio.sleep(self.capture.flush_interval / 2)
+            self.capture.flush_if_due()
+    
+    def on_connect(self, connections: int):
+        if connections == 1:
+            console.print("[green]✅ WebSocket connected[/green]")
+        else:
+            console.print("[green]🔄 WebSocket reconnected, resuming event stream[/green]")
+    
+    def on_disconnect(self, attempt: int, delay: float, error):
+        reason = error or "closed by server"
+        console.print(f"[yellow]⚠️  WebSocket connection lost ({reason}); "
+                      f"retrying in {delay:.1f}s (attempt {attempt})[/yellow]")
+    
+    def start_pipeline(self):
+        """Render in a separate task so bursts never stall the receive loop"""
+        
+        self.pipeline = RenderPipeline(
+            self.render_message, self.status_line, console,
+            fps=self.fps, capacity=self.queue_size, policy=self.drop_policy
+        )
+        self.pipeline.start()
+    
+    async def stop_pipeline(self):
+        """Render whatever is still queued and report anything coalesced or dropped"""
+        
+        await self.pipeline.close()
+        stats = self.pipeline.stats()
+        if stats['dropped'] or stats['coalesced']:
+            console.print(f"[dim]Rendered {stats['rendered']} of {stats['received']} events "
+                          f"({stats['coalesced']} coalesced, {stats['dropped']} dropped)[/dim]")
+        self.pipeline = None
+    
     async def handle_message(self, msg: Dict[str, Any]):
-        """Process incoming WebSocket messages"""
-        
-        msg_type = msg.get('type', 'unknown')
-        
-        if msg_type == 'ai:thinking':
-            self.display_ai_thought(msg.get('phase', 'general'), msg.get('content', ''))
-            
-        elif msg_type == 'ai:strategy':
-            self.display_strategy(msg)
-            
-        elif msg_type == 'ai:classification':
-            self.display_classification(msg)
-            
-        elif msg_type == 'test:plan':
-            self.test_plan = msg.get('plan', {})
-            self.display_test_plan()
-            
-        elif msg_type == 'test:start':
-            self.current_phase = f"Running: {msg.get('test', 'Unknown')}"
-            console.print(f"[yellow]🚀 {self.current_phase}[/yellow]")
-            
-        elif msg_type == 'finding':
-            self.findings.append(msg)
-            self.display_finding(msg)
-            
-        elif msg_type == 'workflow:complete':
-            self.display_summary()
+        """Process incoming WebSocket messages (typed events, or plain dicts from replays)"""
+        
+        event = make_event(msg)
+        received_at = time.time()
+        
+        # State is updated here on the receive path; rendering may lag or coalesce
+        if self.capture:
+            self.capture.write(event, received_at, event.raw)
+        # Summary, timing and the render queue hold events; only lazy members still need the frame
+        event.release()
+        self.summary.add(event, received_at)
+        self.timing.add(event, received_at)
+        if event.type == 'test:start':
+            self.current_phase = f"Running: {event.test}"
+        
+        if self.pipeline is not None:
+            self.pipeline.submit(event)
+        else:
+            self.render_message(event)
+        
+        if event.type == 'workflow:complete':
             return False
     
-    def display_ai_thought(self, phase: str, thought: str):
-        """Display AI's thought process"""
+    def render_message(self, event: Event):
+        """Render one (possibly coalesced) event"""
         
-        self.ai_thoughts.append({
-            "timestamp": datetime.now().isoformat(),
-            "phase": phase,
-            "thought": thought
-        })
+        self.renderers(event)
+    
+    def status_line(self) -> Text:
+        """One-line live status shown below the rendered events"""
         
+        pipeline = self.pipeline
+        line = Text.assemble(
+            ("⏳ ", "yellow"), (self.current_phase, "bold"),
+            f"  •  {self.summary.thoughts} thoughts  •  {self.summary.findings} findings"
+        )
+        if pipeline is not None:
+            line.append(f"  •  {pipeline.receive_rate:.0f} ev/s  •  queue {len(pipeline.queue)}", style="dim")
+            if pipeline.queue.dropped:
+                line.append(f"  •  {pipeline.queue.dropped} dropped", style="red")
+        if self.client is not None and not self.client.connected:
+            line.append("  •  reconnecting", style="bold red")
+        return line
+    
+    def display_ai_thought(self, event: Event):
+        """Display AI's thought process"""
+        
+        more = f" (+{event.repeated - 1} more)" if event.repeated > 1 else ""
         panel = Panel(
-            Text(thought, style="cyan"),
-            title=f"🤖 AI Thinking - {phase}",
+            Text(event.content, style="cyan"),
+            title=f"🤖 AI Thinking - {event.phase}{more}",
             border_style="cyan"
         )
         console.print(panel)
     
-    def display_strategy(self, msg: Dict):
+    def display_test_start(self, event: Event):
+        """Display a test starting"""
+        
+        more = f" (+{event.repeated - 1} more)" if event.repeated > 1 else ""
+        console.print(f"[yellow]🚀 Running: {event.test}{more}[/yellow]")
+    
+    def display_strategy(self, event: Event):
         """Display AI's strategy"""
         
-        strategy = msg.get('strategy', {})
-        reasoning = msg.get('reasoning', 'No reasoning provided')
+        strategy = event.strategy or {}
+        reasoning = event.reasoning
         
         table = Table(title="📋 AI Strategy", show_header=True, header_style="bold magenta")
         table.add_column("Phase", style="cyan", width=15)
@@ -171,23 +264,20 @@ class AITestMonitor:
         console.print(table)
         console.print(Panel(reasoning, title="💭 Reasoning", border_style="blue"))
     
-    def display_classification(self, msg: Dict):
+    def display_classification(self, event: Event):
         """Display intent classification"""
         
-        intent = msg.get('intent', 'Unknown')
-        confidence = msg.get('confidence', 0)
-        
         console.print(Panel(
-            f"Intent: [bold]{intent}[/bold]\n"
-            f"Confidence: [yellow]{confidence:.2%}[/yellow]",
+            f"Intent: [bold]{event.intent}[/bold]\n"
+            f"Confidence: [yellow]{event.confidence:.2%}[/yellow]",
             title="🎯 Intent Classification",
             border_style="green"
         ))
     
-    def display_test_plan(self):
+    def display_test_plan(self, event: Event):
         """Display the complete test plan"""
         
-        if not self.test_plan:
+        if not event.plan:
             return
         
         table = Table(title="🗺️ Test Execution Plan", show_header=True)
@@ -196,15 +286,10 @@ class AITestMonitor:
         table.add_column("Target", style="white", width=30)
         table.add_column("Purpose", style="green")
         
-        steps = self.test_plan.get('steps', []) or self.test_plan.get('recommendations', [])
+        steps = event.steps
         
         for i, step in enumerate(steps, 1):
-            table.add_row(
-                str(i),
-                step.get('tool', step.get('name', 'Unknown')),
-                step.get('target', self.test_plan.get('target', 'N/A'))[:30],
-                step.get('purpose', step.get('description', 'N/A'))
-            )
+            table.add_row(str(i), step.tool, step.target[:30], step.purpose)
         
         console.print(table)
         
@@ -212,29 +297,29 @@ class AITestMonitor:
         if steps:
             first_step = steps[0]
             console.print(Panel(
-                f"[bold]First Action:[/bold] {first_step.get('tool', 'Unknown')}\n"
-                f"[bold]Purpose:[/bold] {first_step.get('purpose', 'N/A')}\n"
-                f"[bold]Priority:[/bold] {first_step.get('priority', 'Not specified')}",
+                f"[bold]First Action:[/bold] {first_step.tool}\n"
+                f"[bold]Purpose:[/bold] {first_step.purpose}\n"
+                f"[bold]Priority:[/bold] {first_step.priority}",
                 title="🎯 Initial Step Details",
                 border_style="yellow"
             ))
     
-    def display_finding(self, finding: Dict):
+    def display_finding(self, finding: Event):
         """Display a security finding"""
         
-        severity = finding.get('severity', 'info')
+        severity = finding.severity
         severity_colors = {
             'critical': 'red',
-            'high': 'orange',
+            'high': 'orange1',
             'medium': 'yellow',
             'low': 'blue',
             'info': 'cyan'
         }
         
         console.print(Panel(
-            f"[bold]Type:[/bold] {finding.get('type', 'Unknown')}\n"
-            f"[bold]Description:[/bold] {finding.get('description', 'N/A')}\n"
-            f"[bold]Impact:[/bold] {finding.get('impact', 'N/A')}",
+            f"[bold]Type:[/bold] {finding.finding_type or finding.type}\n"
+            f"[bold]Description:[/bold] {finding.description}\n"
+            f"[bold]Impact:[/bold] {finding.impact}",
             title=f"🔍 Finding - [{severity_colors.get(severity, 'white')}]{severity.upper()}[/{severity_colors.get(severity, 'white')}]",
             border_style=severity_colors.get(severity, 'white')
         ))
@@ -247,27 +332,127 @@ class AITestMonitor:
         summary = Panel(
             f"[bold]Workflow ID:[/bold] {self.workflow_id}\n"
             f"[bold]Duration:[/bold] {duration:.2f} seconds\n"
-            f"[bold]AI Thoughts Captured:[/bold] {len(self.ai_thoughts)}\n"
-            f"[bold]Findings:[/bold] {len(self.findings)}\n"
+            f"[bold]AI Thoughts Captured:[/bold] {self.summary.thoughts}\n"
+            f"[bold]Findings:[/bold] {self.summary.findings}"
+            + (f" ({', '.join(f'{n} {s}' for s, n in self.summary.findings_by_severity.most_common())})"
+               if self.summary.findings else "") + "\n"
             f"[bold]Test Plan Generated:[/bold] {'Yes' if self.test_plan else 'No'}",
             title="📊 Summary",
             border_style="green"
         )
         
         console.print(summary)
+        self.display_timing()
+        
+        if not self.save_results:
+            return
         
-        # Save results
+        # Save the summary; aiThoughts and findings hold only the most recent entries,
+        # the capture files referenced under "capture" hold every event
+        if self.capture:
+            self.capture.close()
         output_file = f"ai-analysis-{self.workflow_id}.json"
         with open(output_file, 'w') as f:
             json.dump({
                 "workflowId": self.workflow_id,
                 "duration": duration,
-                "aiThoughts": self.ai_thoughts,
+                "counts": self.summary.to_dict(),
+                "aiThoughts": self.summary.recent_thought_entries(),
                 "testPlan": self.test_plan,
-                "findings": self.findings
+                "findings": self.summary.recent_finding_entries(),
+                "timing": self.timing.to_dict(),
+                "capture": self.capture.to_dict() if self.capture else None
             }, f, indent=2)
         
         console.print(f"[green]✅ Results saved to {output_file}[/green]")
+        if self.capture and self.capture.files:
+            console.print(f"[green]✅ {self.capture.events} events captured to {', '.join(self.capture.files)}[/green]")
+
+    def display_timing(self):
+        """Milestone, gap and receive-lag percentiles for this run, in milliseconds"""
+        
+        if not self.timing.recorder.histograms:
+            return
+        console.print("\n[bold]⏱️  Event Timing (ms)[/bold]")
+        for row in timing_table(self.timing.recorder):
+            console.print(row, markup=False, highlight=False, soft_wrap=True)
+        if self.timing.skewed:
+            console.print(f"[yellow]⚠️  {self.timing.skewed} events were stamped after they arrived; "
+                          f"the server and monitor clocks disagree, so receive lag is unreliable[/yellow]")
+    
+    def save_timing(self, json_file: str = None, prometheus_file: str = None):
+        """Add this run to the timing histograms in json_file and export them"""
+        
+        recorder = self.timing.recorder
+        if json_file:
+            recorder = accumulate(recorder, json_file)
+            runs = recorder.view().get('all', {}).get('since_submit')
+            console.print(f"[green]✅ Event timing saved to {json_file}"
+                          f"{f' ({runs.total_count} milestones across runs)' if runs else ''}[/green]")
+        if prometheus_file:
+            console.print(f"[green]✅ Event timing metrics saved to {save_prometheus(recorder, prometheus_file)}[/green]")
+
+async def run_multi(args):
+    """Monitor attached and newly launched workflows over shared connections"""
+    
+    monitor = MultiplexMonitor(args.ws, connections=args.connections, follow=args.follow,
+                               max_reconnects=args.max_reconnects, decoder=args.decoder, lazy_bytes=args.lazy_bytes)
+    for workflow_id in parse_attach(args.attach):
+        await monitor.attach(workflow_id)
+    
+    # Subscribe before submitting so no early events are missed
+    launchers = [AITestMonitor(backend_url=args.backend, ws_url=args.ws, capture=None) for _ in range(args.workflows or 0)]
+    for launcher in launchers:
+        await monitor.attach(launcher.workflow_id, args.target)
+    
+    if not monitor.workflows:
+        console.print("[red]Nothing to monitor: pass --attach IDs and/or --workflows N[/red]")
+        return
+    
+    with Live(monitor, console=console, refresh_per_second=args.fps):
+        receiver = asyncio.create_task(monitor.run())
+        submissions = await asyncio.gather(
+            *(l.send_test_request(args.target, args.description, args.scope) for l in launchers),
+            return_exceptions=True
+        )
+        for launcher, result in zip(launchers, submissions):
+            if isinstance(result, Exception):
+                console.print(f"[red]Failed to start {launcher.workflow_id[:8]}: {result}[/red]")
+                monitor.mark(launcher.workflow_id, 'failed')
+        try:
+            await receiver
+        except Exception as e:
+            console.print(f"[red]WebSocket error: {e}[/red]")
+    
+    console.print(f"\n[green]✅ Summary saved to {monitor.save_summary()}[/green]")
+
+async def run_replay(args):
+    """Feed a recorded session through handle_message() and report the handling cost"""
+    
+    events = load_session(args.replay)
+    if not events:
+        console.print(f"[red]No replayable events found in {args.replay}[/red]")
+        return
+    
+    # Replays must not overwrite the session's own analysis or capture files
+    monitor = AITestMonitor(backend_url=args.backend, ws_url=args.ws, fps=args.fps,
+                            queue_size=args.queue_size, drop_policy=args.drop_policy,
+                            capture=None, recent=args.recent, save_results=False,
+                            decoder=args.decoder, lazy_bytes=args.lazy_bytes)
+    monitor.start_time = datetime.now()
+    # Recorded server timestamps are from the original session, so only intervals between them mean anything
+    monitor.timing = EventTiming(measure_lag=False)
+    monitor.start_pipeline()
+    report = await replay(events, monitor.handle_message, speed=args.speed, source=args.replay,
+                          finish=monitor.stop_pipeline)
+    print_report(report)
+    
+    if args.replay_report:
+        with open(args.replay_report, 'w') as f:
+            json.dump(report.to_dict(), f, indent=2)
+        console.print(f"[green]✅ Replay report saved to {args.replay_report}[/green]")
+    monitor.display_timing()
+    monitor.save_timing(args.timing_json, args.timing_prometheus)
 
 async def main():
     """Main execution"""
@@ -284,16 +469,71 @@ async def main():
                        help='Backend URL')
     parser.add_argument('--ws', default='ws://localhost:8001',
                        help='WebSocket URL')
+    parser.add_argument('--fps', type=float, default=10.0,
+                       help='Maximum render frames per second')
+    parser.add_argument('--queue-size', type=int, default=1000,
+                       help='Render queue capacity before the drop policy applies')
+    parser.add_argument('--drop-policy', choices=DROP_POLICIES, default='sample',
+                       help='What to do with high-frequency events when rendering falls behind')
+    parser.add_argument('--capture', choices=COMPRESSIONS, default='gzip',
+                       help='Compression for the JSONL capture of every received event')
+    parser.add_argument('--no-capture', action='store_true',
+                       help='Do not write a capture file')
+    parser.add_argument('--capture-dir', default='ai-test-outputs',
+                       help='Directory for capture files')
+    parser.add_argument('--capture-max-mb', type=float, default=64,
+                       help='Rotate capture files after this many MB of uncompressed JSONL')
+    parser.add_argument('--recent', type=int, default=200,
+                       help='AI thoughts and findings kept in memory and in the summary file')
+    parser.add_argument('--attach', action='append', metavar='WORKFLOW_ID',
+                       help='Monitor an already-running workflow (repeatable or comma-separated)')
+    parser.add_argument('--workflows', type=int,
+                       help='Launch this many workflows against --target and monitor them together')
+    parser.add_argument('--connections', type=int, default=1,
+                       help='WebSocket connections shared by all monitored workflows')
+    parser.add_argument('--follow', action='store_true',
+                       help='Keep monitoring after every workflow has finished')
+    
+    parser.add_argument('--max-reconnects', type=int, default=10,
+                       help='Consecutive failed reconnect attempts before giving up (0 disables reconnecting)')
+    parser.add_argument('--replay', metavar='CAPTURE',
+                       help='Replay a capture (JSONL capture, ai-analysis-*.json or ai-test-outputs/*.json) '
+                            'through the monitor instead of connecting')
+    parser.add_argument('--speed', type=parse_speed, default=1.0,
+                       help="Replay speed: 1 for original timing, N for N times faster, 'max' for no waiting")
+    parser.add_argument('--replay-report', metavar='FILE',
+                       help='Save replay throughput and per-type handling latency as JSON')
+    parser.add_argument('--timing-json', metavar='FILE',
+                       help='Accumulate event timing histograms across runs in FILE')
+    parser.add_argument('--timing-prometheus', metavar='FILE',
+                       help='Export the (accumulated) event timing histograms in Prometheus text format')
+    parser.add_argument('--decoder', choices=DECODERS, default='auto',
+                       help='JSON decoder for WebSocket frames; auto uses orjson when it is installed')
+    parser.add_argument('--lazy-bytes', type=int, default=LAZY_BYTES,
+                       help='Decode frames at least this large lazily, field by field (0 disables)')
     
     args = parser.parse_args()
     
+    if args.replay:
+        await run_replay(args)
+        return
+    
+    if args.attach or (args.workflows or 0) > 1:
+        await run_multi(args)
+        return
+    
     console.print(Panel.fit(
         "[bold cyan]AI Security Test Planning Monitor[/bold cyan]\n"
         "Captures AI's thought process and initial planning",
         title="🧪 Test Monitor"
     ))
     
-    monitor = AITestMonitor(backend_url=args.backend, ws_url=args.ws)
+    monitor = AITestMonitor(backend_url=args.backend, ws_url=args.ws, fps=args.fps,
+                            queue_size=args.queue_size, drop_policy=args.drop_policy,
+                            capture=None if args.no_capture else args.capture,
+                            capture_dir=args.capture_dir, capture_max_mb=args.capture_max_mb,
+                            recent=args.recent, max_reconnects=args.max_reconnects,
+                            decoder=args.decoder, lazy_bytes=args.lazy_bytes)
     
     # Start monitoring tasks
     tasks = [
@@ -310,6 +550,8 @@ async def main():
             if isinstance(result, Exception):
                 console.print(f"[red]Error: {result}[/red]")
         
+        monitor.save_timing(args.timing_json, args.timing_prometheus)
+        
     except KeyboardInterrupt:
         console.print("\n[yellow]Monitoring stopped by user[/yellow]")
     except Exception as e:
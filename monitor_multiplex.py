@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+"""
+Multiplexed workflow monitoring - many workflows over one WebSocket (or a small pool)
+Events are demultiplexed by workflowId into per-workflow state and shown as one live table
+"""
+
+import asyncio
+import json
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from rich.console import Group
+from rich.table import Table
+from rich.text import Text
+
+from event_model import LAZY_BYTES, EventDecoder
+from ws_client import ResilientWebSocket
+
+SEVERITY_ORDER = ['critical', 'high', 'medium', 'low', 'info']
+SEVERITY_STYLES = {'critical': 'red', 'high': 'orange1', 'medium': 'yellow', 'low': 'blue', 'info': 'cyan'}
+TERMINAL_STATUSES = {'completed', 'failed', 'cancelled', 'rejected'}
+
+
+class WorkflowState:
+    """Everything the aggregate view shows about one workflow, updated per event"""
+
+    def __init__(self, workflow_id: str, target: str = ''):
+        self.workflow_id = workflow_id
+        self.target = target
+        self.status = 'waiting'
+        self.phase = ''
+        self.current_test = ''
+        self.thoughts = 0
+        self.intent = ''
+        self.plan_steps = 0
+        self.findings = {severity: 0 for severity in SEVERITY_ORDER}
+        self.events = 0
+        self.attached_at = time.time()
+        self.first_event_at: Optional[float] = None
+        self.last_event_at: Optional[float] = None
+        self.completed_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def apply(self, msg: Dict[str, Any]) -> None:
+        now = time.time()
+        self.events += 1
+        self.first_event_at = self.first_event_at or now
+        self.last_event_at = now
+        if self.status == 'waiting':
+            self.status = 'running'
+
+        msg_type = msg.get('type', 'unknown')
+        if msg_type == 'ai:thinking':
+            self.thoughts += 1
+            self.phase = msg.get('phase', self.phase)
+        elif msg_type == 'ai:strategy':
+            self.phase = (msg.get('strategy') or {}).get('phase', self.phase)
+        elif msg_type == 'ai:classification':
+            self.intent = msg.get('intent', '')
+        elif msg_type == 'test:plan':
+            plan = msg.get('plan') or {}
+            self.plan_steps = len(plan.get('steps', []) or plan.get('recommendations', []))
+        elif msg_type == 'test:start':
+            self.current_test = msg.get('test', 'Unknown')
+        elif msg_type == 'finding':
+            severity = msg.get('severity', 'info')
+            self.findings[severity if severity in self.findings else 'info'] += 1
+        elif msg_type == 'workflow:complete':
+            self.status = msg.get('status') if msg.get('status') in TERMINAL_STATUSES else 'completed'
+            self.completed_at = now
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'workflowId': self.workflow_id,
+            'target': self.target,
+            'status': self.status,
+            'phase': self.phase,
+            'intent': self.intent,
+            'thoughts': self.thoughts,
+            'planSteps': self.plan_steps,
+            'findings': self.findings,
+            'events': self.events,
+            'duration': (self.completed_at or time.time()) - self.attached_at
+        }
+
+
+class MultiplexMonitor:
+    """Follow many workflows over `connections` shared WebSockets.
+
+    Each workflow is pinned to one connection by a stable hash of its ID, so
+    subscribe messages and events for a workflow always use the same socket.
+    Workflows can be attached while the monitor is running. Each connection
+    reconnects and resumes on its own, giving up after `max_reconnects`
+    consecutive failures.
+    """
+
+    def __init__(self, ws_url: str, connections: int = 1, follow: bool = False, max_reconnects: int = 10,
+                 decoder: str = 'auto', lazy_bytes: int = LAZY_BYTES):
+        self.ws_url = ws_url
+        self.connections = max(1, connections)
+        self.follow = follow
+        self.max_reconnects = max_reconnects
+        self.decoder = decoder
+        self.lazy_bytes = lazy_bytes
+        self.workflows: Dict[str, WorkflowState] = {}
+        self.unrouted = 0
+        self.total_events = 0
+        self.started = time.time()
+        self._clients: Dict[int, ResilientWebSocket] = {}
+        self._assigned: Dict[int, List[str]] = {i: [] for i in range(self.connections)}
+        self._all_done = asyncio.Event()
+
+    def _slot(self, workflow_id: str) -> int:
+        return zlib.crc32(workflow_id.encode()) % self.connections
+
+    async def attach(self, workflow_id: str, target: str = '') -> WorkflowState:
+        """Start following a workflow, subscribing at once if its connection is up"""
+        if workflow_id in self.workflows:
+            return self.workflows[workflow_id]
+        state = WorkflowState(workflow_id, target)
+        self.workflows[workflow_id] = state
+        self._all_done.clear()
+        slot = self._slot(workflow_id)
+        self._assigned[slot].append(workflow_id)
+        if slot in self._clients:
+            await self._clients[slot].subscribe(workflow_id)
+        return state
+
+    def dispatch(self, msg: Dict[str, Any]) -> Optional[WorkflowState]:
+        """Route one decoded message to its workflow's state"""
+        self.total_events += 1
+        state = self.workflows.get(msg.get('workflowId') or '')
+        if state is None:
+            self.unrouted += 1
+            return None
+        state.apply(msg)
+        self._check_done()
+        return state
+
+    def mark(self, workflow_id: str, status: str) -> None:
+        """Set a status from outside the event stream, e.g. a submission that failed"""
+        self.workflows[workflow_id].status = status
+        self._check_done()
+
+    def _check_done(self) -> None:
+        if not self.follow and self.workflows and all(w.done for w in self.workflows.values()):
+            self._all_done.set()
+
+    async def _connection(self, slot: int) -> None:
+        client = ResilientWebSocket(f"{self.ws_url}/ws", self._assigned[slot], max_attempts=self.max_reconnects,
+                                    decode=EventDecoder(self.decoder, self.lazy_bytes))
+        self._clients[slot] = client
+        try:
+            async for msg in client:
+                self.dispatch(msg)
+        finally:
+            await client.close()
+
+    async def run(self) -> None:
+        """Receive until every attached workflow finishes (or forever with follow)"""
+        connections = [asyncio.create_task(self._connection(slot)) for slot in range(self.connections)]
+        waiter = asyncio.create_task(self._all_done.wait())
+        try:
+            done, _ = await asyncio.wait(connections + [waiter], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is not waiter and task.exception():
+                    raise task.exception()
+        finally:
+            for task in connections + [waiter]:
+                task.cancel()
+            await asyncio.gather(*connections, waiter, return_exceptions=True)
+
+    def __rich__(self) -> Group:
+        """Aggregate view; rich.live re-renders this on every refresh"""
+        table = Table(title="🛰️  Workflows", caption="Findings: critical/high/medium/low/info",
+                      show_header=True, header_style="bold magenta", expand=True)
+        table.add_column("Workflow", style="cyan", no_wrap=True, min_width=8)
+        table.add_column("Target", overflow="ellipsis", ratio=1)
+        table.add_column("Status", no_wrap=True, min_width=9)
+        table.add_column("Phase/Test", overflow="ellipsis", ratio=1, min_width=10)
+        table.add_column("AI", justify="right")
+        table.add_column("Plan", justify="right")
+        table.add_column("Findings", no_wrap=True, min_width=9)
+        table.add_column("Events", justify="right")
+        table.add_column("Idle", justify="right")
+
+        now = time.time()
+        ordered = sorted(self.workflows.values(), key=lambda w: (w.done, -(w.last_event_at or 0)))
+        for w in ordered:
+            status_style = {'completed': 'green', 'failed': 'red', 'waiting': 'dim'}.get(w.status, 'yellow')
+            findings = Text('/').join(
+                Text(str(w.findings[s]), style=SEVERITY_STYLES[s] if w.findings[s] else 'dim')
+                for s in SEVERITY_ORDER
+            )
+            idle = f"{now - w.last_event_at:.0f}s" if w.last_event_at else '-'
+            table.add_row(
+                w.workflow_id[:8], w.target or '-', Text(w.status, style=status_style),
+                w.current_test or w.phase or '-', str(w.thoughts), str(w.plan_steps or '-'),
+                findings, str(w.events), idle
+            )
+
+        active = sum(1 for w in self.workflows.values() if not w.done)
+        totals = {s: sum(w.findings[s] for w in self.workflows.values()) for s in SEVERITY_ORDER}
+        elapsed = max(1e-9, now - self.started)
+        reconnecting = sum(1 for client in self._clients.values() if not client.connected and not client.closed)
+        footer = Text.assemble(
+            (f"{active} active", "yellow"), " / ", (f"{len(self.workflows) - active} finished", "green"),
+            f"  •  {self.total_events} events ({self.total_events / elapsed:.1f}/s)",
+            f"  •  findings " + ' '.join(f"{s[0].upper()}:{totals[s]}" for s in SEVERITY_ORDER),
+            f"  •  {self.connections} connection{'s' if self.connections > 1 else ''}",
+            (f" ({reconnecting} reconnecting)" if reconnecting else "", "red"),
+            (f"  •  {self.unrouted} unrouted" if self.unrouted else "")
+        )
+        return Group(table, footer)
+
+    def save_summary(self, filename: Optional[str] = None) -> str:
+        filename = filename or f"ai-analysis-multi-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(filename, 'w') as f:
+            json.dump({
+                'started': datetime.fromtimestamp(self.started).isoformat(),
+                'duration': time.time() - self.started,
+                'totalEvents': self.total_events,
+                'workflows': [w.to_dict() for w in self.workflows.values()]
+            }, f, indent=2)
+        return filename
+
+
+def parse_attach(values: Iterable[str]) -> List[str]:
+    """Accept repeated --attach flags and comma-separated IDs"""
+    ids: List[str] = []
+    for value in values or []:
+        ids += [v.strip() for v in value.split(',') if v.strip()]
+    return ids
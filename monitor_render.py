@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+"""
+Render pipeline for the AI planning monitor
+Decouples WebSocket receive from rich rendering with a bounded queue, frame-rate-limited output,
+coalescing of high-frequency events and a drop/sample policy under overload
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from rich.console import Console
+from rich.live import Live
+
+# High-frequency events that may be coalesced, sampled or dropped; everything else is always rendered
+COALESCIBLE = {'ai:thinking', 'test:start'}
+DROP_POLICIES = ('sample', 'drop')
+
+
+class RenderQueue:
+    """Bounded FIFO of messages waiting to be rendered.
+
+    When full, a coalescible message is dropped ('drop') or kept one in
+    `sample_every` ('sample'); any other message evicts the oldest queued
+    coalescible message instead, so findings, plans and completion are never
+    lost. A hard limit of twice the capacity bounds memory even if only
+    important messages arrive.
+    """
+
+    def __init__(self, capacity: int = 1000, policy: str = 'sample', sample_every: int = 10):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {policy}; expected one of {DROP_POLICIES}")
+        self.capacity = capacity
+        self.policy = policy
+        self.sample_every = sample_every
+        self.items: Deque[Dict[str, Any]] = deque()
+        self.dropped = 0
+        self.accepted = 0
+        self.high_water = 0
+        self._overflow_seen = 0
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _evict_coalescible(self) -> bool:
+        for i, queued in enumerate(self.items):
+            if queued.get('type') in COALESCIBLE:
+                del self.items[i]
+                return True
+        return False
+
+    def put(self, msg: Dict[str, Any]) -> bool:
+        """Enqueue without blocking; returns False if the message was dropped"""
+        if len(self.items) >= self.capacity:
+            if msg.get('type') in COALESCIBLE:
+                self._overflow_seen += 1
+                sampled = self.policy == 'sample' and self._overflow_seen % self.sample_every == 0
+                # A sampled message replaces the oldest queued coalescible one
+                if not (sampled and self._evict_coalescible()):
+                    self.dropped += 1
+                    return False
+                self.dropped += 1
+            elif self._evict_coalescible():
+                self.dropped += 1
+            elif len(self.items) >= 2 * self.capacity:
+                self.items.popleft()
+                self.dropped += 1
+        self.items.append(msg)
+        self.accepted += 1
+        self.high_water = max(self.high_water, len(self.items))
+        self._ready.set()
+        return True
+
+    def drain(self) -> List[Dict[str, Any]]:
+        items = list(self.items)
+        self.items.clear()
+        self._ready.clear()
+        return items
+
+    async def wait(self) -> None:
+        await self._ready.wait()
+
+    def wake(self) -> None:
+        self._ready.set()
+
+
+def coalesce(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge runs of ai:thinking in the same phase and consecutive test:start events.
+
+    The merged message keeps the latest content and gains `_coalesced`, the
+    number of original events it stands for. Typed events stay typed.
+    """
+    merged: List[Dict[str, Any]] = []
+    for msg in batch:
+        previous = merged[-1] if merged else None
+        msg_type = msg.get('type')
+        if previous is not None and msg_type in COALESCIBLE and previous.get('type') == msg_type and \
+                (msg_type != 'ai:thinking' or previous.get('phase') == msg.get('phase')):
+            count = previous.get('_coalesced', 1) + 1
+            merged[-1] = dict(msg, _coalesced=count) if isinstance(msg, dict) else msg.replace(_coalesced=count)
+        else:
+            merged.append(msg)
+    return merged
+
+
+class RenderPipeline:
+    """Consume a RenderQueue at a bounded frame rate.
+
+    `render(msg)` prints one (possibly coalesced) message above the live
+    status line; `status()` returns the renderable for that line. The receive
+    loop only calls submit(), which never blocks.
+    """
+
+    def __init__(self, render: Callable[[Dict[str, Any]], None], status: Callable[[], Any],
+                 console: Console, fps: float = 10.0, capacity: int = 1000,
+                 policy: str = 'sample', max_per_frame: int = 50):
+        self.render = render
+        self.status = status
+        self.console = console
+        self.fps = fps
+        self.max_per_frame = max_per_frame
+        self.queue = RenderQueue(capacity, policy)
+        self.received = 0
+        self.rendered = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, msg: Dict[str, Any]) -> None:
+        self.received += 1
+        self.queue.put(msg)
+
+    @property
+    def receive_rate(self) -> float:
+        return self.received / max(1e-9, time.monotonic() - self.started)
+
+    def _frame(self) -> None:
+        batch = coalesce(self.queue.drain())
+        if len(batch) > self.max_per_frame:
+            # Keep the frame bounded: skip surplus coalescible items, never the rest
+            keep, surplus = [], len(batch) - self.max_per_frame
+            for msg in batch:
+                if surplus and msg.get('type') in COALESCIBLE:
+                    surplus -= 1
+                    self.queue.dropped += msg.get('_coalesced', 1)
+                    continue
+                keep.append(msg)
+            batch = keep
+        for msg in batch:
+            self.coalesced += msg.get('_coalesced', 1) - 1
+            try:
+                self.render(msg)
+            except Exception as e:
+                # One malformed event must not stop rendering for the rest of the session
+                self.errors += 1
+                if self.errors == 1:
+                    self.console.print(f"[red]Render error on {msg.get('type', 'unknown')}: {e}[/red]")
+                continue
+            self.rendered += 1
+
+    async def _run(self) -> None:
+        frame = 1.0 / self.fps
+        with Live(self.status(), console=self.console, refresh_per_second=self.fps,
+                  get_renderable=self.status, transient=True):
+            while True:
+                if not self._closing:
+                    await self.queue.wait()
+                started = time.monotonic()
+                self._frame()
+                if self._closing and not len(self.queue):
+                    return
+                await asyncio.sleep(max(0.0, frame - (time.monotonic() - started)))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Render whatever is still queued, then stop the live display"""
+        self._closing = True
+        self.queue.wake()
+        if self._task:
+            await self._task
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'received': self.received,
+            'rendered': self.rendered,
+            'coalesced': self.coalesced,
+            'dropped': self.queue.dropped,
+            'errors': self.errors,
+            'queue_high_water': self.queue.high_water
+        }
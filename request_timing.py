@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+"""
+Request Timing - per-phase timings for requests sessions
+A transport adapter that records DNS, connect, TTFB and total time like curl's -w timers
+"""
+
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_active = threading.local()
+
+
+def _phases() -> Optional[Dict[str, float]]:
+    return getattr(_active, 'phases', None)
+
+
+class _TimedConnectionMixin:
+    """Split connection setup into name resolution and connect (TCP, plus TLS for https)"""
+
+    def _new_conn(self):
+        phases = _phases()
+        if phases is None:
+            return super()._new_conn()
+
+        resolved = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        phases['dns'] = time.perf_counter() - phases['start']
+        # Connect to the address just resolved so the lookup is not repeated
+        original = self._dns_host
+        self._dns_host = resolved[0][4][0]
+        try:
+            return super()._new_conn()
+        finally:
+            self._dns_host = original
+
+    def connect(self):
+        super().connect()
+        phases = _phases()
+        if phases is not None:
+            phases['connect'] = time.perf_counter() - phases['start']
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that attaches `response.timings` to every response.
+
+    Timings are cumulative seconds from the start of the request, as curl
+    reports them: `dns` and `connect` are only present when a new connection
+    was opened (a reused keep-alive connection skips both), `ttfb` is when the
+    response headers arrived and `total` is when the body was fully read.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+    def send(self, request, stream=False, **kwargs):
+        phases = {'start': time.perf_counter()}
+        _active.phases = phases
+        try:
+            response = super().send(request, stream=stream, **kwargs)
+            phases['ttfb'] = time.perf_counter() - phases['start']
+            if not stream:
+                response.content  # read the body here so `total` covers it
+            phases['total'] = time.perf_counter() - phases['start']
+        finally:
+            _active.phases = None
+
+        del phases['start']
+        response.timings = phases
+        return response
+
+
+def mount_timed_adapter(session, pool_size: int = 10) -> TimedHTTPAdapter:
+    """Mount a TimedHTTPAdapter with a keep-alive pool of pool_size connections"""
+    adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Approximate nearest-neighbour indexes for large embedding corpora
+IVF-flat in pure NumPy, or HNSW through the optional hnswlib package
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_index import EmbeddingIndex, normalize_rows
+from embedding_store import SECTIONS, iter_records
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# Defaults mirror the pgvector indexes in database/init.sql:
+#   USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+HNSW_EF_SEARCH = 40  # pgvector's default hnsw.ef_search
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 20,
+                     seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity, returning unit centroids"""
+    rng = np.random.default_rng(seed)
+    k = min(k, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=k)
+        # Re-seed empty clusters with random points so every list stays useful
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+
+    return centroids
+
+
+class IVFFlatIndex:
+    """Inverted-file index with exact (flat) scoring inside probed lists.
+
+    `nlist` controls how finely the corpus is partitioned and `nprobe` how
+    many lists a query scans: higher nprobe means better recall, more latency.
+    """
+
+    def __init__(self, dimension: int, nlist: int = 100, nprobe: int = 8):
+        self.dimension = dimension
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.centroids: Optional[np.ndarray] = None
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        self.keys: List[str] = []
+        self.lists: List[np.ndarray] = []
+
+    def train(self, vectors: np.ndarray, iterations: int = 20, seed: int = 0) -> None:
+        self.centroids = spherical_kmeans(normalize_rows(vectors), self.nlist, iterations, seed)
+        self.nlist = len(self.centroids)
+        self.lists = [np.zeros(0, dtype=np.int64) for _ in range(self.nlist)]
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """Insert vectors incrementally into the nearest existing lists"""
+        if self.centroids is None:
+            raise RuntimeError("Index must be trained before adding vectors")
+        vectors = normalize_rows(vectors)
+        start = len(self.keys)
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+
+        self.vectors = np.vstack([self.vectors, vectors])
+        self.keys.extend(keys)
+        for list_id in np.unique(assignments):
+            new_ids = start + np.flatnonzero(assignments == list_id)
+            self.lists[list_id] = np.concatenate([self.lists[list_id], new_ids])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(self, queries: np.ndarray, k: int = 10,
+               nprobe: Optional[int] = None) -> List[List[Tuple[str, float]]]:
+        queries = normalize_rows(np.atleast_2d(queries))
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        results = []
+        for query, probe in zip(queries, probes):
+            candidates = np.concatenate([self.lists[p] for p in probe])
+            if len(candidates) == 0:
+                results.append([])
+                continue
+            scores = self.vectors[candidates] @ query
+            top_k = min(k, len(candidates))
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top])]
+            results.append([(self.keys[candidates[i]], float(scores[i])) for i in top])
+        return results
+
+    def save(self, path: str) -> None:
+        """Persist centroids, vectors, keys and list assignments to one .npz"""
+        assignments = np.empty(len(self.keys), dtype=np.int32)
+        for list_id, ids in enumerate(self.lists):
+            assignments[ids] = list_id
+        np.savez(path, centroids=self.centroids, vectors=self.vectors,
+                 keys=np.array(self.keys, dtype=str), assignments=assignments,
+                 params=np.array([self.dimension, self.nlist, self.nprobe]))
+
+    @classmethod
+    def load(cls, path: str) -> "IVFFlatIndex":
+        data = np.load(path, allow_pickle=False)
+        dimension, nlist, nprobe = (int(x) for x in data["params"])
+        index = cls(dimension, nlist, nprobe)
+        index.centroids = data["centroids"]
+        index.vectors = data["vectors"]
+        index.keys = data["keys"].tolist()
+        assignments = data["assignments"]
+        index.lists = [np.flatnonzero(assignments == i) for i in range(nlist)]
+        return index
+
+
+class HNSWIndex:
+    """Thin wrapper over hnswlib with the same add/search/save/load surface"""
+
+    def __init__(self, dimension: int, max_elements: int = 10000, m: int = HNSW_M,
+                 ef_construction: int = HNSW_EF_CONSTRUCTION, ef: int = HNSW_EF_SEARCH):
+        if hnswlib is None:
+            raise RuntimeError("hnswlib is not installed. Install it with: pip install hnswlib")
+        self.dimension = dimension
+        self.keys: List[str] = []
+        self.ef = ef
+        self.index = hnswlib.Index(space='cosine', dim=dimension)
+        self.index.init_index(max_elements=max_elements, M=m, ef_construction=ef_construction)
+        self.index.set_ef(ef)
+
+    def train(self, vectors: np.ndarray, **_) -> None:
+        """HNSW needs no training step; kept for interface parity with IVF"""
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        needed = len(self.keys) + len(keys)
+        if needed > self.index.get_max_elements():
+            self.index.resize_index(max(needed, 2 * self.index.get_max_elements()))
+        ids = np.arange(len(self.keys), needed)
+        self.index.add_items(normalize_rows(vectors), ids)
+        self.keys.extend(keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def search(self, queries: np.ndarray, k: int = 10,
+               ef: Optional[int] = None) -> List[List[Tuple[str, float]]]:
+        self.index.set_ef(max(ef or self.ef, k))
+        labels, distances = self.index.knn_query(normalize_rows(np.atleast_2d(queries)),
+                                                 k=min(k, len(self.keys)))
+        return [
+            [(self.keys[label], 1.0 - float(d)) for label, d in zip(row, row_d)]
+            for row, row_d in zip(labels, distances)
+        ]
+
+    def save(self, path: str) -> None:
+        self.index.save_index(path)
+        with open(path + ".keys.json", 'w') as f:
+            json.dump({"dimension": self.dimension, "ef": self.ef, "keys": self.keys}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "HNSWIndex":
+        if hnswlib is None:
+            raise RuntimeError("hnswlib is not installed. Install it with: pip install hnswlib")
+        with open(path + ".keys.json") as f:
+            meta = json.load(f)
+        index = cls.__new__(cls)
+        index.dimension = meta["dimension"]
+        index.keys = meta["keys"]
+        index.ef = meta["ef"]
+        index.index = hnswlib.Index(space='cosine', dim=index.dimension)
+        index.index.load_index(path)
+        index.index.set_ef(index.ef)
+        return index
+
+
+def load_section(path: str, section: str) -> Tuple[List[str], np.ndarray]:
+    keys, vectors = [], []
+    for record in iter_records(path):
+        if record["section"] == section:
+            keys.append(record["key"])
+            vectors.append(np.asarray(record["embedding"], dtype=np.float32))
+    if not vectors:
+        raise ValueError(f"No {section} embeddings found in {path}")
+    return keys, np.vstack(vectors)
+
+
+def recall_report(index, keys: List[str], vectors: np.ndarray, queries: np.ndarray,
+                  k: int, settings: List[Dict[str, int]]) -> List[Dict[str, float]]:
+    """Recall@k and per-query latency of `index` against brute force for each setting"""
+    exact = EmbeddingIndex(keys, vectors)
+    start = time.perf_counter()
+    truth = exact.search(queries, k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    truth_sets = [{key for key, _ in row} for row in truth]
+
+    rows = [{"setting": "brute-force", "recall": 1.0, "latency_ms": exact_ms}]
+    for setting in settings:
+        start = time.perf_counter()
+        found = index.search(queries, k, **setting)
+        latency = (time.perf_counter() - start) * 1000 / len(queries)
+        hits = sum(len(truth_set & {key for key, _ in row}) for truth_set, row in zip(truth_sets, found))
+        recall = hits / max(1, sum(len(t) for t in truth_sets))
+        label = ", ".join(f"{name}={value}" for name, value in setting.items())
+        rows.append({"setting": label, "recall": recall, "latency_ms": latency})
+    return rows
+
+
+def build_index(backend: str, keys: List[str], vectors: np.ndarray, args):
+    if backend == 'hnsw':
+        index = HNSWIndex(vectors.shape[1], max(len(keys), 1), args.m, args.ef_construction, args.ef)
+    else:
+        index = IVFFlatIndex(vectors.shape[1], args.nlist or max(1, int(np.sqrt(len(keys)))), args.nprobe)
+    index.train(vectors)
+    index.add(keys, vectors)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and evaluate ANN indexes over embeddings')
+    parser.add_argument('command', choices=['build', 'add', 'report'])
+    parser.add_argument('--input', default='embeddings.npy', help='embeddings.npy or embeddings.json')
+    parser.add_argument('--section', choices=SECTIONS, default='attack_patterns')
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help='Use N random vectors instead of --input (for sizing runs)')
+    parser.add_argument('--dimension', type=int, default=1536, help='Dimension for --synthetic')
+    parser.add_argument('--backend', choices=['ivf', 'hnsw'], default='ivf')
+    parser.add_argument('--index', default='ann-index.npz', help='Index file to write or update')
+    parser.add_argument('--nlist', type=int, default=0, help='IVF lists (default: sqrt(N))')
+    parser.add_argument('--nprobe', type=int, default=8, help='IVF lists scanned per query')
+    parser.add_argument('--m', type=int, default=HNSW_M)
+    parser.add_argument('--ef-construction', type=int, default=HNSW_EF_CONSTRUCTION)
+    parser.add_argument('--ef', type=int, default=HNSW_EF_SEARCH)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=100, help='Queries sampled for the report')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        # Clustered data behaves like real embeddings far better than pure noise
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((max(1, int(np.sqrt(args.synthetic))), args.dimension))
+        labels = rng.integers(0, len(centers), args.synthetic)
+        vectors = (centers[labels] + 0.5 * rng.standard_normal((args.synthetic, args.dimension))).astype(np.float32)
+        keys = [f"synthetic-{i}" for i in range(args.synthetic)]
+    else:
+        keys, vectors = load_section(args.input, args.section)
+
+    if args.command == 'build':
+        start = time.time()
+        index = build_index(args.backend, keys, vectors, args)
+        index.save(args.index)
+        print(f"✓ Built {args.backend} index over {len(index)} vectors in {time.time() - start:.2f}s → {args.index}")
+
+    elif args.command == 'add':
+        if not os.path.exists(args.index):
+            print(f"✗ Index {args.index} not found; run 'build' first")
+            sys.exit(1)
+        index = HNSWIndex.load(args.index) if args.backend == 'hnsw' else IVFFlatIndex.load(args.index)
+        existing = set(index.keys)
+        new = [i for i, key in enumerate(keys) if key not in existing]
+        if new:
+            index.add([keys[i] for i in new], vectors[new])
+            index.save(args.index)
+        print(f"✓ Added {len(new)} vectors ({len(index)} total) → {args.index}")
+
+    else:
+        index = build_index(args.backend, keys, vectors, args)
+        rng = np.random.default_rng(1)
+        # Perturbed corpus vectors stand in for real queries near the data
+        sample = vectors[rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)]
+        queries = sample + rng.normal(0, 0.1 * np.abs(sample).mean(), sample.shape).astype(np.float32)
+
+        if args.backend == 'hnsw':
+            settings = [{"ef": ef} for ef in (10, 20, 40, 80, 160, 320)]
+        else:
+            settings = [{"nprobe": p} for p in (1, 2, 4, 8, 16, 32, 64) if p <= index.nlist]
+
+        print(f"Recall@{args.k} vs brute force ({len(keys)} vectors, dim {vectors.shape[1]}, "
+              f"{len(queries)} queries, backend {args.backend})")
+        print(f"{'setting':<20} {'recall':>8} {'ms/query':>10}")
+        for row in recall_report(index, keys, vectors, queries, args.k, settings):
+            print(f"{row['setting']:<20} {row['recall']:>8.3f} {row['latency_ms']:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
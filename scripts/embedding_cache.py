@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Content-addressed embedding cache for the SOC2 testing platform
+Stores embeddings in SQLite keyed by a hash of text, model name and dimension
+"""
+
+import hashlib
+import sqlite3
+import time
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_CACHE_PATH = '.embedding-cache.sqlite'
+DEFAULT_MAX_ENTRIES = 100000
+
+
+def cache_key(text: str, model: str, dimension: int) -> str:
+    """Build the content address for a text/model/dimension combination"""
+    digest = hashlib.sha256()
+    digest.update(model.encode())
+    digest.update(b'\0')
+    digest.update(str(dimension).encode())
+    digest.update(b'\0')
+    digest.update(text.encode())
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent LRU cache of embeddings backed by a single SQLite file"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, model: str = '', dimension: int = 0,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.model = model
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'writes': 0}
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dimension INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)")
+        # Apply the size bound immediately in case max_entries was lowered
+        self._evict()
+        self.conn.commit()
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """Look up texts, returning {text: embedding} for every cache hit"""
+        keys = {cache_key(text, self.model, self.dimension): text for text in texts}
+        found = {}
+
+        key_list = list(keys)
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[keys[key]] = array('d', blob).tolist()
+
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, cache_key(text, self.model, self.dimension)) for text in found]
+            )
+            self.conn.commit()
+
+        self.stats['hits'] += len(found)
+        self.stats['misses'] += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, List[float]]]) -> None:
+        """Store (text, embedding) pairs and evict least recently used overflow"""
+        now = time.time()
+        rows = [
+            (cache_key(text, self.model, self.dimension), self.model, self.dimension,
+             array('d', embedding).tobytes(), now)
+            for text, embedding in entries
+        ]
+        if not rows:
+            return
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, model, dimension, embedding, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        self.stats['writes'] += len(rows)
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries beyond max_entries"""
+        if not self.max_entries:
+            return
+
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.stats['evictions'] += overflow
+
+    def __len__(self) -> int:
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return count
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def summary(self) -> str:
+        """One-line description of this run's cache activity"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        hit_rate = (self.stats['hits'] / lookups * 100) if lookups else 0.0
+        return (f"hits={self.stats['hits']} misses={self.stats['misses']} "
+                f"evictions={self.stats['evictions']} hit_rate={hit_rate:.1f}% "
+                f"entries={len(self)}")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Async embeddings client for the SOC2 testing platform
+Runs batched embedding requests concurrently within provider rate limits
+"""
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+# Status codes worth retrying: rate limited or transient server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until `amount` tokens are available, then take them"""
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self.lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """Combined requests-per-minute and tokens-per-minute limiter"""
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request until the provider's Retry-After window passes"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self, tokens: int) -> None:
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.requests:
+            await self.requests.acquire(1)
+        if self.tokens:
+            await self.tokens.acquire(tokens)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AsyncEmbeddingClient:
+    """Concurrent embeddings client sharing one keep-alive connection pool"""
+
+    def __init__(self, api_url: str, api_key: Optional[str], model: str,
+                 concurrency: int = 4, requests_per_minute: int = 0,
+                 tokens_per_minute: int = 0, retry_count: int = 5, timeout: float = 30):
+        self.api_url = api_url
+        self.model = model
+        self.headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {api_key}',
+        }
+        self.concurrency = max(1, concurrency)
+        self.retry_count = retry_count
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.semaphore = None
+        self.session = None
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'failed_batches': 0}
+
+    async def __aenter__(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                             headers=self.headers)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def embed(self, texts: List[str], tokens: int) -> List[Optional[List[float]]]:
+        """Embed one batch, returning vectors ordered by each item's `index`"""
+        async with self.semaphore:
+            for attempt in range(self.retry_count):
+                await self.limiter.acquire(tokens)
+                delay = None
+                try:
+                    self.stats['requests'] += 1
+                    async with self.session.post(
+                        self.api_url,
+                        json={'input': texts, 'model': self.model}
+                    ) as response:
+                        if response.status == 200:
+                            data = await response.json(content_type=None)
+                            embeddings = [None] * len(texts)
+                            for item in data.get('data', []):
+                                index = item.get('index')
+                                if isinstance(index, int) and 0 <= index < len(texts) and 'embedding' in item:
+                                    embeddings[index] = item['embedding']
+                            return embeddings
+
+                        body = await response.text()
+                        if response.status not in RETRYABLE_STATUS:
+                            print(f"Error {response.status}: {body}")
+                            break
+
+                        delay = parse_retry_after(response.headers.get('Retry-After'))
+                        if response.status == 429:
+                            self.stats['rate_limited'] += 1
+                            if delay is not None:
+                                self.limiter.pause(delay)
+                        print(f"Error {response.status} (attempt {attempt + 1}/{self.retry_count})")
+
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"Request error (attempt {attempt + 1}/{self.retry_count}): {e}")
+
+                if attempt < self.retry_count - 1:
+                    self.stats['retries'] += 1
+                    # Jitter Retry-After too so paused workers don't resume in lockstep
+                    if delay is not None:
+                        delay += random.uniform(0, 1)
+                    await asyncio.sleep(delay if delay is not None else backoff_delay(attempt))
+
+        self.stats['failed_batches'] += 1
+        return [None] * len(texts)
+
+    async def embed_stream(self, batches: Iterator[Tuple[Any, List[str], int]],
+                           on_done: Callable[[Any, List], None]) -> None:
+        """Embed (tag, texts, tokens) batches pulled lazily from an iterator.
+
+        Only `concurrency` batches are materialised at a time, so memory stays
+        bounded however long the iterator is. `on_done(tag, embeddings)` is
+        called as each batch finishes, in completion order.
+        """
+        async def worker():
+            for tag, texts, tokens in batches:
+                on_done(tag, await self.embed(texts, tokens))
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+In-process vector similarity index over generated embeddings
+Answers batched top-k cosine queries with NumPy, without a database round trip
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from embedding_store import SECTIONS, iter_records
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalise rows as float32; zero rows stay zero"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class EmbeddingIndex:
+    """Brute-force cosine index for one section of the generator output.
+
+    Vectors are normalised once at load time, so a query is a single matrix
+    product. Filters on tsc, cc, requires_auth and progressive are
+    precomputed boolean masks combined per query.
+    """
+
+    def __init__(self, keys: List[str], vectors: np.ndarray,
+                 metadata: Optional[List[Dict[str, Any]]] = None):
+        self.keys = list(keys)
+        self.matrix = normalize_rows(vectors)
+        self.metadata = metadata or [{} for _ in self.keys]
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        self._build_masks()
+
+    @classmethod
+    def from_file(cls, path: str, section: str = "attack_patterns") -> "EmbeddingIndex":
+        """Build an index from embeddings.npy / embeddings.json output"""
+        keys, vectors, metadata = [], [], []
+        for record in iter_records(path):
+            if record["section"] != section:
+                continue
+            keys.append(record["key"])
+            vectors.append(np.asarray(record["embedding"], dtype=np.float32))
+            metadata.append(record.get("metadata") or {})
+        if not vectors:
+            raise ValueError(f"No {section} embeddings found in {path}")
+        return cls(keys, np.vstack(vectors), metadata)
+
+    def _build_masks(self) -> None:
+        n = len(self.keys)
+        self.tsc_masks: Dict[str, np.ndarray] = {}
+        self.cc_masks: Dict[str, np.ndarray] = {}
+        self.requires_auth = np.zeros(n, dtype=bool)
+        self.progressive = np.zeros(n, dtype=bool)
+
+        for i, meta in enumerate(self.metadata):
+            for tsc in meta.get("tsc", []):
+                self.tsc_masks.setdefault(tsc, np.zeros(n, dtype=bool))[i] = True
+            for cc in meta.get("cc", []):
+                self.cc_masks.setdefault(cc, np.zeros(n, dtype=bool))[i] = True
+            self.requires_auth[i] = bool(meta.get("requires_auth"))
+            self.progressive[i] = bool(meta.get("progressive"))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def mask(self, tsc: Optional[Sequence[str]] = None, cc: Optional[Sequence[str]] = None,
+             requires_auth: Optional[bool] = None, progressive: Optional[bool] = None) -> Optional[np.ndarray]:
+        """Combine filters; tsc/cc match any listed value. None means no filter."""
+        n = len(self.keys)
+        result = None
+
+        def combine(current, extra):
+            return extra if current is None else current & extra
+
+        empty = np.zeros(n, dtype=bool)
+        if tsc:
+            result = combine(result, np.logical_or.reduce([self.tsc_masks.get(t, empty) for t in tsc]))
+        if cc:
+            result = combine(result, np.logical_or.reduce([self.cc_masks.get(c, empty) for c in cc]))
+        if requires_auth is not None:
+            result = combine(result, self.requires_auth == requires_auth)
+        if progressive is not None:
+            result = combine(result, self.progressive == progressive)
+        return result
+
+    def search(self, queries: np.ndarray, k: int = 5, **filters) -> List[List[Tuple[str, float]]]:
+        """Top-k (key, cosine similarity) for each query row.
+
+        `queries` may be a single vector or a (q, d) batch; filters are the
+        keyword arguments accepted by mask().
+        """
+        queries = normalize_rows(np.atleast_2d(queries))
+        if queries.shape[1] != self.matrix.shape[1]:
+            raise ValueError(f"Query dimension {queries.shape[1]} does not match index "
+                             f"dimension {self.matrix.shape[1]}")
+
+        scores = queries @ self.matrix.T
+        allowed = self.mask(**filters)
+        if allowed is not None:
+            scores[:, ~allowed] = -np.inf
+            k = min(k, int(allowed.sum()))
+        k = min(k, len(self.keys))
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        # argpartition finds the top k in linear time; only those k are sorted
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        return [
+            [(self.keys[j], float(s)) for j, s in zip(row, row_scores)]
+            for row, row_scores in zip(top, top_scores)
+        ]
+
+    def vector(self, key: str) -> np.ndarray:
+        """Normalised vector for a key in this index"""
+        return self.matrix[self.positions[key]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank attack patterns by cosine similarity')
+    parser.add_argument('--input', default='embeddings.npy', help='embeddings.npy or embeddings.json')
+    parser.add_argument('--query', required=True,
+                        help='Key to query with, e.g. an attack_id, TSC name or CC id')
+    parser.add_argument('--query-section', choices=SECTIONS, default='cc_descriptions',
+                        help='Section the query key belongs to')
+    parser.add_argument('--k', type=int, default=5, help='Number of results')
+    parser.add_argument('--tsc', action='append', help='Only patterns mapped to this TSC (repeatable)')
+    parser.add_argument('--cc', action='append', help='Only patterns mapped to this CC (repeatable)')
+    parser.add_argument('--requires-auth', choices=['true', 'false'])
+    parser.add_argument('--progressive', choices=['true', 'false'])
+    args = parser.parse_args()
+
+    index = EmbeddingIndex.from_file(args.input)
+    query_index = index if args.query_section == 'attack_patterns' else \
+        EmbeddingIndex.from_file(args.input, args.query_section)
+    if args.query not in query_index.positions:
+        print(f"✗ '{args.query}' not found in {args.query_section}")
+        sys.exit(1)
+
+    results = index.search(
+        query_index.vector(args.query), args.k,
+        tsc=args.tsc, cc=args.cc,
+        requires_auth=None if args.requires_auth is None else args.requires_auth == 'true',
+        progressive=None if args.progressive is None else args.progressive == 'true'
+    )[0]
+
+    print(f"Top {len(results)} attack patterns for {args.query}:")
+    for key, score in results:
+        print(f"  {score:.4f}  {key}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Quantised storage for generated embeddings
+float16, per-vector scaled int8 or product quantisation, with a retrieval quality report
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_index import normalize_rows
+from embedding_store import load_store
+
+METHODS = ("float16", "int8", "pq")
+# Fraction of vectors PQ codebooks are not trained on; the quality report is computed on these
+HOLDOUT = 0.2
+# k-means needs many training vectors per centroid (faiss warns below 39); with fewer,
+# every vector becomes its own centroid and PQ degenerates into a lookup table
+PQ_MIN_POINTS_PER_CENTROID = 39
+
+
+def quantize(matrix: np.ndarray, method: str, subvectors: int = 0, centroids: int = 256,
+             iterations: int = 15, seed: int = 0, train: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Encode a float32 matrix; returns the arrays that make up the quantised file.
+
+    PQ codebooks are fitted on the rows in `train` (all rows by default) and
+    raise ValueError when there are too few of them to fit `centroids` codes.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+
+    if method == "float16":
+        return {"codes": matrix.astype(np.float16)}
+
+    if method == "int8":
+        # Symmetric per-vector scale so each row uses the full int8 range
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return {"codes": codes, "scales": scales.astype(np.float32)}
+
+    if method == "pq":
+        n, dimension = matrix.shape
+        subvectors = subvectors or max(1, dimension // 8)
+        if dimension % subvectors:
+            raise ValueError(f"Dimension {dimension} is not divisible into {subvectors} subvectors")
+        width = dimension // subvectors
+        k = min(centroids, 256)
+        training = matrix if train is None else matrix[train]
+        if len(training) < PQ_MIN_POINTS_PER_CENTROID * k:
+            raise ValueError(f"PQ with {k} centroids needs at least {PQ_MIN_POINTS_PER_CENTROID * k} "
+                             f"training vectors, got {len(training)}")
+        rng = np.random.default_rng(seed)
+
+        codebooks = np.zeros((subvectors, k, width), dtype=np.float32)
+        codes = np.zeros((n, subvectors), dtype=np.uint8)
+        for m in range(subvectors):
+            columns = slice(m * width, (m + 1) * width)
+            block = training[:, columns]
+            book = block[rng.choice(len(block), k, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = _nearest(block, book)
+                for c in range(k):
+                    members = block[assignment == c]
+                    if len(members):
+                        book[c] = members.mean(axis=0)
+            codebooks[m] = book
+            codes[:, m] = _nearest(matrix[:, columns], book)
+        return {"codes": codes, "codebooks": codebooks}
+
+    raise ValueError(f"Unknown quantisation method {method}; expected one of {METHODS}")
+
+
+def _nearest(block: np.ndarray, book: np.ndarray) -> np.ndarray:
+    distances = (block ** 2).sum(axis=1)[:, None] - 2 * block @ book.T + (book ** 2).sum(axis=1)[None, :]
+    return np.argmin(distances, axis=1)
+
+
+def dequantize(arrays: Dict[str, np.ndarray], method: str) -> np.ndarray:
+    """Decode quantised arrays back to a float32 matrix"""
+    codes = arrays["codes"]
+    if method == "float16":
+        return codes.astype(np.float32)
+    if method == "int8":
+        return codes.astype(np.float32) * arrays["scales"][:, None]
+    if method == "pq":
+        codebooks = arrays["codebooks"]
+        blocks = [codebooks[m][codes[:, m]] for m in range(codebooks.shape[0])]
+        return np.hstack(blocks).astype(np.float32)
+    raise ValueError(f"Unknown quantisation method {method}; expected one of {METHODS}")
+
+
+def quantized_path(matrix_path: str, method: str) -> str:
+    """e.g. embeddings.npy -> embeddings.int8.npz"""
+    base, _ = os.path.splitext(matrix_path)
+    return f"{base}.{method}.npz"
+
+
+def write_quantized(path: str, matrix: np.ndarray, method: str, **params) -> Dict[str, int]:
+    """Quantise and save; returns the size in bytes of each encoded array (codes, scales, codebooks)"""
+    arrays = quantize(matrix, method, **params)
+    np.savez(path, method=np.array(method), **arrays)
+    return {name: a.nbytes for name, a in arrays.items()}
+
+
+def load_quantized(path: str) -> np.ndarray:
+    """Read a quantised file and return the dequantised float32 matrix"""
+    data = np.load(path, allow_pickle=False)
+    method = str(data["method"])
+    return dequantize({name: data[name] for name in data.files if name != "method"}, method)
+
+
+def quality_report(baseline: np.ndarray, approx: np.ndarray, records: List[Dict[str, Any]],
+                   k: int = 5) -> List[Dict[str, Any]]:
+    """Top-k overlap and cosine score drift of `approx` vs the float32 baseline.
+
+    Attack patterns, TSC and CC descriptions each act as queries against the
+    attack pattern set, mirroring how the platform ranks patterns.
+    """
+    base = normalize_rows(baseline)
+    quant = normalize_rows(approx)
+    targets = np.array([i for i, r in enumerate(records) if r["section"] == "attack_patterns"])
+    if len(targets) == 0:
+        return []
+    k = min(k, len(targets))
+
+    rows = []
+    for section in ("attack_patterns", "tsc_descriptions", "cc_descriptions"):
+        queries = np.array([i for i, r in enumerate(records) if r["section"] == section])
+        if len(queries) == 0:
+            continue
+        exact = base[queries] @ base[targets].T
+        approx_scores = quant[queries] @ quant[targets].T
+        exact_top = np.argsort(-exact, axis=1)[:, :k]
+        approx_top = np.argsort(-approx_scores, axis=1)[:, :k]
+        overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(exact_top, approx_top)])
+        drift = np.abs(exact - approx_scores)
+        rows.append({
+            "queries": section,
+            "count": len(queries),
+            "topk_overlap": float(overlap),
+            "mean_score_drift": float(drift.mean()),
+            "max_score_drift": float(drift.max()),
+        })
+    return rows
+
+
+def evaluate(baseline: np.ndarray, method: str, records: List[Dict[str, Any]], k: int = 5,
+             holdout: float = HOLDOUT, seed: int = 0, **params) -> Tuple[List[Dict[str, Any]], str]:
+    """quality_report() on vectors the quantiser was not fitted to; returns (rows, what was evaluated).
+
+    float16 and int8 encode each vector on its own, so every vector is fair
+    game. PQ codebooks are refitted without a random `holdout` fraction and
+    only those held-out vectors are scored, as new patterns would be.
+    """
+    if method != "pq":
+        approx = dequantize(quantize(baseline, method), method)
+        return quality_report(baseline, approx, records, k), f"all {len(baseline)} vectors"
+    order = np.random.default_rng(seed).permutation(len(baseline))
+    held_out = np.sort(order[:max(1, int(len(baseline) * holdout))])
+    train = np.sort(order[len(held_out):])
+    approx = dequantize(quantize(baseline, method, seed=seed, train=train, **params), method)
+    rows = quality_report(baseline[held_out], approx[held_out], [records[i] for i in held_out], k)
+    return rows, f"{len(held_out)} held-out vectors"
+
+
+def write_evaluated(path: str, baseline: np.ndarray, method: str, records: List[Dict[str, Any]], k: int = 5,
+                    **params) -> Tuple[Dict[str, int], List[Dict[str, Any]], str]:
+    """evaluate() then write_quantized(); returns (sizes, rows, what was evaluated).
+
+    Evaluation runs first because PQ is refitted on the training split
+    there, which needs more vectors than fitting on all of them. Either step
+    raises ValueError when the method does not apply, before anything is
+    written.
+    """
+    rows, evaluated = evaluate(baseline, method, records, k, **params)
+    sizes = write_quantized(path, baseline, method, **params)
+    return sizes, rows, evaluated
+
+
+def print_report(method: str, baseline: np.ndarray, sizes: Dict[str, int],
+                 rows: List[Dict[str, Any]], k: int, evaluated: str = '') -> None:
+    encoded_bytes = sum(sizes.values())
+    ratio = baseline.astype(np.float32).nbytes / max(1, encoded_bytes)
+    parts = " + ".join(f"{name} {size:,}" for name, size in sizes.items())
+    print(f"Quantisation: {method} — {encoded_bytes:,} bytes ({parts}; {ratio:.1f}× smaller than float32)")
+    if evaluated:
+        print(f"  quality measured on {evaluated}")
+    print(f"  {'queries':<18} {'n':>4} {'top-' + str(k) + ' overlap':>14} {'mean drift':>11} {'max drift':>10}")
+    for row in rows:
+        print(f"  {row['queries']:<18} {row['count']:>4} {row['topk_overlap']:>14.3f} "
+              f"{row['mean_score_drift']:>11.5f} {row['max_score_drift']:>10.5f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quantise embeddings and report retrieval quality')
+    parser.add_argument('--input', default='embeddings.npy', help='Binary store written by generate-embeddings.py')
+    parser.add_argument('--method', choices=METHODS, action='append',
+                        help='Quantisation method (repeatable; default: all)')
+    parser.add_argument('--subvectors', type=int, default=0, help='PQ subvectors (default: dimension / 8)')
+    parser.add_argument('--centroids', type=int, default=256, help='PQ centroids per subvector (max 256)')
+    parser.add_argument('--k', type=int, default=5, help='Top-k used for the overlap report')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"✗ {args.input} not found. Run generate-embeddings.py with --format npy first")
+        sys.exit(1)
+
+    store = load_store(args.input)
+    baseline = np.asarray(store.matrix, dtype=np.float32)
+    for method in args.method or METHODS:
+        path = quantized_path(args.input, method)
+        params = {"subvectors": args.subvectors, "centroids": args.centroids} if method == "pq" else {}
+        try:
+            sizes, rows, evaluated = write_evaluated(path, baseline, method, store.records, args.k, **params)
+        except ValueError as e:
+            print(f"Quantisation: {method} — not applicable: {e}")
+            continue
+        print_report(method, baseline, sizes, rows, args.k, evaluated)
+        print(f"  ✓ saved to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Dimension handling for the embedding pipeline
+Vectorised deterministic mock embeddings and reducers from model to schema dimension
+"""
+
+import hashlib
+from typing import Optional, Sequence
+
+import numpy as np
+
+REDUCERS = ("truncate", "pca")
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _splitmix64(state: np.ndarray) -> np.ndarray:
+    """SplitMix64 output function applied elementwise to uint64 counters"""
+    z = state + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _MIX1
+    z = (z ^ (z >> np.uint64(27))) * _MIX2
+    return z ^ (z >> np.uint64(31))
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def mock_embeddings(texts: Sequence[str], dimension: int) -> np.ndarray:
+    """Deterministic unit-length mock embeddings for a batch of texts.
+
+    Each text seeds an independent SplitMix64 stream from its SHA-256 digest.
+    The (len(texts), dimension) matrix is produced in one vectorised pass.
+    """
+    seeds = np.array(
+        [int.from_bytes(hashlib.sha256(t.encode()).digest()[:8], 'little') for t in texts],
+        dtype=np.uint64
+    )
+    with np.errstate(over='ignore'):
+        counters = seeds[:, None] + np.arange(dimension, dtype=np.uint64)[None, :] * _GOLDEN
+        bits = _splitmix64(counters)
+    # Top 53 bits -> uniform [0, 1) -> [-1, 1)
+    values = (bits >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53)) * 2.0 - 1.0
+    return normalize(values).astype(np.float32)
+
+
+class TruncateReducer:
+    """Keep the leading components and renormalise.
+
+    Suited to models trained so that prefixes remain meaningful; for others
+    prefer PCA.
+    """
+
+    name = "truncate"
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def needs_fit(self) -> bool:
+        return False
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        return normalize(np.atleast_2d(vectors)[:, :self.dimension].astype(np.float32))
+
+
+class PCAReducer:
+    """Project onto the top principal components, fitted with streaming moments.
+
+    Only the running sum and d×d scatter matrix are kept while fitting, so
+    memory does not depend on the number of vectors.
+    """
+
+    name = "pca"
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self._count = 0
+        self._sum: Optional[np.ndarray] = None
+        self._scatter: Optional[np.ndarray] = None
+
+    def needs_fit(self) -> bool:
+        return self.components is None
+
+    def partial_fit(self, vectors: np.ndarray) -> None:
+        vectors = np.atleast_2d(vectors).astype(np.float64)
+        if self._sum is None:
+            self._sum = np.zeros(vectors.shape[1])
+            self._scatter = np.zeros((vectors.shape[1], vectors.shape[1]))
+        self._count += len(vectors)
+        self._sum += vectors.sum(axis=0)
+        self._scatter += vectors.T @ vectors
+
+    def finish_fit(self) -> int:
+        """Solve for the components; returns the number of samples used"""
+        if not self._count:
+            raise ValueError("PCA reducer has no samples to fit")
+        self.mean = self._sum / self._count
+        covariance = self._scatter / self._count - np.outer(self.mean, self.mean)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        order = np.argsort(eigenvalues)[::-1][:self.dimension]
+        self.components = eigenvectors[:, order].T.astype(np.float32)
+        self.mean = self.mean.astype(np.float32)
+        self._sum = self._scatter = None
+        return self._count
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.atleast_2d(vectors).astype(np.float32)
+        return normalize((vectors - self.mean) @ self.components.T)
+
+    def save(self, path: str) -> None:
+        np.savez(path, mean=self.mean, components=self.components)
+
+    @classmethod
+    def load(cls, path: str) -> "PCAReducer":
+        data = np.load(path, allow_pickle=False)
+        reducer = cls(data["components"].shape[0])
+        reducer.mean = data["mean"]
+        reducer.components = data["components"]
+        return reducer
+
+
+def make_reducer(name: str, dimension: int):
+    if name == "truncate":
+        return TruncateReducer(dimension)
+    if name == "pca":
+        return PCAReducer(dimension)
+    raise ValueError(f"Unknown reducer {name}; expected one of {REDUCERS}")
+
+
+def conform(vector: Sequence[float], dimension: int, reducer) -> np.ndarray:
+    """Bring one vector to the target dimension, or raise if it is too short"""
+    vector = np.asarray(vector, dtype=np.float32)
+    if len(vector) == dimension:
+        return vector
+    if len(vector) < dimension:
+        raise ValueError(f"Embedding has {len(vector)} dimensions, fewer than the target {dimension}")
+    return reducer.transform(vector)[0]
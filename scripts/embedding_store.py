@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Compact binary embedding store for the SOC2 testing platform
+Embeddings live in one contiguous .npy matrix; ids, texts and metadata in a JSON sidecar
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+SECTIONS = ("attack_patterns", "tsc_descriptions", "cc_descriptions")
+SUPPORTED_DTYPES = ("float32", "float16")
+
+
+def sidecar_path(matrix_path: str) -> str:
+    """Sidecar file that accompanies a matrix, e.g. embeddings.npy -> embeddings.meta.json"""
+    base, _ = os.path.splitext(matrix_path)
+    return base + ".meta.json"
+
+
+def _atomic_write(path: str, write, mode: str = 'wb') -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EmbeddingStore:
+    """Read-only view over a matrix + sidecar pair, memory-mapped by default"""
+
+    def __init__(self, matrix_path: str, mmap: bool = True):
+        self.matrix_path = matrix_path
+        with open(sidecar_path(matrix_path)) as f:
+            sidecar = json.load(f)
+        self.metadata = sidecar["metadata"]
+        self.records: List[Dict[str, Any]] = sidecar["records"]
+        self.matrix = np.load(matrix_path, mmap_mode='r' if mmap else None, allow_pickle=False)
+        self.index: Dict[Tuple[str, str], int] = {
+            (r["section"], r["key"]): i for i, r in enumerate(self.records)
+        }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def rows(self, section: str) -> List[int]:
+        """Row numbers belonging to one section, e.g. attack_patterns"""
+        return [i for i, r in enumerate(self.records) if r["section"] == section]
+
+    def get(self, section: str, key: str) -> Optional[np.ndarray]:
+        """Embedding row for a key (a view into the mapped matrix), or None"""
+        i = self.index.get((section, key))
+        return None if i is None else self.matrix[i]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rebuild the legacy embeddings.json structure"""
+        data = {"metadata": dict(self.metadata)}
+        for section in SECTIONS:
+            data[section] = {}
+        for i, record in enumerate(self.records):
+            entry = {"text": record["text"], "embedding": self.matrix[i].astype(float).tolist()}
+            if "metadata" in record:
+                entry["metadata"] = record["metadata"]
+            data.setdefault(record["section"], {})[record["key"]] = entry
+        return data
+
+
+def load_store(matrix_path: str, mmap: bool = True) -> EmbeddingStore:
+    """Open a binary embedding store without parsing the vectors as text"""
+    return EmbeddingStore(matrix_path, mmap)
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream {section, key, text, embedding, metadata?} records from .npy or .json output"""
+    if path.endswith(".npy"):
+        store = load_store(path)
+        for i, record in enumerate(store.records):
+            yield {**record, "embedding": store.matrix[i]}
+        return
+
+    data = load_embeddings(path)
+    for section in SECTIONS:
+        for key, entry in data.get(section, {}).items():
+            yield {"section": section, "key": key, **entry}
+
+
+def load_embeddings(path: str) -> Dict[str, Any]:
+    """Load embeddings in the legacy dict shape from either .npy or .json output"""
+    if path.endswith(".npy"):
+        return load_store(path).to_dict()
+    with open(path) as f:
+        return json.load(f)
+
+
+class EmbeddingCheckpoint:
+    """Append-only JSONL log of finished embeddings, used to stream and resume runs.
+
+    Each line is one record ({section, key, text, embedding, metadata?, mock?}).
+    Appends are fsynced every `flush_every` records and on close, so a crash
+    loses at most that many. A later line for the same (section, key)
+    supersedes earlier ones. Records marked `mock` (fallbacks for failed API
+    calls) still reach the outputs but are not counted as done, so a resumed
+    run asks the API for them again.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100):
+        self.path = path
+        self.flush_every = flush_every
+        self.file = None
+        self.pending = 0
+        self.retryable = 0
+
+    def completed(self) -> Set[Tuple[str, str, str]]:
+        """(section, key, text digest) for every real (non-mock) record already on disk.
+
+        A torn final line left by a crash is truncated away so appends resume
+        from the last complete record.
+        """
+        done = set()
+        self.retryable = 0
+        if not os.path.exists(self.path):
+            return done
+
+        good_offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                ident = (record["section"], record["key"], text_digest(record["text"]))
+                if record.get("mock"):
+                    self.retryable += 1
+                    done.discard(ident)
+                else:
+                    done.add(ident)
+                good_offset += len(line)
+
+        if good_offset != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_offset)
+        return done
+
+    def open(self, resume: bool = True) -> None:
+        self.file = open(self.path, 'a' if resume else 'w')
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.file.write(json.dumps(record) + "\n")
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.file and self.pending:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.pending = 0
+
+    def close(self) -> None:
+        if self.file:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+    def remove(self) -> None:
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def latest(self, wanted: Optional[Set[Tuple[str, str]]] = None) -> Tuple[List[int], Set[int]]:
+        """Line numbers of the newest record per (section, key), plus the dimensions seen.
+
+        Records whose key is not in `wanted` (e.g. removed from the catalog)
+        are skipped. Only line numbers are kept, never vectors.
+        """
+        newest: Dict[Tuple[str, str], int] = {}
+        dimensions: Dict[Tuple[str, str], int] = {}
+        for lineno, record in enumerate(self._iter_lines()):
+            ident = (record["section"], record["key"])
+            if wanted is not None and ident not in wanted:
+                continue
+            newest[ident] = lineno
+            dimensions[ident] = len(record["embedding"])
+        return sorted(newest.values()), set(dimensions.values())
+
+    def records(self, lines: Iterable[int]) -> Iterator[Dict[str, Any]]:
+        """Stream the records at the given (sorted) line numbers"""
+        wanted = iter(lines)
+        target = next(wanted, None)
+        for lineno, record in enumerate(self._iter_lines()):
+            if target is None:
+                return
+            if lineno == target:
+                yield record
+                target = next(wanted, None)
+
+    def _iter_lines(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def write_store_streaming(matrix_path: str, records: Iterable[Dict[str, Any]], count: int,
+                          dimension: int, metadata: Dict[str, Any], dtype: str = "float32") -> int:
+    """Write matrix + sidecar from `count` streamed records, one row at a time.
+
+    The matrix is filled through a memory-mapped .npy file and the sidecar is
+    written incrementally, so memory use does not grow with the catalog.
+    Raises ValueError, leaving any previous output in place, if a record's
+    embedding does not have `dimension` components.
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype {dtype}; expected one of {SUPPORTED_DTYPES}")
+
+    tmp_matrix = matrix_path + ".tmp"
+    matrix = np.lib.format.open_memmap(tmp_matrix, mode='w+', dtype=dtype,
+                                       shape=(count, dimension))
+
+    def write_sidecar(f):
+        header = {
+            **metadata,
+            "dtype": dtype,
+            "count": count,
+            "dimension": dimension,
+            "matrix": os.path.basename(matrix_path)
+        }
+        f.write('{"metadata": ' + json.dumps(header) + ', "records": [')
+        for i, record in enumerate(records):
+            if len(record["embedding"]) != dimension:
+                raise ValueError(f"Embedding for {record['section']}/{record['key']} has "
+                                 f"{len(record['embedding'])} dimensions, expected {dimension}")
+            matrix[i] = record["embedding"]
+            row = {"section": record["section"], "key": record["key"], "text": record["text"]}
+            if record.get("metadata") is not None:
+                row["metadata"] = record["metadata"]
+            f.write((", " if i else "") + json.dumps(row))
+        f.write(']}')
+
+    try:
+        _atomic_write(sidecar_path(matrix_path) + ".pending", write_sidecar, 'w')
+    except ValueError:
+        del matrix
+        for leftover in (tmp_matrix, sidecar_path(matrix_path) + ".pending.tmp"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+    matrix.flush()
+    del matrix
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(sidecar_path(matrix_path) + ".pending", sidecar_path(matrix_path))
+    return count
+
+
+def write_json_streaming(json_path: str, records: Callable[[], Iterable[Dict[str, Any]]],
+                         metadata: Dict[str, Any]) -> int:
+    """Write the legacy embeddings.json layout one record at a time.
+
+    `records` is called once per section, so it must return a fresh iterator.
+    """
+    written = [0]
+
+    def write(f):
+        f.write('{"metadata": ' + json.dumps(metadata))
+        for section in SECTIONS:
+            f.write(', ' + json.dumps(section) + ': {')
+            first = True
+            for record in records():
+                if record["section"] != section:
+                    continue
+                embedding = record["embedding"]
+                entry = {"text": record["text"],
+                         "embedding": embedding.tolist() if hasattr(embedding, "tolist") else embedding}
+                if record.get("metadata") is not None:
+                    entry["metadata"] = record["metadata"]
+                f.write(('' if first else ', ') + json.dumps(record["key"]) + ': ' + json.dumps(entry))
+                first = False
+                written[0] += 1
+            f.write('}')
+        f.write('}')
+
+    _atomic_write(json_path, write, 'w')
+    return written[0]
@@ -4,15 +4,25 @@ Generate embeddings for SOC2 testing platform
 Loads attack patterns and generates embeddings using OpenAI
 """
 
-import json
-import requests
+import asyncio
 import sys
-import time
-import hashlib
 import os
-from typing import List, Dict, Any
+import argparse
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from collections import Counter
 from datetime import datetime
 
+import numpy as np
+
+from embedding_client import AsyncEmbeddingClient
+from embedding_store import (
+    EmbeddingCheckpoint, write_store_streaming, write_json_streaming, text_digest, SUPPORTED_DTYPES
+)
+from embedding_reduce import mock_embeddings, make_reducer, conform, REDUCERS
+from embedding_quantize import write_evaluated, print_report, quantized_path, METHODS as QUANTIZE_METHODS
+from pgvector_bulk import write_sql_script, CONTROL_TYPES
+from embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES
+
 # Try to load from .env file
 try:
     from dotenv import load_dotenv
@@ -23,7 +33,35 @@ except ImportError:
 # Configuration
 EMBEDDING_API_URL = os.getenv('EMBEDDING_API_URL', 'https://api.openai.com/v1/embeddings')
 MODEL_NAME = 'text-embedding-ada-002'
+# Native dimension returned by the model (part of the cache key)
+MODEL_DIMENSION = int(os.getenv('EMBEDDING_MODEL_DIMENSION', '1536'))
+# Every vector written by a run has this dimension; matches vector(768) in database/init.sql
+TARGET_DIMENSION = int(os.getenv('EMBEDDING_DIMENSION', '768'))
+# How real embeddings larger than the target are reduced: truncate or pca
+REDUCER = os.getenv('EMBEDDING_REDUCER', 'truncate')
 OUTPUT_FILE = 'embeddings.json'
+OUTPUT_STORE = 'embeddings.npy'
+# Fitted PCA projection, saved so queries can be projected the same way
+OUTPUT_PCA = 'embeddings.pca.npz'
+# npy (binary matrix + sidecar), json (legacy, opt-in) or both. The backend's attack mapping
+# loads embeddings.npy + embeddings.meta.json when present and embeddings.json otherwise
+OUTPUT_FORMAT = os.getenv('EMBEDDING_OUTPUT_FORMAT', 'npy')
+OUTPUT_DTYPE = os.getenv('EMBEDDING_OUTPUT_DTYPE', 'float32')
+# Append-only log of finished embeddings; removed once outputs are finalised
+CHECKPOINT_FILE = os.getenv('EMBEDDING_CHECKPOINT_FILE', 'embeddings.partial.jsonl')
+
+# Batching: inputs per embeddings request and a rough token budget per request
+BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '100'))
+BATCH_TOKEN_BUDGET = int(os.getenv('EMBEDDING_BATCH_TOKENS', '8000'))
+
+# Content-addressed cache so unchanged texts are never re-embedded
+CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH', DEFAULT_CACHE_PATH)
+CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', str(DEFAULT_MAX_ENTRIES)))
+
+# Concurrency and provider quota (0 = unlimited) for the async client
+CONCURRENCY = int(os.getenv('EMBEDDING_CONCURRENCY', '4'))
+REQUESTS_PER_MINUTE = int(os.getenv('EMBEDDING_RPM', '3000'))
+TOKENS_PER_MINUTE = int(os.getenv('EMBEDDING_TPM', '1000000'))
 
 # Get OpenAI API key from environment
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -156,74 +194,177 @@ CC_DESCRIPTIONS = {
 }
 
 
-def generate_embedding(text: str, retry_count: int = 3) -> List[float]:
-    """Generate embedding for given text using OpenAI API"""
-    headers = {
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {OPENAI_API_KEY}',
+PATTERNS_BY_ID = {pattern["attack_id"]: pattern for pattern in ATTACK_PATTERNS}
+
+
+def catalog_items() -> Iterator[Tuple[str, str, str]]:
+    """Yield (section, key, text) for every attack pattern, TSC and CC description"""
+    for pattern in ATTACK_PATTERNS:
+        # Create comprehensive text for embedding
+        yield "attack_patterns", pattern["attack_id"], f"{pattern['attack_name']}: {pattern['description']}"
+    for tsc, description in TSC_DESCRIPTIONS.items():
+        yield "tsc_descriptions", tsc, description
+    for cc, description in CC_DESCRIPTIONS.items():
+        yield "cc_descriptions", cc, description
+
+
+def pattern_metadata(pattern: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata stored alongside an attack pattern embedding"""
+    return {
+        "attack_name": pattern["attack_name"],
+        "description": pattern["description"],
+        "attack_type": pattern["attack_type"],
+        "tsc": pattern["tsc"],
+        "cc": pattern["cc"],
+        "requires_auth": pattern["requires_auth"],
+        "progressive": pattern["progressive"]
     }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) used for batch budgeting"""
+    return max(1, len(text) // 4)
+
+
+def make_batches(items: List[Tuple[Any, str]], batch_size: int = BATCH_SIZE,
+                 token_budget: int = BATCH_TOKEN_BUDGET) -> Iterator[List[Tuple[Any, str]]]:
+    """Split (key, text) items into batches bounded by size and token budget"""
+    batch = []
+    batch_tokens = 0
+
+    for key, text in items:
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= batch_size or batch_tokens + tokens > token_budget):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append((key, text))
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
+
+
+# Texts looked up in the cache per round trip when streaming items
+CACHE_LOOKUP_CHUNK = 500
+
+
+def embed_items(items: Iterable[Tuple[Any, str]],
+                on_result: Callable[[Any, str, List[float], bool], None],
+                batch_size: int = BATCH_SIZE,
+                token_budget: int = BATCH_TOKEN_BUDGET,
+                cache: Optional[EmbeddingCache] = None,
+                concurrency: int = CONCURRENCY,
+                requests_per_minute: int = REQUESTS_PER_MINUTE,
+                tokens_per_minute: int = TOKENS_PER_MINUTE,
+                dimension: int = TARGET_DIMENSION) -> Dict[str, int]:
+    """Embed (key, text) items in batches, falling back to mock embeddings.
+
+    Items are consumed lazily and each embedding is handed to
+    `on_result(key, text, embedding, mocked)` as soon as it exists, so memory does
+    not grow with the number of items. When a cache is given, only texts
+    missing from it are sent to the API and successful API results are
+    written back. Mock fallbacks are never cached.
+    """
+    counts = {'cached': 0, 'embedded': 0, 'mocked': 0, 'batches': 0}
     
-    for attempt in range(retry_count):
-        try:
-            response = requests.post(
-                EMBEDDING_API_URL,
-                json={
-                    'input': text,
-                    'model': MODEL_NAME
-                },
-                headers=headers,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if 'data' in data and len(data['data']) > 0 and 'embedding' in data['data'][0]:
-                    return data['data'][0]['embedding']
+    def pending_items() -> Iterator[Tuple[Any, str]]:
+        items_iter = iter(items)
+        while True:
+            chunk = [item for _, item in zip(range(CACHE_LOOKUP_CHUNK), items_iter)]
+            if not chunk:
+                return
+            cached = cache.get_many(text for _, text in chunk) if cache is not None else {}
+            for key, text in chunk:
+                if text in cached:
+                    counts['cached'] += 1
+                    on_result(key, text, cached[text], False)
                 else:
-                    print(f"Warning: No embedding in response for text: {text[:50]}...")
-                    return None
+                    yield key, text
+    
+    def tagged_batches() -> Iterator[Tuple[List[Tuple[Any, str]], List[str], int]]:
+        for batch in make_batches(pending_items(), batch_size, token_budget):
+            yield batch, [text for _, text in batch], sum(estimate_tokens(text) for _, text in batch)
+    
+    def on_done(batch: List[Tuple[Any, str]], embeddings: List[Optional[List[float]]]):
+        counts['batches'] += 1
+        print(f"[{counts['batches']}] Embedded batch of {len(batch)} inputs")
+        if cache is not None:
+            cache.put_many((text, embedding) for (_, text), embedding in zip(batch, embeddings) if embedding)
+        failed = [text for (_, text), embedding in zip(batch, embeddings) if not embedding]
+        mocks = iter(mock_embeddings(failed, dimension).tolist()) if failed else iter(())
+        for (key, text), embedding in zip(batch, embeddings):
+            mocked = not embedding
+            if mocked:
+                counts['mocked'] += 1
+                embedding = next(mocks)
             else:
-                print(f"Error {response.status_code}: {response.text}")
-                
-        except requests.exceptions.RequestException as e:
-            print(f"Request error (attempt {attempt + 1}/{retry_count}): {e}")
-            if attempt < retry_count - 1:
-                time.sleep(2 ** attempt)  # Exponential backoff
-                
-    return None
-
-
-def generate_mock_embedding(text: str, dimension: int = 768) -> List[float]:
-    """Generate deterministic mock embedding for development"""
-    # Create hash of text
-    text_hash = hashlib.sha256(text.encode()).digest()
+                counts['embedded'] += 1
+            on_result(key, text, embedding, mocked)
     
-    # Generate deterministic values
-    embedding = []
-    for i in range(dimension):
-        # Use hash bytes to generate values between -1 and 1
-        byte_val = text_hash[i % len(text_hash)]
-        embedding.append((byte_val - 128) / 128)
+    async def run():
+        async with AsyncEmbeddingClient(EMBEDDING_API_URL, OPENAI_API_KEY, MODEL_NAME, concurrency,
+                                        requests_per_minute, tokens_per_minute) as client:
+            await client.embed_stream(tagged_batches(), on_done)
+            stats = client.stats
+            print(f"Requests: {stats['requests']} (retries={stats['retries']}, "
+                  f"rate_limited={stats['rate_limited']}, failed_batches={stats['failed_batches']})")
     
-    return embedding
+    asyncio.run(run())
+    return counts
+
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Generate embeddings for SOC2 testing platform')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help='Maximum inputs per embeddings request')
+    parser.add_argument('--batch-tokens', type=int, default=BATCH_TOKEN_BUDGET,
+                        help='Approximate token budget per embeddings request')
+    parser.add_argument('--cache-path', default=CACHE_PATH,
+                        help='SQLite file used to cache embeddings between runs')
+    parser.add_argument('--cache-max-entries', type=int, default=CACHE_MAX_ENTRIES,
+                        help='Evict least recently used cache entries beyond this count (0 = unbounded)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-embed every text without reading or writing the cache')
+    parser.add_argument('--format', choices=['npy', 'json', 'both'], default=OUTPUT_FORMAT,
+                        help='Output format: binary matrix + JSON sidecar, legacy JSON, or both')
+    parser.add_argument('--dtype', choices=SUPPORTED_DTYPES, default=OUTPUT_DTYPE,
+                        help='Element type of the binary embedding matrix')
+    parser.add_argument('--dimension', type=int, default=TARGET_DIMENSION,
+                        help='Dimension of every written vector (must match the database schema)')
+    parser.add_argument('--reducer', choices=REDUCERS, default=REDUCER,
+                        help='Reduce larger model embeddings by truncation or a fitted PCA projection')
+    parser.add_argument('--quantize', choices=QUANTIZE_METHODS, action='append', default=[],
+                        help='Also write a quantised copy (float16, int8 or pq) with a quality report; repeatable')
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE,
+                        help='Append-only JSONL file that finished embeddings are streamed to')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='Ignore an existing checkpoint and embed everything again')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY,
+                        help='Maximum embeddings requests in flight')
+    parser.add_argument('--rpm', type=int, default=REQUESTS_PER_MINUTE,
+                        help='Requests per minute quota (0 = unlimited)')
+    parser.add_argument('--tpm', type=int, default=TOKENS_PER_MINUTE,
+                        help='Tokens per minute quota (0 = unlimited)')
+    return parser.parse_args()
 
 
 def main():
     """Main function to generate embeddings"""
+    args = parse_args()
+    
     print(f"Generating embeddings using {MODEL_NAME}")
     print(f"API URL: {EMBEDDING_API_URL}")
+    print(f"Batch size: {args.batch_size} inputs / ~{args.batch_tokens} tokens")
+    print(f"Concurrency: {args.concurrency} in flight, quota {args.rpm} RPM / {args.tpm} TPM")
     print("-" * 50)
     
-    embeddings_data = {
-        "metadata": {
-            "generated_at": datetime.now().isoformat(),
-            "model": MODEL_NAME,
-            "total_patterns": len(ATTACK_PATTERNS),
-            "api_url": EMBEDDING_API_URL
-        },
-        "attack_patterns": {},
-        "tsc_descriptions": {},
-        "cc_descriptions": {}
+    metadata = {
+        "generated_at": datetime.now().isoformat(),
+        "model": MODEL_NAME,
+        "total_patterns": len(ATTACK_PATTERNS),
+        "api_url": EMBEDDING_API_URL
     }
     
     # Check if OpenAI API key is available
@@ -234,122 +375,135 @@ def main():
     
     print("-" * 50)
     
-    # Generate embeddings for attack patterns
-    print("Generating attack pattern embeddings...")
-    for i, pattern in enumerate(ATTACK_PATTERNS):
-        print(f"[{i+1}/{len(ATTACK_PATTERNS)}] {pattern['attack_name']}")
-        
-        # Create comprehensive text for embedding
-        pattern_text = f"{pattern['attack_name']}: {pattern['description']}"
-        
-        embedding = generate_embedding(pattern_text)
-        if not embedding:
-            embedding = generate_mock_embedding(pattern_text)
-        
-        if embedding:
-            embeddings_data["attack_patterns"][pattern["attack_id"]] = {
-                "text": pattern_text,
-                "embedding": embedding,
-                "metadata": {
-                    "attack_type": pattern["attack_type"],
-                    "tsc": pattern["tsc"],
-                    "cc": pattern["cc"],
-                    "requires_auth": pattern["requires_auth"],
-                    "progressive": pattern["progressive"]
-                }
-            }
-        else:
-            print(f"  ⚠ Failed to generate embedding")
+    # Resume from the checkpoint unless asked to start over
+    checkpoint = EmbeddingCheckpoint(args.checkpoint, flush_every=args.batch_size)
+    done = set() if args.no_resume else checkpoint.completed()
+    if done:
+        print(f"Resuming from {args.checkpoint}: {len(done)} embeddings already written")
+    if checkpoint.retryable and not args.no_resume:
+        print(f"Retrying {checkpoint.retryable} mock fallbacks from the previous run")
+    checkpoint.open(resume=not args.no_resume)
     
-    # Generate embeddings for TSC descriptions
-    print("\nGenerating TSC embeddings...")
-    for tsc, description in TSC_DESCRIPTIONS.items():
-        print(f"- {tsc}")
-        
-        embedding = generate_embedding(description)
-        if not embedding:
-            embedding = generate_mock_embedding(description)
-            
-        if embedding:
-            embeddings_data["tsc_descriptions"][tsc] = {
-                "text": description,
-                "embedding": embedding
-            }
+    # Attack, TSC and CC texts share batches; unchanged finished texts are skipped
+    items = (
+        ((section, key), text) for section, key, text in catalog_items()
+        if (section, key, text_digest(text)) not in done
+    )
     
-    # Generate embeddings for CC descriptions
-    print("\nGenerating CC embeddings...")
-    for cc, description in CC_DESCRIPTIONS.items():
-        print(f"- {cc}")
-        
-        embedding = generate_embedding(description)
-        if not embedding:
-            embedding = generate_mock_embedding(description)
-            
-        if embedding:
-            embeddings_data["cc_descriptions"][cc] = {
-                "text": description,
-                "embedding": embedding
-            }
+    def on_result(ident: Tuple[str, str], text: str, embedding: List[float], mocked: bool):
+        section, key = ident
+        record = {"section": section, "key": key, "text": text, "embedding": embedding}
+        if section == "attack_patterns":
+            record["metadata"] = pattern_metadata(PATTERNS_BY_ID[key])
+        if mocked:
+            record["mock"] = True  # Not done: a resumed run asks the API again
+        checkpoint.append(record)
+    
+    cache = None
+    if not args.no_cache:
+        cache = EmbeddingCache(args.cache_path, MODEL_NAME, MODEL_DIMENSION, args.cache_max_entries)
+    
+    print("Generating embeddings...")
+    try:
+        counts = embed_items(items, on_result, args.batch_size, args.batch_tokens, cache,
+                             args.concurrency, args.rpm, args.tpm, args.dimension)
+        print(f"Embedded {counts['embedded']}, cached {counts['cached']}, mocked {counts['mocked']}")
+    finally:
+        checkpoint.close()
+        if cache is not None:
+            print(f"Cache ({args.cache_path}): {cache.summary()}")
+            cache.close()
     
-    # Save to file
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(embeddings_data, f, indent=2)
+    # Finalise: stream the newest record per catalog entry into the outputs
+    wanted = {(section, key) for section, key, _ in catalog_items()}
+    lines, dimensions = checkpoint.latest(wanted)
+    section_counts = Counter(record["section"] for record in checkpoint.records(lines))
     
     print("-" * 50)
-    print(f"✓ Embeddings saved to {OUTPUT_FILE}")
-    print(f"  - Attack patterns: {len(embeddings_data['attack_patterns'])}")
-    print(f"  - TSC descriptions: {len(embeddings_data['tsc_descriptions'])}")
-    print(f"  - CC descriptions: {len(embeddings_data['cc_descriptions'])}")
+    
+    # Enforce one dimension per run: larger model vectors go through the reducer
+    if any(d < args.dimension for d in dimensions):
+        print(f"✗ Embeddings with {sorted(d for d in dimensions if d < args.dimension)} dimensions "
+              f"cannot be brought up to {args.dimension}; keeping checkpoint {args.checkpoint}")
+        sys.exit(1)
+    
+    reducer = make_reducer(args.reducer, args.dimension)
+    if any(d > args.dimension for d in dimensions):
+        print(f"Reducing {sorted(d for d in dimensions if d > args.dimension)}-dim embeddings "
+              f"to {args.dimension} ({args.reducer})")
+        if reducer.needs_fit():
+            for record in checkpoint.records(lines):
+                if len(record["embedding"]) > args.dimension:
+                    reducer.partial_fit(record["embedding"])
+            samples = reducer.finish_fit()
+            reducer.save(OUTPUT_PCA)
+            print(f"✓ PCA projection fitted on {samples} embeddings saved to {OUTPUT_PCA}")
+            if samples < args.dimension:
+                print(f"  ⚠ Fewer samples than dimensions; components beyond {samples} carry no variance")
+    
+    def conformed_records() -> Iterator[Dict[str, Any]]:
+        for record in checkpoint.records(lines):
+            yield {**record, "embedding": conform(record["embedding"], args.dimension, reducer)}
+    
+    metadata["dimension"] = args.dimension
+    metadata["reducer"] = args.reducer if any(d > args.dimension for d in dimensions) else None
+    
+    if args.format in ('npy', 'both'):
+        count = write_store_streaming(OUTPUT_STORE, conformed_records(), len(lines),
+                                      args.dimension, metadata, args.dtype)
+        print(f"✓ {count} embeddings saved to {OUTPUT_STORE} ({args.dtype}, {args.dimension} dims)")
+    
+    if args.format in ('json', 'both'):
+        write_json_streaming(OUTPUT_FILE, conformed_records, metadata)
+        print(f"✓ Embeddings saved to {OUTPUT_FILE}")
+    
+    print(f"  - Attack patterns: {section_counts['attack_patterns']}")
+    print(f"  - TSC descriptions: {section_counts['tsc_descriptions']}")
+    print(f"  - CC descriptions: {section_counts['cc_descriptions']}")
+    
+    # Quantised copies, each checked against the float32 baseline
+    if args.quantize:
+        records = list(conformed_records())
+        baseline = np.vstack([r["embedding"] for r in records]).astype(np.float32)
+        for method in args.quantize:
+            path = quantized_path(OUTPUT_STORE, method)
+            try:
+                sizes, rows, evaluated = write_evaluated(path, baseline, method, records, 5)
+            except ValueError as e:
+                print(f"Quantisation: {method} — not applicable: {e}")
+                continue
+            print_report(method, baseline, sizes, rows, 5, evaluated)
+            print(f"  ✓ saved to {path}")
+        del records, baseline
     
     # Also create SQL insert script
-    create_sql_script(embeddings_data)
+    create_sql_script(conformed_records, metadata["generated_at"])
     
+    # Outputs are complete; the checkpoint is only kept to retry mock fallbacks
+    if counts['mocked']:
+        print(f"⚠ {counts['mocked']} mock embeddings in the outputs; keeping {args.checkpoint} "
+              f"so the next run only retries those")
+    else:
+        checkpoint.remove()
+    
+
+def create_sql_script(records: Callable[[], Iterable[Dict[str, Any]]], generated_at: str):
+    """Create SQL script that bulk loads embeddings with COPY and set-based upserts.
 
-def create_sql_script(embeddings_data: Dict[str, Any]):
-    """Create SQL script to insert embeddings into database"""
+    `records` is called once per table so the script is written in two
+    streaming passes instead of holding every vector in memory.
+    """
     sql_file = "insert_embeddings.sql"
     
     with open(sql_file, 'w') as f:
-        f.write("-- SQL script to insert pre-generated embeddings\n")
-        f.write("-- Generated at: " + embeddings_data["metadata"]["generated_at"] + "\n\n")
-        
-        f.write("BEGIN;\n\n")
-        
-        # Insert attack patterns
-        f.write("-- Insert attack patterns with embeddings\n")
-        for attack_id, data in embeddings_data["attack_patterns"].items():
-            pattern = next(p for p in ATTACK_PATTERNS if p["attack_id"] == attack_id)
-            
-            embedding_str = '[' + ','.join(map(str, data["embedding"])) + ']'
-            tsc_str = '{' + ','.join(f'"{t}"' for t in pattern["tsc"]) + '}'
-            cc_str = '{' + ','.join(f'"{c}"' for c in pattern["cc"]) + '}'
-            
-            f.write(f"""
-INSERT INTO soc2.attack_patterns (
-    attack_id, attack_name, description, attack_type,
-    embedding, tsc, cc, tools, requires_auth,
-    progressive, evidence_required, metadata
-) VALUES (
-    '{attack_id}',
-    '{pattern["attack_name"].replace("'", "''")}',
-    '{pattern["description"].replace("'", "''")}',
-    '{pattern["attack_type"]}',
-    '{embedding_str}'::vector,
-    '{tsc_str}',
-    '{cc_str}',
-    '[]'::jsonb,
-    {str(pattern["requires_auth"]).lower()},
-    {str(pattern["progressive"]).lower()},
-    '{{}}'::text[],
-    '{{}}'::jsonb
-) ON CONFLICT (attack_id) DO UPDATE SET
-    embedding = EXCLUDED.embedding,
-    updated_at = CURRENT_TIMESTAMP;
-""")
-        
-        f.write("\nCOMMIT;\n")
+        attacks, controls = write_sql_script(
+            f,
+            (r for r in records() if r["section"] == "attack_patterns"),
+            (r for r in records() if r["section"] in CONTROL_TYPES),
+            generated_at
+        )
     
-    print(f"✓ SQL script saved to {sql_file}")
+    print(f"✓ SQL script saved to {sql_file} ({attacks} attack patterns, {controls} TSC/CC)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Bulk load generated embeddings into PostgreSQL/pgvector
+Streams attack pattern, TSC and CC embeddings with COPY and upserts them in one transaction
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from embedding_store import iter_records
+from pgvector_bulk import (
+    CREATE_STAGING_SQL, COPY_ATTACKS_SQL, COPY_CONTROLS_SQL, UPSERT_SQL,
+    CONTROL_TYPES, attack_row, control_row
+)
+
+try:
+    import psycopg2
+except ImportError:
+    print("Error: psycopg2 is required. Install it with: pip install psycopg2-binary")
+    sys.exit(1)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUTS = [
+    os.path.join(SCRIPT_DIR, 'embeddings.npy'),
+    os.path.join(SCRIPT_DIR, 'embeddings.json'),
+]
+
+# COPY buffers spill to disk beyond this size
+SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+
+def copy_rows(cursor, copy_sql: str, rows) -> int:
+    """Stream COPY text-format rows through a spooled buffer"""
+    count = 0
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode='w+') as buffer:
+        for row in rows:
+            buffer.write(row)
+            count += 1
+        buffer.seek(0)
+        cursor.copy_expert(copy_sql, buffer)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk load embeddings into pgvector')
+    parser.add_argument('--input', help='embeddings.npy or embeddings.json (default: scripts/embeddings.*)')
+    parser.add_argument('--dsn', default=os.getenv('PG_CONNECTION_STRING'),
+                        help='PostgreSQL connection string (overrides host/port/user/password/database)')
+    parser.add_argument('--host', default=os.getenv('DB_HOST', 'localhost'))
+    parser.add_argument('--port', default=os.getenv('DB_PORT', '5432'))
+    parser.add_argument('--user', default=os.getenv('DB_USER', 'user'))
+    parser.add_argument('--password', default=os.getenv('DB_PASSWORD', ''))
+    parser.add_argument('--database', default=os.getenv('DB_NAME', 'soc2db'))
+    args = parser.parse_args()
+
+    input_path = args.input or next((p for p in DEFAULT_INPUTS if os.path.exists(p)), None)
+    if not input_path or not os.path.exists(input_path):
+        print("✗ No embeddings file found. Run 'python3 scripts/generate-embeddings.py' first")
+        sys.exit(1)
+
+    if args.dsn:
+        conn = psycopg2.connect(args.dsn)
+    else:
+        conn = psycopg2.connect(host=args.host, port=args.port, user=args.user,
+                                password=args.password, dbname=args.database)
+
+    print(f"Loading embeddings from {input_path}")
+    start = time.time()
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CREATE_STAGING_SQL)
+                attacks = copy_rows(cursor, COPY_ATTACKS_SQL, (
+                    attack_row(r) for r in iter_records(input_path) if r["section"] == "attack_patterns"
+                ))
+                controls = copy_rows(cursor, COPY_CONTROLS_SQL, (
+                    control_row(r) for r in iter_records(input_path) if r["section"] in CONTROL_TYPES
+                ))
+                cursor.execute(UPSERT_SQL)
+    finally:
+        conn.close()
+
+    print(f"✓ Loaded {attacks} attack patterns and {controls} TSC/CC embeddings "
+          f"in {time.time() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Bulk loading of generated embeddings into pgvector
+Rows are streamed with COPY into temporary staging tables, then upserted in one statement per table
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+ATTACK_COLUMNS = [
+    "attack_id", "attack_name", "description", "attack_type",
+    "embedding", "tsc", "cc", "requires_auth", "progressive"
+]
+CONTROL_COLUMNS = ["control_type", "control_id", "description", "embedding"]
+
+CONTROL_TYPES = {"tsc_descriptions": "tsc", "cc_descriptions": "cc"}
+
+CREATE_STAGING_SQL = """
+CREATE TEMP TABLE attack_patterns_staging (
+    attack_id VARCHAR(255) PRIMARY KEY,
+    attack_name VARCHAR(512) NOT NULL,
+    description TEXT NOT NULL,
+    attack_type VARCHAR(255) NOT NULL,
+    embedding vector NOT NULL,
+    tsc TEXT[] NOT NULL,
+    cc TEXT[] NOT NULL,
+    requires_auth BOOLEAN NOT NULL,
+    progressive BOOLEAN NOT NULL
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE control_embeddings_staging (
+    control_type VARCHAR(16) NOT NULL,
+    control_id VARCHAR(255) NOT NULL,
+    description TEXT NOT NULL,
+    embedding vector NOT NULL,
+    PRIMARY KEY (control_type, control_id)
+) ON COMMIT DROP;
+"""
+
+COPY_ATTACKS_SQL = f"COPY attack_patterns_staging ({', '.join(ATTACK_COLUMNS)}) FROM STDIN"
+COPY_CONTROLS_SQL = f"COPY control_embeddings_staging ({', '.join(CONTROL_COLUMNS)}) FROM STDIN"
+
+UPSERT_SQL = """
+INSERT INTO soc2.attack_patterns (
+    attack_id, attack_name, description, attack_type,
+    embedding, tsc, cc, requires_auth, progressive
+)
+SELECT attack_id, attack_name, description, attack_type,
+       embedding, tsc, cc, requires_auth, progressive
+FROM attack_patterns_staging
+ON CONFLICT (attack_id) DO UPDATE SET
+    attack_name = EXCLUDED.attack_name,
+    description = EXCLUDED.description,
+    attack_type = EXCLUDED.attack_type,
+    embedding = EXCLUDED.embedding,
+    tsc = EXCLUDED.tsc,
+    cc = EXCLUDED.cc,
+    requires_auth = EXCLUDED.requires_auth,
+    progressive = EXCLUDED.progressive;
+
+INSERT INTO soc2.control_embeddings (control_type, control_id, description, embedding)
+SELECT control_type, control_id, description, embedding
+FROM control_embeddings_staging
+ON CONFLICT (control_type, control_id) DO UPDATE SET
+    description = EXCLUDED.description,
+    embedding = EXCLUDED.embedding;
+"""
+
+
+def copy_escape(value: str) -> str:
+    """Escape a value for PostgreSQL COPY text format"""
+    return (value.replace('\\', '\\\\')
+                 .replace('\t', '\\t')
+                 .replace('\n', '\\n')
+                 .replace('\r', '\\r'))
+
+
+def vector_literal(embedding: Iterable[float]) -> str:
+    return '[' + ','.join(map(str, embedding)) + ']'
+
+
+def array_literal(values: List[str]) -> str:
+    """Text[] literal with every element quoted"""
+    quoted = ('"' + v.replace('\\', '\\\\').replace('"', '\\"') + '"' for v in values)
+    return '{' + ','.join(quoted) + '}'
+
+
+def _copy_line(values: List[str]) -> str:
+    return '\t'.join(copy_escape(v) for v in values) + '\n'
+
+
+def split_pattern_text(text: str) -> Tuple[str, str]:
+    """Recover (attack_name, description) from 'Name: description' embedding text"""
+    name, _, description = text.partition(': ')
+    return name, description or text
+
+
+def attack_row(record: Dict[str, Any]) -> str:
+    """COPY line for an attack_patterns record"""
+    metadata = record.get("metadata") or {}
+    name, description = split_pattern_text(record["text"])
+    return _copy_line([
+        record["key"],
+        metadata.get("attack_name", name),
+        metadata.get("description", description),
+        metadata.get("attack_type", name),
+        vector_literal(record["embedding"]),
+        array_literal(metadata.get("tsc", [])),
+        array_literal(metadata.get("cc", [])),
+        't' if metadata.get("requires_auth") else 'f',
+        't' if metadata.get("progressive") else 'f',
+    ])
+
+
+def control_row(record: Dict[str, Any]) -> str:
+    """COPY line for a TSC or CC description record"""
+    return _copy_line([
+        CONTROL_TYPES[record["section"]],
+        record["key"],
+        record["text"],
+        vector_literal(record["embedding"]),
+    ])
+
+
+def write_sql_script(f, attack_records: Iterable[Dict[str, Any]],
+                     control_records: Iterable[Dict[str, Any]], generated_at: str) -> Tuple[int, int]:
+    """Write a psql script that bulk loads via inline COPY ... FROM STDIN blocks"""
+    f.write("-- SQL script to bulk load pre-generated embeddings\n")
+    f.write("-- Generated at: " + generated_at + "\n")
+    f.write("-- Run with psql: rows are loaded with COPY into staging tables, then upserted\n\n")
+    f.write("BEGIN;\n")
+    f.write(CREATE_STAGING_SQL)
+
+    counts = [0, 0]
+    for i, (copy_sql, records, to_row) in enumerate((
+        (COPY_ATTACKS_SQL, attack_records, attack_row),
+        (COPY_CONTROLS_SQL, control_records, control_row),
+    )):
+        f.write("\n" + copy_sql + ";\n")
+        for record in records:
+            f.write(to_row(record))
+            counts[i] += 1
+        f.write("\\.\n")
+
+    f.write(UPSERT_SQL)
+    f.write("\nCOMMIT;\n")
+    return counts[0], counts[1]
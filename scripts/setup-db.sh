@@ -164,7 +164,7 @@ else
 fi
 
 # Load initial embeddings if available
-if [ -f "scripts/embeddings.json" ]; then
+if [ -f "scripts/embeddings.npy" ] || [ -f "scripts/embeddings.json" ]; then
   echo -e "${YELLOW}Loading initial embeddings...${NC}"
   python3 scripts/load-embeddings.py --host "$DB_HOST" --port "$DB_PORT" --user "$DB_USER" --password "$DB_PASSWORD" --database "$DB_NAME"
   echo -e "${GREEN}✓ Embeddings loaded${NC}"
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+
+"""
+Soak Test - long-running load with periodic backend metrics sampling for test-user-input-runner.py
+Scrapes /api/queue/metrics and submission latency on a fixed interval into a CSV time series,
+then fits trends to flag monotonic growth in memory, queue depth or latency
+"""
+
+import csv
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from latency_histogram import LatencyHistogram
+
+# Load runs in rounds of this many seconds so per-request results never pile up over hours
+SOAK_ROUND = 60.0
+# Fewer post-warmup samples than this are reported as inconclusive rather than judged
+MIN_SAMPLES = 8
+COLUMNS = ('timestamp', 'elapsed_s', 'requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms',
+           'waiting', 'active', 'delayed', 'failed', 'queue_depth', 'active_workflows', 'rss_mb', 'heap_mb')
+# (column, label, floor, required): growth is relative to max(early median, floor), so series
+# near zero must grow by at least floor * threshold before they can fail. A run missing a
+# required series is inconclusive; heap is only judged when the backend reports it
+TREND_SERIES = (
+    ('rss_mb', 'backend RSS', 1.0, True),
+    ('heap_mb', 'backend heap', 1.0, False),
+    ('queue_depth', 'queue depth', 5.0, True),
+    ('p95_ms', 'submission p95', 1.0, True),
+)
+
+
+def mann_kendall(values: Sequence[float]) -> Tuple[float, float]:
+    """One-sided Mann-Kendall test that `values` increase over time.
+
+    Returns (S statistic, p-value) using the normal approximation with tie
+    correction. Unlike a regression slope it only asks whether later samples
+    tend to exceed earlier ones, so a single spike cannot fake a trend.
+    """
+    n = len(values)
+    if n < 3:
+        return 0.0, 1.0
+    s = 0
+    for i in range(n - 1):
+        current = values[i]
+        for later in values[i + 1:]:
+            s += (later > current) - (later < current)
+
+    ties: Dict[float, int] = {}
+    for value in values:
+        ties[value] = ties.get(value, 0) + 1
+    variance = (n * (n - 1) * (2 * n + 5) - sum(t * (t - 1) * (2 * t + 5) for t in ties.values())) / 18
+    if variance <= 0 or s <= 0:
+        return float(s), 1.0
+    z = (s - 1) / math.sqrt(variance)  # continuity correction
+    return float(s), 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def linear_fit(xs: Sequence[float], ys: Sequence[float]) -> Tuple[float, float]:
+    """Least-squares (slope, intercept)"""
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if not sxx:
+        return 0.0, mean_y
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+    return slope, mean_y - slope * mean_x
+
+
+def _median(values: Sequence[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def fit_trend(samples: List[Dict[str, Any]], column: str, floor: float, alpha: float,
+              threshold: float) -> Dict[str, Any]:
+    """Trend of one column; status 'missing' if no sample reported it"""
+    points = [(s['elapsed_s'], s[column]) for s in samples if s.get(column) is not None]
+    trend: Dict[str, Any] = {'samples': len(points)}
+    if not points:
+        trend['status'] = 'missing'
+        return trend
+    if len(points) < MIN_SAMPLES:
+        trend['status'] = 'inconclusive'
+        return trend
+
+    xs, ys = [x for x, _ in points], [y for _, y in points]
+    slope, _ = linear_fit(xs, ys)
+    _, p_value = mann_kendall(ys)
+    start = _median(ys[:max(3, len(ys) // 4)])
+    growth = slope * (xs[-1] - xs[0]) / max(start, floor)
+    trend.update({
+        'start': start,
+        'end': _median(ys[-max(3, len(ys) // 4):]),
+        'slopePerHour': slope * 3600,
+        'growth': growth,
+        'pValue': p_value,
+        'status': 'growing' if p_value < alpha and growth > threshold else 'stable'
+    })
+    return trend
+
+
+def evaluate(samples: List[Dict[str, Any]], warmup: float, alpha: float = 0.01, threshold: float = 0.20,
+             max_error_rate: float = 0.05, scrape_errors: int = 0) -> Dict[str, Any]:
+    """Pass/fail/inconclusive verdict over the samples taken after `warmup` seconds.
+
+    A series fails when it grows monotonically (Mann-Kendall p < alpha) and
+    its fitted growth over the run exceeds `threshold` of its early level.
+    The run also fails if more than `max_error_rate` of submissions errored.
+    A run that did not fail is inconclusive rather than passing when any
+    metrics scrape failed, a required series is missing or a series has too
+    few samples to judge.
+    """
+    steady = [s for s in samples if s['elapsed_s'] >= warmup]
+    trends = {}
+    for column, label, floor, required in TREND_SERIES:
+        trend = fit_trend(steady, column, floor, alpha, threshold)
+        if required or trend['status'] != 'missing':
+            trends[column] = dict(trend, label=label)
+
+    requests_made = sum(s['requests'] for s in samples)
+    errors = sum(s['errors'] for s in samples)
+    error_rate = errors / requests_made if requests_made else 0.0
+    reasons = [f"{t['label']} grew {t['growth'] * 100:.0f}% (p={t['pValue']:.2g})"
+               for t in trends.values() if t['status'] == 'growing']
+    if error_rate > max_error_rate:
+        reasons.append(f"error rate {error_rate * 100:.1f}% above {max_error_rate * 100:.1f}%")
+    if not requests_made:
+        reasons.append("no submissions completed")
+
+    gaps = []
+    if scrape_errors:
+        gaps.append(f"{scrape_errors} of {len(samples)} metrics scrapes failed")
+    for t in trends.values():
+        if t['status'] == 'missing':
+            gaps.append(f"{t['label']} was never reported")
+        elif t['status'] == 'inconclusive':
+            gaps.append(f"{t['label']} has {t['samples']} samples after warmup, need {MIN_SAMPLES}")
+    return {
+        'verdict': 'fail' if reasons else 'inconclusive' if gaps else 'pass',
+        'reasons': reasons + gaps,
+        'samples': len(samples),
+        'warmup': warmup,
+        'alpha': alpha,
+        'threshold': threshold,
+        'requests': requests_made,
+        'errors': errors,
+        'errorRate': error_rate,
+        'scrapeErrors': scrape_errors,
+        'trends': trends
+    }
+
+
+class SoakSampler:
+    """Record submission latency and scrape backend metrics every `interval` seconds.
+
+    `record()` is called from the load threads with each submission result;
+    a background thread swaps out the interval's histogram, scrapes
+    GET {api_url}/queue/metrics (which needs the queue:read permission) and
+    appends one row to the CSV at `path`. Only the per-interval rows are kept
+    in memory, so a soak can run for days.
+    """
+
+    def __init__(self, api_url: str, path: str, interval: float = 30.0,
+                 headers: Optional[Dict[str, str]] = None):
+        self.api_url = api_url
+        self.path = path
+        self.interval = interval
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        self.samples: List[Dict[str, Any]] = []
+        self.scrape_errors = 0
+        self.started = 0.0
+        self._histogram = LatencyHistogram()
+        self._requests = 0
+        self._errors = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._writer = None
+
+    def record(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._histogram.record(result['latency'])
+            self._requests += 1
+            self._errors += 0 if result['success'] else 1
+        return result
+
+    def scrape(self) -> Dict[str, Any]:
+        """Queue counts and backend memory from /queue/metrics; empty if unavailable"""
+        try:
+            response = self.session.get(f"{self.api_url}/queue/metrics", timeout=min(10.0, self.interval))
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.scrape_errors += 1
+            if self.scrape_errors == 1:
+                print(f"⚠️  Could not scrape {self.api_url}/queue/metrics: {e}")
+                if isinstance(e, requests.exceptions.HTTPError) and e.response.status_code in (401, 403):
+                    print("   The metrics endpoint needs an API key or JWT with the queue:read permission")
+            return {}
+
+        queue = data.get('queue') or {}
+        process = data.get('process') or {}
+        metrics = {key: queue.get(key) for key in ('waiting', 'active', 'delayed', 'failed')}
+        if queue:
+            metrics['queue_depth'] = (queue.get('waiting') or 0) + (queue.get('delayed') or 0)
+        metrics['active_workflows'] = data.get('activeWorkflows')
+        if process.get('rss') is not None:
+            metrics['rss_mb'] = round(process['rss'] / 1048576, 2)
+        if process.get('heapUsed') is not None:
+            metrics['heap_mb'] = round(process['heapUsed'] / 1048576, 2)
+        return metrics
+
+    def sample(self) -> Dict[str, Any]:
+        with self._lock:
+            histogram, requests_made, errors = self._histogram, self._requests, self._errors
+            self._histogram, self._requests, self._errors = LatencyHistogram(), 0, 0
+        now = time.time()
+        elapsed = time.perf_counter() - self.started
+        previous = self.samples[-1]['elapsed_s'] if self.samples else 0.0
+        row: Dict[str, Any] = {
+            'timestamp': datetime.fromtimestamp(now).isoformat(timespec='seconds'),
+            'elapsed_s': round(elapsed, 1),
+            'requests': requests_made,
+            'errors': errors,
+            'rps': round(requests_made / max(1e-9, elapsed - previous), 3)
+        }
+        if histogram.total_count:
+            for p in (50, 95, 99):
+                row[f"p{p}_ms"] = round(histogram.percentile(p) * 1000, 2)
+        row.update(self.scrape())
+        self.samples.append(row)
+        self._writer.writerow({key: '' if row.get(key) is None else row[key] for key in COLUMNS})
+        self._file.flush()
+        return row
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval - (time.perf_counter() - self.started) % self.interval):
+            self.sample()
+
+    def start(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'w', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        self._writer.writeheader()
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='soak-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling after one last row covering the partial interval"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        if self._file:
+            self.sample()
+            self._file.close()
+            self._file = None
+
+
+def print_verdict(verdict: Dict[str, Any]) -> None:
+    print(f"\n🧪 Soak Test Trends")
+    print("==================")
+    print(f"{'series':<16} {'samples':>7} {'start':>10} {'end':>10} {'per hour':>10} {'growth':>8} {'p':>8}  status")
+    for trend in verdict['trends'].values():
+        if trend['status'] == 'missing':
+            print(f"{trend['label']:<16} {trend['samples']:>7}  missing (not in the metrics response)")
+            continue
+        if trend['status'] == 'inconclusive':
+            print(f"{trend['label']:<16} {trend['samples']:>7}  inconclusive (need {MIN_SAMPLES} samples after warmup)")
+            continue
+        print(f"{trend['label']:<16} {trend['samples']:>7} {trend['start']:>10.2f} {trend['end']:>10.2f} "
+              f"{trend['slopePerHour']:>+10.2f} {trend['growth'] * 100:>7.1f}% {trend['pValue']:>8.2g}  "
+              f"{'📈 ' if trend['status'] == 'growing' else ''}{trend['status']}")
+    print(f"Submissions: {verdict['requests']}, errors: {verdict['errors']} ({verdict['errorRate'] * 100:.1f}%)")
+    if verdict['verdict'] == 'pass':
+        print("\n✅ PASS: no sustained growth detected")
+    elif verdict['verdict'] == 'inconclusive':
+        print("\n❔ INCONCLUSIVE: not every series could be judged")
+        for reason in verdict['reasons']:
+            print(f"   - {reason}")
+    else:
+        print("\n❌ FAIL:")
+        for reason in verdict['reasons']:
+            print(f"   - {reason}")
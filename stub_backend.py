@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+
+"""
+Stub Backend - lightweight asyncio stand-in for the workflow API
+Serves the submission, status and /ws endpoints used by the Python clients and emits scripted
+AI workflow events with configurable latency, event rate and failure rate
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiohttp import WSMsgType, web
+
+from capture_replay import load_session, parse_speed
+
+TOOLS = ['subfinder', 'httpx', 'nmap', 'ffuf', 'nuclei', 'sqlmap', 'jwt-tool', 'zap']
+SEVERITIES = ['critical', 'high', 'medium', 'low', 'info']
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process, where /proc is available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StubBackend:
+    """In-memory workflow API with seeded, configurable behaviour.
+
+    Submissions wait `latency` (+/- `jitter`) and `failure_rate` of them answer
+    500. Each accepted workflow plays a script of WebSocket events —
+    ai:thinking, ai:classification, ai:strategy, test:plan, test:start, finding
+    and workflow:complete — at `event_rate` events per second, and
+    `workflow_failure_rate` of workflows end as failed. Events are kept per
+    workflow and numbered with `seq`, so a late subscriber receives the history
+    first, much as the real backend replays queued messages, and a subscribe
+    carrying `lastSeq` resumes after that event. A finished workflow and its
+    events are dropped `retain` seconds after it ends (None keeps them), so
+    the stub's own RSS stays flat under a soak run instead of growing with
+    every workflow it has served.
+
+    With `recording` (offset, message) pairs from capture_replay.load_session,
+    every workflow plays that recorded session instead, at its original
+    timing divided by `speed` (0 = no waiting). A subscriber to an unknown
+    workflow ID starts a replay too, so passive consumers can be fed without
+    submitting anything.
+    """
+
+    def __init__(self, latency: float = 0.02, jitter: float = 0.005, failure_rate: float = 0.0,
+                 event_rate: float = 5.0, thoughts: int = 3, findings: int = 2, payload_size: int = 0,
+                 workflow_failure_rate: float = 0.0, seed: Optional[int] = None,
+                 recording: Optional[List[Tuple[float, Dict[str, Any]]]] = None, speed: float = 1.0,
+                 retain: Optional[float] = 60.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.event_rate = event_rate
+        self.thoughts = thoughts
+        self.findings = findings
+        self.payload_size = payload_size
+        self.workflow_failure_rate = workflow_failure_rate
+        self.recording = recording
+        self.speed = speed
+        self.retain = retain
+        self.rng = random.Random(seed)
+        self.workflows: Dict[str, Dict[str, Any]] = {}
+        self.subscribers: Dict[str, Set[web.WebSocketResponse]] = {}
+        self.stats = {'submissions': 0, 'rejected': 0, 'events': 0, 'messages_sent': 0, 'ws_clients': 0,
+                      'evicted': 0}
+        self.app = self.create_app()
+        self._tasks: Set[asyncio.Task] = set()
+        # Per-connection send order: a subscriber's history goes out before any live event
+        self._send_locks: Dict[web.WebSocketResponse, asyncio.Lock] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.url = ''
+        self.started_at = time.time()
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/api/health', self.health)
+        app.router.add_post('/api/run-soc2-workflow', self.run_workflow)
+        app.router.add_post('/api/workflows/run', self.run_workflow)
+        app.router.add_get('/api/workflows/{workflow_id}/status', self.workflow_status)
+        app.router.add_get('/api/queue/metrics', self.queue_metrics)
+        app.router.add_get('/api/stub/stats', self.stub_stats)
+        app.router.add_get('/ws', self.websocket)
+        return app
+
+    async def _delay(self) -> None:
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _create_workflow(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        workflow_id = payload.get('workflowId') or str(uuid.uuid4())
+        if self.recording is not None and workflow_id in self.workflows:
+            # The subscription may have started this replay before the submission arrived
+            return self.workflows[workflow_id]
+        workflow = {
+            'workflowId': workflow_id,
+            'target': payload.get('target'),
+            'status': 'running',
+            'progress': 0,
+            'startTime': time.time(),
+            'findings': [],
+            'events': []
+        }
+        self.workflows[workflow_id] = workflow
+        play = self._play_recording(workflow) if self.recording is not None else self._play(workflow)
+        task = asyncio.get_running_loop().create_task(play)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return workflow
+
+    def _padding(self) -> str:
+        return 'x' * self.payload_size if self.payload_size else ''
+
+    def _script(self, workflow: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Events for one workflow, in the flat shape monitor-ai-planning.py reads"""
+        target = workflow['target']
+        steps = [{
+            'tool': tool,
+            'target': target,
+            'purpose': f"Run {tool} against {target}",
+            'priority': self.rng.choice(['high', 'medium', 'low'])
+        } for tool in self.rng.sample(TOOLS, 4)]
+
+        events = [{'type': 'ai:thinking', 'phase': phase, 'content': f"Considering {phase} for {target}. {self._padding()}"}
+                  for phase in ['reconnaissance', 'analysis', 'planning', 'prioritisation', 'validation'][:self.thoughts]]
+        events.append({'type': 'ai:classification', 'intent': 'comprehensive_security_test',
+                       'confidence': round(self.rng.uniform(0.7, 0.99), 3)})
+        events.append({'type': 'ai:strategy', 'strategy': {'phase': 'discovery', 'recommendations': steps},
+                       'reasoning': f"Start broad, then focus on exposed APIs. {self._padding()}"})
+        events.append({'type': 'test:plan', 'plan': {'target': target, 'steps': steps}})
+        for i, step in enumerate(steps):
+            events.append({'type': 'test:start', 'test': step['tool']})
+            if i < self.findings:
+                events.append({
+                    'type': 'finding',
+                    'severity': self.rng.choice(SEVERITIES),
+                    'category': step['tool'],
+                    'description': f"Stub finding from {step['tool']}",
+                    'impact': 'Simulated impact'
+                })
+        events += [{'type': 'finding', 'severity': self.rng.choice(SEVERITIES),
+                    'description': 'Stub finding', 'impact': 'Simulated impact'}
+                   for _ in range(max(0, self.findings - len(steps)))]
+        return events
+
+    async def _play(self, workflow: Dict[str, Any]) -> None:
+        script = self._script(workflow)
+        failed = self.rng.random() < self.workflow_failure_rate
+        for i, event in enumerate(script):
+            await asyncio.sleep(self.rng.expovariate(self.event_rate) if self.event_rate > 0 else 0)
+            if event['type'] == 'finding':
+                workflow['findings'].append(event)
+            workflow['progress'] = int((i + 1) / (len(script) + 1) * 100)
+            await self._publish(workflow, event)
+            if failed and i >= len(script) // 2:
+                break
+
+        await self._finish(workflow, 'failed' if failed else 'completed')
+
+    async def _play_recording(self, workflow: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        status = 'completed'
+        for i, (offset, event) in enumerate(self.recording):
+            if self.speed:
+                await asyncio.sleep(max(0.0, started + offset / self.speed - time.perf_counter()))
+            event = {k: v for k, v in event.items() if k not in ('workflowId', 'timestamp')}
+            if event.get('type') == 'workflow:complete':
+                status = event.get('status') or status
+                break
+            if event.get('type') == 'finding':
+                workflow['findings'].append(event)
+            workflow['progress'] = int((i + 1) / (len(self.recording) + 1) * 100)
+            await self._publish(workflow, event)
+
+        await self._finish(workflow, status)
+
+    async def _finish(self, workflow: Dict[str, Any], status: str) -> None:
+        workflow['status'] = status
+        workflow['progress'] = 100
+        await self._publish(workflow, {'type': 'workflow:complete', 'status': status,
+                                       'findings': len(workflow['findings'])})
+        if self.retain is not None:
+            asyncio.get_running_loop().call_later(self.retain, self._evict, workflow['workflowId'])
+
+    def _evict(self, workflow_id: str) -> None:
+        if self.workflows.pop(workflow_id, None) is not None:
+            self.stats['evicted'] += 1
+        if not self.subscribers.get(workflow_id, True):
+            del self.subscribers[workflow_id]
+
+    async def _publish(self, workflow: Dict[str, Any], event: Dict[str, Any]) -> None:
+        message = dict(event, workflowId=workflow['workflowId'], seq=len(workflow['events']) + 1,
+                       timestamp=_timestamp())
+        workflow['events'].append(message)
+        self.stats['events'] += 1
+        data = json.dumps(message)
+        for ws in list(self.subscribers.get(workflow['workflowId'], ())):
+            lock = self._send_locks.get(ws)
+            if lock is not None:
+                async with lock:
+                    await self._send(ws, data)
+
+    async def _send(self, ws: web.WebSocketResponse, data: str) -> None:
+        if ws.closed:
+            return
+        try:
+            await ws.send_str(data)
+            self.stats['messages_sent'] += 1
+        except ConnectionResetError:
+            pass
+
+    def _status(self, workflow: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'workflowId': workflow['workflowId'],
+            'status': workflow['status'],
+            'startTime': int(workflow['startTime'] * 1000),
+            'duration': int((time.time() - workflow['startTime']) * 1000),
+            'progress': workflow['progress'],
+            'results': {'totalFindings': len(workflow['findings']), 'findings': workflow['findings']}
+        }
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'healthy', 'workflows': len(self.workflows)})
+
+    async def stub_stats(self, request: web.Request) -> web.Response:
+        active = sum(1 for w in self.workflows.values() if w['status'] == 'running')
+        return web.json_response(dict(self.stats, workflows=len(self.workflows), active=active))
+
+    async def queue_metrics(self, request: web.Request) -> web.Response:
+        """Same shape as the backend's /api/queue/metrics; the stub has no queue, so nothing waits"""
+        statuses = [w['status'] for w in self.workflows.values()]
+        active = statuses.count('running')
+        return web.json_response({
+            'queue': {'waiting': 0, 'active': active, 'completed': statuses.count('completed'),
+                      'failed': statuses.count('failed'), 'delayed': 0, 'paused': 0},
+            'activeWorkflows': active,
+            'process': {'rss': _rss_bytes(), 'uptime': time.time() - self.started_at}
+        })
+
+    async def run_workflow(self, request: web.Request) -> web.Response:
+        self.stats['submissions'] += 1
+        payload = await request.json()
+        await self._delay()
+        if self.rng.random() < self.failure_rate:
+            self.stats['rejected'] += 1
+            return web.json_response({'error': 'Stub failure injected'}, status=500)
+        if not payload.get('target'):
+            self.stats['rejected'] += 1
+            return web.json_response({'error': 'Validation Error', 'message': 'target is required'}, status=400)
+
+        workflow = self._create_workflow(payload)
+        return web.json_response({
+            'workflowId': workflow['workflowId'],
+            'status': 'accepted',
+            'message': 'Workflow queued'
+        }, status=202)
+
+    async def workflow_status(self, request: web.Request) -> web.Response:
+        workflow = self.workflows.get(request.match_info['workflow_id'])
+        if workflow is None:
+            return web.json_response({'error': 'Workflow not found'}, status=404)
+        return web.json_response(self._status(workflow))
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        self.stats['ws_clients'] += 1
+        subscribed: Set[str] = set()
+        lock = self._send_locks[ws] = asyncio.Lock()
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    break
+                try:
+                    msg = json.loads(message.data)
+                except ValueError:
+                    continue
+                workflow_id = msg.get('workflowId')
+
+                if msg.get('type') == 'subscribe' and workflow_id:
+                    async with lock:
+                        subscribed.add(workflow_id)
+                        self.subscribers.setdefault(workflow_id, set()).add(ws)
+                        workflow = self.workflows.get(workflow_id)
+                        if workflow is None and self.recording is not None:
+                            workflow = self._create_workflow({'workflowId': workflow_id, 'target': 'replay'})
+                        # A resuming client names the last event it saw and only gets the rest
+                        last_seq = msg.get('lastSeq') if isinstance(msg.get('lastSeq'), int) else 0
+                        history = [event for event in workflow['events'] if event['seq'] > last_seq] if workflow else []
+                        await ws.send_json({'type': 'subscribed', 'workflowId': workflow_id})
+                        for event in history:
+                            await self._send(ws, json.dumps(event))
+                elif msg.get('type') == 'unsubscribe' and workflow_id:
+                    subscribed.discard(workflow_id)
+                    self.subscribers.get(workflow_id, set()).discard(ws)
+                    await ws.send_json({'type': 'unsubscribed', 'workflowId': workflow_id})
+                elif msg.get('type') == 'ping':
+                    await ws.send_json({'type': 'pong', 'timestamp': _timestamp()})
+        finally:
+            for workflow_id in subscribed:
+                self.subscribers.get(workflow_id, set()).discard(ws)
+                if workflow_id not in self.workflows and not self.subscribers.get(workflow_id, True):
+                    del self.subscribers[workflow_id]
+            self._send_locks.pop(ws, None)
+        return ws
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._runner:
+            await self._runner.cleanup()
+
+    def start_in_thread(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Serve from a daemon thread with its own event loop; returns the base URL"""
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start(host, port))
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=serve, name='stub-backend', daemon=True).start()
+        ready.wait()
+        return self.url
+
+    def stop_thread(self) -> None:
+        if self._loop:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+async def serve_forever(backend: StubBackend, host: str, port: int) -> None:
+    url = await backend.start(host, port)
+    print(f"🧪 Stub backend listening on {url}")
+    print(f"   API: {url}/api   WebSocket: {url.replace('http', 'ws', 1)}/ws   Stats: {url}/api/stub/stats")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await backend.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline stand-in for the workflow API and WebSocket events')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=3000, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.02, help='Submission latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.005, help='Uniform +/- jitter on latency')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of submissions that fail')
+    parser.add_argument('--event-rate', type=float, default=5.0, help='Mean WebSocket events per second per workflow')
+    parser.add_argument('--thoughts', type=int, default=3, help='ai:thinking events per workflow (max 5)')
+    parser.add_argument('--findings', type=int, default=2, help='finding events per workflow')
+    parser.add_argument('--payload-size', type=int, default=0, help='Extra bytes of text in AI events')
+    parser.add_argument('--workflow-failure-rate', type=float, default=0.0,
+                        help='Fraction of workflows that end as failed')
+    parser.add_argument('--seed', type=int, help='Seed for latency, scripts and failure injection')
+    parser.add_argument('--replay', metavar='CAPTURE',
+                        help='Play a recorded session (see capture_replay.load_session) for every workflow')
+    parser.add_argument('--speed', type=parse_speed, default=1.0,
+                        help="Replay speed: 1 for original timing, N for N times faster, 'max' for no waiting")
+    parser.add_argument('--retain', type=float, default=60.0,
+                        help='Seconds a finished workflow and its events stay available for status and late subscribers')
+    args = parser.parse_args()
+
+    recording = None
+    if args.replay:
+        recording = load_session(args.replay)
+        print(f"⏯️  Replaying {len(recording)} events from {args.replay}")
+
+    backend = StubBackend(
+        latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+        event_rate=args.event_rate, thoughts=args.thoughts, findings=args.findings,
+        payload_size=args.payload_size, workflow_failure_rate=args.workflow_failure_rate, seed=args.seed,
+        recording=recording, speed=args.speed, retain=args.retain
+    )
+    try:
+        asyncio.run(serve_forever(backend, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Stub backend stopped")
+
+
+if __name__ == '__main__':
+    main()
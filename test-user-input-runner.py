@@ -7,20 +7,44 @@ This script demonstrates how to programmatically submit test cases to the securi
 
 import json
 import time
+import asyncio
 import argparse
 import requests
 from typing import Dict, List, Any
 import os
+import sys
 from datetime import datetime
 
+from benchmark_suite import (
+    BASELINE_DIR, STUB_CONFIG, WORKLOADS,
+    capture_run, compare_runs, load_baseline, print_comparison, save_baseline
+)
+from distributed_load import TOKEN_ENV, Coordinator, is_loopback, merge_replies, parse_address, serve_worker, slim_result
+
+from latency_histogram import PIPELINE_PHASES, LatencyRecorder, format_table, save_json, save_prometheus
+from load_generator import (
+    LOAD_MODES, LoadGenerator, LoadProfile, build_mix, positive_rate, positive_users,
+    print_timeline, share_connection_pool, timeline
+)
+from request_timing import mount_timed_adapter
+from soak_test import SOAK_ROUND, SoakSampler, evaluate, print_verdict
+from stub_backend import StubBackend
+from workflow_tracker import WorkflowTracker
+
 # Configuration
 API_BASE_URL = os.getenv('API_URL', 'http://localhost:3000/api')
 DELAY_BETWEEN_TESTS = 2  # seconds
 
 class SecurityTestRunner:
-    def __init__(self, api_url: str = API_BASE_URL):
+    def __init__(self, api_url: str = API_BASE_URL, api_key: str = None):
         self.api_url = api_url
         self.session = requests.Session()
+        if api_key:
+            self.session.headers['X-API-Key'] = api_key
+        mount_timed_adapter(self.session)
+        self.latency = LatencyRecorder()
+        self.pipeline = LatencyRecorder(phases=PIPELINE_PHASES)
+        self.tracked: Dict[str, Dict[str, Any]] = {}
         self.results = {
             'successful': [],
             'failed': [],
@@ -46,49 +70,73 @@ class SecurityTestRunner:
         
         return payload
     
-    def run_test(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
-        """Run a single test scenario"""
-        print(f"\n🔍 Running: {scenario['scenario']}")
-        print(f"📝 Description: {scenario['description']}")
-        
+    def submit_workflow(self, scenario: Dict[str, Any], timeout: float = 30) -> Dict[str, Any]:
+        """Submit a scenario without printing; returns the result with its latency"""
+        submitted_at = time.time()
+        start = time.perf_counter()
         try:
             payload = self.create_workflow_payload(scenario['input'])
-            print(f"📤 Payload: {json.dumps(payload, indent=2)}")
-            
             response = self.session.post(
                 f"{self.api_url}/run-soc2-workflow",
                 json=payload,
-                timeout=30
+                timeout=timeout
             )
             response.raise_for_status()
             
             data = response.json()
-            print(f"✅ Success! Workflow ID: {data.get('workflowId')}")
-            print(f"📊 Status: {data.get('status')}")
-            
-            return {
+            result = {
                 'success': True,
                 'workflowId': data.get('workflowId'),
                 'scenario': scenario['scenario'],
+                'testType': scenario['input'].get('testType'),
+                'status_code': response.status_code,
+                'submitted_at': submitted_at,
+                'latency': time.perf_counter() - start,
+                'timings': getattr(response, 'timings', None),
                 'response': data
             }
+            self.latency.record_result(result)
+            return result
         
         except requests.exceptions.RequestException as e:
             error_msg = str(e)
+            status_code = None
+            timings = None
             if hasattr(e, 'response') and e.response is not None:
+                status_code = e.response.status_code
+                timings = getattr(e.response, 'timings', None)
                 try:
                     error_data = e.response.json()
                     error_msg = error_data.get('error', str(e))
                 except:
                     error_msg = e.response.text or str(e)
             
-            print(f"❌ Error: {error_msg}")
-            
-            return {
+            result = {
                 'success': False,
                 'error': error_msg,
-                'scenario': scenario['scenario']
+                'scenario': scenario['scenario'],
+                'testType': scenario['input'].get('testType'),
+                'status_code': status_code,
+                'latency': time.perf_counter() - start,
+                'timings': timings or {'total': time.perf_counter() - start}
             }
+            self.latency.record_result(result)
+            return result
+    
+    def run_test(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single test scenario"""
+        print(f"\n🔍 Running: {scenario['scenario']}")
+        print(f"📝 Description: {scenario['description']}")
+        print(f"📤 Payload: {json.dumps(self.create_workflow_payload(scenario['input']), indent=2)}")
+        
+        result = self.submit_workflow(scenario)
+        if result['success']:
+            print(f"✅ Success! Workflow ID: {result['workflowId']}")
+            print(f"📊 Status: {result['response'].get('status')}")
+        else:
+            print(f"❌ Error: {result['error']}")
+        
+        return result
     
     def check_workflow_status(self, workflow_id: str) -> Dict[str, Any]:
         """Check the status of a workflow"""
@@ -103,6 +151,31 @@ class SecurityTestRunner:
             print(f"Error checking status: {e}")
             return None
     
+    def track_workflows(self, ws_url: str = None, timeout: float = 600,
+                        use_websocket: bool = True) -> List[Dict[str, Any]]:
+        """Follow every successful submission until it finishes, concurrently"""
+        tracker = WorkflowTracker(self.api_url, ws_url, timeout=timeout, use_websocket=use_websocket)
+        submissions = [
+            (r['workflowId'], r.get('submitted_at', time.time()), r['scenario'], r.get('testType'))
+            for r in self.results['successful']
+        ]
+        print(f"\n⏳ Tracking {len(submissions)} workflows to completion (timeout {timeout:g}s)...")
+        
+        started = time.perf_counter()
+        tracked = asyncio.run(tracker.track(submissions))
+        for workflow in tracked:
+            self.tracked[workflow.workflow_id] = workflow.to_dict()
+            self.pipeline.record(workflow.scenario, workflow.test_type, {
+                'first_finding': workflow.first_finding,
+                'completion': workflow.completion
+            })
+        
+        finished = sum(1 for w in tracked if w.completion is not None)
+        source = '🔌 WebSocket events + polling' if tracker.used_websocket else '🔁 Adaptive polling'
+        print(f"{source}: {finished}/{len(tracked)} finished in {time.perf_counter() - started:.1f}s, "
+              f"{sum(w.polls for w in tracked)} status requests")
+        return [w.to_dict() for w in tracked]
+    
     def run_batch_tests(self, test_scenarios: List[Dict[str, Any]], 
                        test_name: str = "Test Scenarios") -> None:
         """Run a batch of test scenarios"""
@@ -120,6 +193,70 @@ class SecurityTestRunner:
             # Wait between tests
             time.sleep(DELAY_BETWEEN_TESTS)
     
+    def run_load_test(self, test_inputs: Dict[str, Any], mode: str, peak: float,
+                      ramp_up: float = 10, hold: float = 60, ramp_down: float = 5,
+                      workers: int = 32, think_time: float = 0.0, seed: int = None,
+                      include_edge_cases: bool = False, quick_only: bool = False,
+                      window: float = 5.0, processes: int = 0, remote_workers: int = 0,
+                      listen: str = '127.0.0.1:0', worker_token: str = None) -> List[Dict[str, Any]]:
+        """Submit a weighted scenario mix concurrently instead of one at a time.
+        
+        With `processes` local worker processes and/or `remote_workers` workers
+        connecting from other hosts, the profile is split between them and their
+        results are merged here.
+        """
+        mix = build_mix(test_inputs, include_edge_cases, quick_only, seed)
+        profile = LoadProfile(peak, ramp_up, hold, ramp_down)
+        
+        print(f"\n🚀 Load test: {mode}-loop, peak {peak:g} "
+              f"{'req/s' if mode == 'open' else 'users'}, "
+              f"{profile.ramp_up:g}s up / {profile.hold:g}s hold / {profile.ramp_down:g}s down")
+        print("Scenario mix:")
+        for line in mix.describe():
+            print(f"  {line}")
+        
+        if processes or remote_workers:
+            job = {
+                'api_url': self.api_url, 'api_key': self.session.headers.get('X-API-Key'),
+                'test_inputs': test_inputs,
+                'include_edge_cases': include_edge_cases, 'quick_only': quick_only,
+                'ramp_up': ramp_up, 'hold': hold, 'ramp_down': ramp_down,
+                'workers': -(-workers // (processes + remote_workers)), 'think_time': think_time
+            }
+            coordinator = Coordinator(listen, token=worker_token)
+            try:
+                coordinator.spawn_local(processes, [sys.executable, os.path.abspath(__file__)])
+                if remote_workers:
+                    print(f"⏳ Waiting for {remote_workers} remote workers: "
+                          f"python3 test-user-input-runner.py --worker <this-host>:{coordinator.port}")
+                coordinator.accept(processes + remote_workers)
+                replies = coordinator.run(job, peak, mode, seed)
+            finally:
+                coordinator.close()
+            results, offered = merge_replies(replies, self.latency)
+            for reply in replies:
+                print(f"  worker {reply['index']} ({reply['host']}:{reply['pid']}): "
+                      f"{reply['offered']} offered, {len(reply['results'])} completed")
+        else:
+            generator = LoadGenerator(
+                self.submit_workflow, mix, profile, mode,
+                workers=workers, think_time=think_time, seed=seed
+            )
+            share_connection_pool(self.session, generator.workers)
+            results = generator.run()
+            offered = generator.offered
+        
+        for result in results:
+            self.results['total'] += 1
+            if result['success']:
+                self.results['successful'].append(result)
+            else:
+                self.results['failed'].append(result)
+        
+        print(f"\n📤 Offered {offered} requests, completed {len(results)}")
+        print_timeline(timeline(results, profile, window), mode)
+        return results
+    
     def generate_report(self) -> str:
         """Generate a detailed test report"""
         duration = datetime.now() - self.results['start_time']
@@ -138,22 +275,43 @@ Total Tests: {self.results['total']}
 Success Rate: {(len(self.results['successful']) / self.results['total'] * 100):.1f}%
 """
         
+        if self.latency.histograms:
+            report += "\n\nSubmission Latency (ms)\n-----------------------\n"
+            for title, view in (("All requests", self.latency.view()),
+                                ("By test type", self.latency.view('testType')),
+                                ("By scenario", self.latency.view('scenario'))):
+                report += f"\n{title}\n"
+                report += "\n".join(format_table(view)) + "\n"
+        
         if self.results['failed']:
             report += "\n\nFailed Tests\n------------\n"
             for failure in self.results['failed']:
                 report += f"- {failure['scenario']}\n"
                 report += f"  Error: {failure['error']}\n\n"
         
+        if self.pipeline.histograms:
+            report += "\n\nEnd-to-End Pipeline Latency (ms)\n--------------------------------\n"
+            report += "\n".join(format_table(self.pipeline.view(), PIPELINE_PHASES)) + "\n"
+            report += "\n".join(format_table(self.pipeline.view('testType'), PIPELINE_PHASES)[2:]) + "\n"
+        
         if self.results['successful']:
             report += "\n\nSuccessful Tests\n---------------\n"
+            # One concurrent pass for workflows that were not tracked to completion
+            untracked = [s['workflowId'] for s in self.results['successful'] if s['workflowId'] not in self.tracked]
+            statuses = asyncio.run(WorkflowTracker(self.api_url).snapshot(untracked)) if untracked else {}
+            
             for success in self.results['successful']:
                 report += f"- {success['scenario']}\n"
                 report += f"  Workflow ID: {success['workflowId']}\n"
                 
-                # Check current status
-                status = self.check_workflow_status(success['workflowId'])
+                tracked = self.tracked.get(success['workflowId'])
+                status = tracked or statuses.get(success['workflowId'])
                 if status:
-                    report += f"  Current Status: {status.get('status', 'Unknown')}\n"
+                    report += f"  Current Status: {status.get('status') or 'Unknown'}\n"
+                if tracked and tracked['time_to_completion'] is not None:
+                    first = tracked['time_to_first_finding']
+                    report += (f"  Completed after {tracked['time_to_completion']:.1f}s"
+                               f"{f', first finding after {first:.1f}s' if first is not None else ''}\n")
                 report += "\n"
         
         return report
@@ -168,6 +326,9 @@ Success Rate: {(len(self.results['successful']) / self.results['total'] * 100):.
                 'timestamp': datetime.now().isoformat(),
                 'api_url': self.api_url,
                 'results': self.results,
+                'latency': self.latency.to_json(),
+                'pipeline': self.pipeline.to_json(),
+                'tracked': list(self.tracked.values()),
                 'summary': {
                     'total': self.results['total'],
                     'successful': len(self.results['successful']),
@@ -185,6 +346,114 @@ def load_test_inputs(filename: str = 'test-user-inputs.json') -> Dict[str, Any]:
         return json.load(f)
 
 
+def run_worker(address: str, token: str = None) -> int:
+    """Run one share of a distributed load test for the coordinator at `address`"""
+    
+    def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        runner = SecurityTestRunner(job['api_url'], job.get('api_key'))
+        mix = build_mix(job['test_inputs'], job['include_edge_cases'], job['quick_only'], job['seed'])
+        profile = LoadProfile(job['peak'], job['ramp_up'], job['hold'], job['ramp_down'])
+        generator = LoadGenerator(
+            runner.submit_workflow, mix, profile, job['mode'],
+            workers=job['workers'], think_time=job['think_time'], seed=job['seed']
+        )
+        share_connection_pool(runner.session, generator.workers)
+        time.sleep(max(0.0, job['start_at'] - time.perf_counter()))
+        results = generator.run() if job['peak'] > 0 else []
+        return {
+            'offered': generator.offered,
+            'results': [slim_result(r) for r in results],
+            'latency': runner.latency.to_json()
+        }
+    
+    return serve_worker(address, run_job, token)
+
+
+def run_benchmark(args, test_inputs: Dict[str, Any]) -> int:
+    """Run a seeded workload and compare it with the latest baseline; returns the exit code"""
+    workload = WORKLOADS[args.benchmark]
+    stub = None
+    api_url = args.api_url
+    if args.stub:
+        stub = StubBackend(**STUB_CONFIG)
+        api_url = stub.start_in_thread() + '/api'
+        print(f"🧪 Using local stub backend at {api_url}")
+    
+    try:
+        runner = SecurityTestRunner(api_url, args.api_key)
+        started = time.perf_counter()
+        results = runner.run_load_test(
+            test_inputs, workload['mode'], workload['peak'],
+            workload['ramp_up'], workload['hold'], workload['ramp_down'],
+            think_time=workload.get('think_time', 0.0), seed=workload['seed']
+        )
+        run = capture_run(args.benchmark, results, time.perf_counter() - started,
+                          'stub' if stub else api_url, STUB_CONFIG if stub else None)
+    finally:
+        if stub:
+            stub.stop_thread()
+    
+    regressed = False
+    baseline = load_baseline(args.baseline_dir, args.benchmark, args.baseline_version)
+    if baseline is None:
+        print(f"\nℹ️  No baseline for '{args.benchmark}' in {args.baseline_dir}; use --save-baseline to create one")
+    else:
+        if baseline['target'] != run['target'] or baseline.get('stub') != run['stub']:
+            print(f"⚠️  Baseline was taken against {baseline['target']}, this run against {run['target']}")
+        checks = compare_runs(baseline, run, args.threshold, args.alpha)
+        regressed = print_comparison(baseline, checks)
+    
+    if args.save_baseline:
+        print(f"\n💾 Baseline saved to: {save_baseline(args.baseline_dir, run)}")
+    
+    return 1 if regressed else 0
+
+
+def run_soak(args, test_inputs: Dict[str, Any]) -> int:
+    """Replay the scenario mix for --soak seconds while sampling backend metrics; returns the exit code"""
+    runner = SecurityTestRunner(args.api_url, args.api_key)
+    mode = args.load or 'open'
+    peak = args.rate if mode == 'open' else args.users
+    warmup = args.soak_warmup if args.soak_warmup is not None else args.soak * 0.1
+    prefix = args.soak_output or os.path.join('soak-results', f"soak-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    mix = build_mix(test_inputs, args.include_edge_cases, args.quick, args.seed)
+    sampler = SoakSampler(args.api_url, f"{prefix}.csv", args.soak_interval, dict(runner.session.headers))
+    
+    print(f"\n🧪 Soak test: {mode}-loop at {peak:g} {'req/s' if mode == 'open' else 'users'} for {args.soak:g}s, "
+          f"sampling every {args.soak_interval:g}s (warmup {warmup:g}s)")
+    print(f"📄 Time series: {sampler.path}")
+    sampler.start()
+    deadline = time.perf_counter() + args.soak
+    rounds = 0
+    try:
+        while time.perf_counter() < deadline:
+            length = min(SOAK_ROUND, deadline - time.perf_counter())
+            generator = LoadGenerator(
+                lambda scenario: sampler.record(runner.submit_workflow(scenario)),
+                mix, LoadProfile(peak, 0, length, 0), mode, workers=args.workers,
+                think_time=args.think_time, seed=None if args.seed is None else args.seed + rounds
+            )
+            if not rounds:
+                share_connection_pool(runner.session, generator.workers)
+            generator.run()
+            rounds += 1
+    except KeyboardInterrupt:
+        print("\n⏹️  Soak test interrupted; judging the samples taken so far")
+    finally:
+        sampler.stop()
+    
+    verdict = evaluate(sampler.samples, warmup, args.alpha, args.growth_threshold, args.max_error_rate,
+                       sampler.scrape_errors)
+    verdict.update({'mode': mode, 'peak': peak, 'duration': args.soak, 'interval': args.soak_interval,
+                    'timeSeries': sampler.path,
+                    'latency': runner.latency.to_json()['overall']})
+    print_verdict(verdict)
+    with open(f"{prefix}.json", 'w') as f:
+        json.dump(verdict, f, indent=2)
+    print(f"\n💾 Verdict saved to: {prefix}.json")
+    return 0 if verdict['verdict'] == 'pass' else 1
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Run security platform tests'
@@ -223,9 +492,170 @@ def main():
         action='store_true',
         help='Run only edge case tests'
     )
+    parser.add_argument(
+        '--benchmark',
+        choices=sorted(WORKLOADS),
+        help='Run a fixed, seeded benchmark workload and compare it with its baseline'
+    )
+    parser.add_argument(
+        '--stub',
+        action='store_true',
+        help='Benchmark against an in-process stub backend instead of --api-url'
+    )
+    parser.add_argument('--baseline-dir', default=BASELINE_DIR, help='Directory of versioned baselines')
+    parser.add_argument('--baseline-version', type=int, help='Compare with this baseline version (default: latest)')
+    parser.add_argument(
+        '--save-baseline',
+        action='store_true',
+        help='Store this benchmark run as the next baseline version'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.10,
+        help='Relative change that counts as a regression (default 0.10)'
+    )
+    parser.add_argument(
+        '--alpha',
+        type=float,
+        default=0.01,
+        help='Significance level for the Mann-Whitney latency test'
+    )
+    parser.add_argument(
+        '--track',
+        action='store_true',
+        help='Follow submitted workflows to completion and report end-to-end latency'
+    )
+    parser.add_argument(
+        '--track-timeout',
+        type=float,
+        default=600.0,
+        help='Give up tracking after this many seconds'
+    )
+    parser.add_argument(
+        '--ws-url',
+        help='WebSocket endpoint for workflow events (default: derived from --api-url)'
+    )
+    parser.add_argument(
+        '--no-ws',
+        action='store_true',
+        help='Track by adaptive polling only'
+    )
+    parser.add_argument(
+        '--latency-json',
+        metavar='FILE',
+        help='Write latency histograms and percentiles as JSON'
+    )
+    parser.add_argument(
+        '--prometheus',
+        metavar='FILE',
+        help='Write latency histograms in Prometheus text exposition format'
+    )
+    parser.add_argument(
+        '--load',
+        choices=LOAD_MODES,
+        help='Concurrent load mode: open (target arrival rate) or closed (virtual users)'
+    )
+    parser.add_argument(
+        '--rate',
+        type=positive_rate,
+        default=5.0,
+        help='Peak arrival rate in requests/s for open-loop load'
+    )
+    parser.add_argument(
+        '--users',
+        type=positive_users,
+        default=10,
+        help='Peak virtual users for closed-loop load'
+    )
+    parser.add_argument('--ramp-up', type=float, default=10.0, help='Ramp-up stage in seconds')
+    parser.add_argument('--hold', type=float, default=60.0, help='Hold stage in seconds')
+    parser.add_argument('--ramp-down', type=float, default=5.0, help='Ramp-down stage in seconds')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=32,
+        help='Thread pool and connection pool size for open-loop load'
+    )
+    parser.add_argument(
+        '--think-time',
+        type=float,
+        default=0.0,
+        help='Mean pause between requests per virtual user (closed loop)'
+    )
+    parser.add_argument('--window', type=float, default=5.0, help='Timeline window in seconds')
+    parser.add_argument('--seed', type=int, help='Seed for arrivals and scenario mix')
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=0,
+        help='Split load across this many local worker processes'
+    )
+    parser.add_argument(
+        '--remote-workers',
+        type=int,
+        default=0,
+        help='Also wait for this many workers from other hosts (see --listen and --worker)'
+    )
+    parser.add_argument(
+        '--listen',
+        default='127.0.0.1:0',
+        help='Coordinator address for workers, e.g. 0.0.0.0:7700 to accept remote workers'
+    )
+    parser.add_argument(
+        '--worker',
+        metavar='HOST:PORT',
+        help='Run as a load worker for the coordinator at HOST:PORT'
+    )
+    parser.add_argument(
+        '--worker-token',
+        default=os.getenv(TOKEN_ENV),
+        help=f'Shared secret workers must present; required with a non-loopback --listen (default: ${TOKEN_ENV})'
+    )
+    parser.add_argument(
+        '--soak',
+        type=float,
+        metavar='SECONDS',
+        help='Soak test: replay the load mix continuously for this long and check for resource drift'
+    )
+    parser.add_argument('--soak-interval', type=float, default=30.0, help='Seconds between metric samples')
+    parser.add_argument(
+        '--soak-warmup',
+        type=float,
+        help='Ignore samples from the first N seconds when fitting trends (default: 10%% of --soak)'
+    )
+    parser.add_argument('--soak-output', metavar='PREFIX', help='Write PREFIX.csv and PREFIX.json')
+    parser.add_argument(
+        '--growth-threshold',
+        type=float,
+        default=0.20,
+        help='Fail a soak when memory, queue depth or p95 latency trends upward by more than this fraction'
+    )
+    parser.add_argument(
+        '--max-error-rate',
+        type=float,
+        default=0.05,
+        help='Fail a soak when more than this fraction of submissions error'
+    )
+    parser.add_argument(
+        '--api-key',
+        default=os.getenv('API_KEY'),
+        help='API key sent as X-API-Key with every request (default: $API_KEY)'
+    )
+    parser.add_argument(
+        '--include-edge-cases',
+        action='store_true',
+        help='Include edge cases in the load mix'
+    )
     
     args = parser.parse_args()
     
+    if args.worker:
+        sys.exit(run_worker(args.worker, args.worker_token))
+    if (args.processes or args.remote_workers) and not args.worker_token \
+            and not is_loopback(parse_address(args.listen)[0]):
+        parser.error(f"--listen {args.listen} accepts remote workers; set --worker-token or ${TOKEN_ENV}")
+    
     # Load test inputs
     test_inputs = load_test_inputs()
     
@@ -239,10 +669,24 @@ def main():
             print(f"  - {scenario['scenario']}: {scenario['description']}")
         return
     
+    if args.benchmark:
+        sys.exit(run_benchmark(args, test_inputs))
+    
+    if args.soak:
+        sys.exit(run_soak(args, test_inputs))
+    
     # Initialize test runner
-    runner = SecurityTestRunner(args.api_url)
+    runner = SecurityTestRunner(args.api_url, args.api_key)
     
-    if args.scenario:
+    if args.load:
+        runner.run_load_test(
+            test_inputs, args.load, args.rate if args.load == 'open' else args.users,
+            args.ramp_up, args.hold, args.ramp_down, args.workers, args.think_time,
+            args.seed, args.include_edge_cases, args.quick, args.window,
+            args.processes, args.remote_workers, args.listen, args.worker_token
+        )
+    
+    elif args.scenario:
         # Run specific scenario
         all_scenarios = test_inputs['test_scenarios'] + test_inputs['edge_cases']
         scenario = next((s for s in all_scenarios if s['scenario'] == args.scenario), None)
@@ -266,6 +710,9 @@ def main():
             runner.run_batch_tests(test_inputs['test_scenarios'], "Test Scenarios")
             runner.run_batch_tests(test_inputs['edge_cases'], "Edge Cases")
     
+    if args.track:
+        runner.track_workflows(args.ws_url, args.track_timeout, not args.no_ws)
+    
     # Generate report if requested
     if args.report:
         report = runner.generate_report()
@@ -281,6 +728,11 @@ def main():
     if args.save_results:
         runner.save_results()
     
+    if args.latency_json:
+        print(f"\n⏱️  Latency histograms saved to: {save_json(runner.latency, args.latency_json)}")
+    if args.prometheus:
+        print(f"\n📈 Prometheus metrics saved to: {save_prometheus(runner.latency, args.prometheus, runner.pipeline)}")
+    
     # Print summary
     print(f"\n\n📊 Test Summary")
     print("===============")
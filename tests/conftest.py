@@ -0,0 +1,23 @@
+"""
+Shared fixtures for the Python tooling tests
+Puts the repository root and scripts/ on sys.path and loads the hyphenated entry-point scripts
+"""
+
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.join(ROOT, 'scripts')
+
+for path in (ROOT, SCRIPTS):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def load_script(path: str, name: str):
+    """Import a script whose file name is not a valid module name, e.g. generate-embeddings.py"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,38 @@
+import pytest
+
+from ann_index import HNSWIndex, IVFFlatIndex, hnswlib, recall_report
+from embedding_reduce import mock_embeddings
+
+KEYS = [f"A{i}" for i in range(200)]
+VECTORS = mock_embeddings(KEYS, 32)
+
+
+def test_ivf_recall_grows_with_nprobe(tmp_path):
+    index = IVFFlatIndex(32, nlist=10, nprobe=1)
+    index.train(VECTORS)
+    index.add(KEYS[:100], VECTORS[:100])
+    index.add(KEYS[100:], VECTORS[100:])
+    assert len(index) == 200
+    assert index.search(VECTORS[150], k=1)[0][0][0] == 'A150'
+
+    queries = mock_embeddings(['q1', 'q2', 'q3', 'q4'], 32)
+    rows = recall_report(index, KEYS, VECTORS, queries, 10, [{'nprobe': 1}, {'nprobe': 10}])
+    assert rows[0]['setting'] == 'brute-force'
+    assert rows[1]['recall'] <= rows[2]['recall'] == 1.0
+
+    path = str(tmp_path / 'ivf.npz')
+    index.save(path)
+    loaded = IVFFlatIndex.load(path)
+    assert loaded.search(queries, k=5) == index.search(queries, k=5)
+    with pytest.raises(RuntimeError):
+        IVFFlatIndex(32).add(['x'], VECTORS[:1])
+
+
+@pytest.mark.skipif(hnswlib is None, reason='hnswlib is not installed')
+def test_hnsw_finds_exact_matches(tmp_path):
+    index = HNSWIndex(32, max_elements=50)
+    index.add(KEYS, VECTORS)
+    assert index.search(VECTORS[42], k=1)[0][0][0] == 'A42'
+    path = str(tmp_path / 'hnsw.bin')
+    index.save(path)
+    assert HNSWIndex.load(path).search(VECTORS[42], k=1)[0][0][0] == 'A42'
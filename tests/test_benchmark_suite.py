@@ -0,0 +1,74 @@
+import random
+
+from benchmark_suite import BASELINE_SCHEMA, compare_runs, load_baseline, mann_whitney_u, save_baseline
+from latency_histogram import LatencyHistogram
+
+
+def make_run(samples, throughput=100.0, error_rate=0.0, workload='smoke'):
+    histogram = LatencyHistogram()
+    for value in samples:
+        histogram.record(value)
+    return {
+        'schema': BASELINE_SCHEMA,
+        'workload': workload,
+        'samples': sorted(samples),
+        'metrics': {'throughput': throughput, 'error_rate': error_rate, 'latency': histogram.summary()}
+    }
+
+
+def test_mann_whitney_detects_a_shift():
+    rng = random.Random(1)
+    baseline = [rng.gauss(0.10, 0.01) for _ in range(200)]
+    slower = [rng.gauss(0.12, 0.01) for _ in range(200)]
+    _, p_value = mann_whitney_u(baseline, slower)
+    assert p_value < 1e-6
+
+
+def test_mann_whitney_is_one_sided():
+    rng = random.Random(2)
+    baseline = [rng.gauss(0.10, 0.01) for _ in range(200)]
+    faster = [rng.gauss(0.08, 0.01) for _ in range(200)]
+    _, p_value = mann_whitney_u(baseline, faster)
+    assert p_value > 0.99
+
+
+def test_mann_whitney_handles_ties_and_empty_samples():
+    assert mann_whitney_u([], [1.0]) == (0.0, 1.0)
+    u, p_value = mann_whitney_u([1.0] * 10, [1.0] * 10)
+    assert u == 50.0
+    assert p_value == 1.0
+
+
+def test_compare_runs_flags_significant_latency_regression():
+    rng = random.Random(3)
+    baseline = make_run([rng.gauss(0.10, 0.005) for _ in range(300)])
+    current = make_run([rng.gauss(0.13, 0.005) for _ in range(300)])
+    checks = {c['metric']: c for c in compare_runs(baseline, current)}
+    assert checks['median latency']['regressed']
+    assert checks['p99 latency']['regressed']
+    assert not checks['throughput']['regressed']
+    assert not checks['error rate']['regressed']
+
+
+def test_compare_runs_ignores_noise_below_threshold():
+    rng = random.Random(4)
+    baseline = make_run([rng.gauss(0.10, 0.005) for _ in range(300)])
+    current = make_run([rng.gauss(0.103, 0.005) for _ in range(300)])
+    assert not any(c['regressed'] for c in compare_runs(baseline, current))
+
+
+def test_compare_runs_flags_throughput_and_errors():
+    samples = [0.1] * 50
+    checks = {c['metric']: c for c in compare_runs(make_run(samples), make_run(samples, 80.0, 0.05))}
+    assert checks['throughput']['regressed']
+    assert checks['error rate']['regressed']
+    assert not checks['median latency']['regressed']
+
+
+def test_baselines_are_versioned(tmp_path):
+    first = save_baseline(str(tmp_path), make_run([0.1]))
+    second = save_baseline(str(tmp_path), make_run([0.2]))
+    assert first.endswith('v1.json') and second.endswith('v2.json')
+    assert load_baseline(str(tmp_path), 'smoke')['version'] == 2
+    assert load_baseline(str(tmp_path), 'smoke', version=1)['samples'] == [0.1]
+    assert load_baseline(str(tmp_path), 'missing') is None
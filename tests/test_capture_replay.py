@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import pytest
+
+from capture_replay import epoch_seconds, load_session, parse_speed, replay
+from event_capture import EventCapture
+
+
+def test_parse_speed():
+    assert parse_speed('max') == 0.0
+    assert parse_speed('0') == 0.0
+    assert parse_speed('4x') == 4.0
+    assert parse_speed('0.5') == 0.5
+    with pytest.raises(ValueError):
+        parse_speed('-2')
+
+
+def test_epoch_seconds_accepts_iso_and_milliseconds():
+    assert epoch_seconds('2025-01-01T00:00:00Z') == 1735689600.0
+    assert epoch_seconds(1735689600000) == 1735689600.0
+    assert epoch_seconds(1735689600) == 1735689600.0
+    assert epoch_seconds('yesterday') is None
+    assert epoch_seconds(None) is None
+
+
+def test_rotated_capture_loads_by_prefix_without_control_messages(tmp_path):
+    capture = EventCapture(str(tmp_path / 'ai-capture-w1'), 'gzip', max_bytes=120)
+    capture.write({'type': 'subscribed', 'workflowId': 'w1'}, 100.0)
+    for i in range(6):
+        capture.write({'type': 'ai:thinking', 'content': f"thought {i}"}, 100.5 + i)
+    capture.write({'type': 'workflow:complete'}, 110.0)
+    capture.close()
+    assert len(capture.files) > 1
+
+    events = load_session(str(tmp_path / 'ai-capture-w1'))
+    assert [msg['type'] for _, msg in events] == ['ai:thinking'] * 6 + ['workflow:complete']
+    assert events[0][0] == 0.5
+    assert events[-1][0] == 10.0
+
+
+def test_analysis_summary_becomes_an_event_stream(tmp_path):
+    path = tmp_path / 'ai-analysis-w1.json'
+    path.write_text(json.dumps({
+        'aiThoughts': [{'timestamp': '2025-01-01T00:00:00', 'phase': 'analysis', 'thought': 'first'},
+                       {'timestamp': '2025-01-01T00:00:02', 'phase': 'planning', 'thought': 'second'}],
+        'testPlan': {'steps': [{'tool': 'nmap'}]},
+        'findings': [{'severity': 'high', 'timestamp': '2025-01-01T00:00:05'}],
+        'duration': 8,
+        'counts': {}
+    }))
+    events = load_session(str(path))
+    assert [msg['type'] for _, msg in events] == ['ai:thinking', 'ai:thinking', 'test:plan', 'finding',
+                                                  'workflow:complete']
+    assert events[0][1]['content'] == 'first'
+    assert [offset for offset, _ in events] == [0.0, 2.0, 2.0, 5.0, 8.0]
+
+
+def test_broken_workflow_output_is_salvaged(tmp_path):
+    path = tmp_path / 'workflow.json'
+    path.write_text('{\n  "curl": <html>oops</html>,\n  "result": {"phases": [{"phase": "recon", "results": '
+                    '[{"tool": "nmap", "startTime": 1000, "endTime": 1002, "findings": [{"title": "open port"}]}]}],'
+                    ' "endTime": 1003, "status": "completed"}\n}\n')
+    events = load_session(str(path))
+    assert [(offset, msg['type']) for offset, msg in events] == [
+        (0.0, 'test:start'), (2.0, 'finding'), (3.0, 'workflow:complete')]
+    assert events[1][1]['description'] == 'open port'
+
+
+def test_replay_stops_when_the_handler_returns_false():
+    events = [(0.0, {'type': 'ai:thinking'}), (0.0, {'type': 'workflow:complete'}), (0.0, {'type': 'late'})]
+    seen = []
+
+    async def handler(msg):
+        seen.append(msg['type'])
+        return msg['type'] != 'workflow:complete'
+
+    report = asyncio.run(replay(events, handler, speed=0))
+    assert seen == ['ai:thinking', 'workflow:complete']
+    assert report.events == 2
+    assert report.to_dict()['lag'] is None
+
+
+def test_replay_keeps_the_recorded_schedule():
+    events = [(0.0, {'type': 'a'}), (0.05, {'type': 'b'}), (0.1, {'type': 'c'})]
+    report = asyncio.run(replay(events, lambda msg: None, speed=2.0))
+    assert report.elapsed >= 0.05
+    assert report.lag.total_count == 3
@@ -0,0 +1,119 @@
+import socket
+import threading
+
+import pytest
+
+from distributed_load import (Coordinator, _receive, _send, is_loopback, merge_replies, parse_address,
+                              serve_worker, split_level)
+from latency_histogram import LatencyRecorder
+
+
+def reply_for(job):
+    recorder = LatencyRecorder()
+    recorder.record('login', 'quick', {'total': 0.1 * (job['index'] + 1)})
+    results = [{'offset': job['index'] + 0.5, 'success': True}, {'offset': job['index'], 'success': True}]
+    return {'offered': 2, 'results': results, 'latency': recorder.to_json(), 'echo': job}
+
+
+def start_worker(address, token, run_job=reply_for):
+    codes = []
+    thread = threading.Thread(target=lambda: codes.append(serve_worker(address, run_job, token)), daemon=True)
+    thread.start()
+    return thread, codes
+
+
+def test_split_level():
+    assert split_level(10.0, 'open', 4) == [2.5] * 4
+    assert split_level(10, 'closed', 4) == [3, 3, 2, 2]
+    assert sum(split_level(7, 'closed', 3)) == 7
+
+
+def test_addresses():
+    assert parse_address('example.com:7700') == ('example.com', 7700)
+    assert is_loopback('127.0.0.1') and is_loopback('localhost') and is_loopback('::1')
+    assert not is_loopback('0.0.0.0') and not is_loopback('coordinator-host')
+
+
+def test_remote_binds_need_a_token():
+    with pytest.raises(ValueError):
+        Coordinator('0.0.0.0:0')
+    coordinator = Coordinator('127.0.0.1:0')
+    assert coordinator.token  # loopback gets a random one for local workers
+    coordinator.close()
+
+
+def test_run_merges_worker_replies():
+    coordinator = Coordinator('127.0.0.1:0', connect_timeout=10, token='secret')
+    workers = [start_worker(coordinator.address, 'secret') for _ in range(2)]
+    try:
+        coordinator.accept(2)
+        assert all('token' not in hello for _, _, hello in coordinator.workers)
+        replies = coordinator.run({'api_url': 'http://stub', 'api_key': 'k'}, 9, 'closed', seed=10)
+    finally:
+        coordinator.close()
+    for thread, codes in workers:
+        thread.join(5)
+        assert codes == [0]
+
+    jobs = sorted((reply['echo'] for reply in replies), key=lambda job: job['index'])
+    assert [job['peak'] for job in jobs] == [5, 4]
+    assert [job['seed'] for job in jobs] == [10, 11]
+    assert all(job['api_key'] == 'k' and 'start_at' in job for job in jobs)
+
+    recorder = LatencyRecorder()
+    results, offered = merge_replies(replies, recorder)
+    assert offered == 4
+    assert [r['offset'] for r in results] == [0, 0.5, 1, 1.5]
+    assert recorder.view()['all']['total'].total_count == 2
+
+
+def test_workers_with_the_wrong_token_are_turned_away():
+    coordinator = Coordinator('127.0.0.1:0', connect_timeout=1, token='secret')
+    # A peer that connects without a hello is dropped after the connect timeout
+    silent = socket.create_connection(parse_address(coordinator.address))
+    intruder, intruder_codes = start_worker(coordinator.address, 'guess')
+    honest, honest_codes = start_worker(coordinator.address, 'secret')
+    try:
+        coordinator.accept(1)
+        coordinator.run({}, 1.0, 'open')
+    finally:
+        coordinator.close()
+    silent.close()
+    intruder.join(5)
+    honest.join(5)
+    assert intruder_codes == [1]
+    assert honest_codes == [0]
+    assert coordinator.rejected >= 1
+
+
+def test_worker_without_a_token_does_not_connect(monkeypatch):
+    monkeypatch.delenv('LOAD_WORKER_TOKEN', raising=False)
+    assert serve_worker('127.0.0.1:1', reply_for) == 2
+
+
+def test_worker_errors_are_reported_to_the_coordinator():
+    def fail(job):
+        raise RuntimeError('no test inputs')
+
+    coordinator = Coordinator('127.0.0.1:0', connect_timeout=10, token='secret')
+    thread, codes = start_worker(coordinator.address, 'secret', fail)
+    try:
+        coordinator.accept(1)
+        with pytest.raises(RuntimeError, match='no test inputs'):
+            coordinator.run({}, 1.0, 'open')
+    finally:
+        coordinator.close()
+    thread.join(5)
+    assert codes == [1]
+
+
+def test_messages_are_newline_delimited_json():
+    left, right = socket.socketpair()
+    with left.makefile('rwb') as writer, right.makefile('rwb') as reader:
+        _send(writer, {'type': 'hello', 'text': 'line\nbreak'})
+        assert _receive(reader) == {'type': 'hello', 'text': 'line\nbreak'}
+        writer.close()
+        left.close()
+        with pytest.raises(ConnectionError):
+            _receive(reader)
+    right.close()
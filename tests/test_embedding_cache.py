@@ -0,0 +1,41 @@
+import time
+
+from embedding_cache import EmbeddingCache, cache_key
+
+
+def test_cache_key_depends_on_model_and_dimension():
+    assert cache_key('text', 'a', 8) != cache_key('text', 'b', 8)
+    assert cache_key('text', 'a', 8) != cache_key('text', 'a', 16)
+    assert cache_key('text', 'a', 8) == cache_key('text', 'a', 8)
+
+
+def test_get_many_returns_hits_only(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite'), model='m', dimension=2)
+    cache.put_many([('one', [0.1, 0.2]), ('two', [0.3, 0.4])])
+    assert cache.get_many(['one', 'three']) == {'one': [0.1, 0.2]}
+    assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0, 'writes': 2}
+    cache.close()
+
+    other_model = EmbeddingCache(str(tmp_path / 'cache.sqlite'), model='other', dimension=2)
+    assert other_model.get_many(['one']) == {}
+    other_model.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = EmbeddingCache(path, model='m', dimension=1, max_entries=2)
+    cache.put_many([('old', [1.0])])
+    time.sleep(0.01)
+    cache.put_many([('used', [2.0])])
+    time.sleep(0.01)
+    cache.get_many(['old'])  # touching it makes 'used' the oldest
+    time.sleep(0.01)
+    cache.put_many([('new', [3.0])])
+    assert len(cache) == 2
+    assert set(cache.get_many(['old', 'used', 'new'])) == {'old', 'new'}
+    assert cache.stats['evictions'] == 1
+    cache.close()
+
+    shrunk = EmbeddingCache(path, model='m', dimension=1, max_entries=1)
+    assert len(shrunk) == 1
+    shrunk.close()
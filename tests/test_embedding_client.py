@@ -0,0 +1,50 @@
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+
+from embedding_client import RateLimiter, TokenBucket, backoff_delay, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('2.5') == 2.5
+    assert parse_retry_after('-1') == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(formatdate(time.time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+
+
+def test_backoff_delay_is_capped():
+    assert all(0 <= backoff_delay(attempt, base=1.0, cap=4.0) <= 4.0 for attempt in range(10))
+    assert all(backoff_delay(0, base=0.5) <= 0.5 for _ in range(20))
+
+
+def test_token_bucket_spends_its_burst_then_waits():
+    async def run():
+        bucket = TokenBucket(per_minute=600, capacity=2)  # 10 per second
+        start = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert 0.07 < asyncio.run(run()) < 0.5
+
+
+def test_oversized_requests_do_not_wait_forever():
+    async def run():
+        bucket = TokenBucket(per_minute=60000, capacity=10)
+        await asyncio.wait_for(bucket.acquire(100), 1)
+
+    asyncio.run(run())
+
+
+def test_rate_limiter_honours_a_pause():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+        limiter.pause(0.1)
+        start = time.monotonic()
+        await limiter.acquire(1)
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.09
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from embedding_index import EmbeddingIndex
+from embedding_reduce import mock_embeddings
+from embedding_store import write_store_streaming
+
+KEYS = [f"A{i}" for i in range(200)]
+VECTORS = mock_embeddings(KEYS, 32)
+
+
+def test_brute_force_search_and_filters(tmp_path):
+    metadata = [{'tsc': ['CC6'] if i % 2 else ['CC7'], 'requires_auth': i < 10} for i in range(len(KEYS))]
+    index = EmbeddingIndex(KEYS, VECTORS * 3.0, metadata)
+    top = index.search(VECTORS[5], k=3)[0]
+    assert top[0][0] == 'A5' and top[0][1] == pytest.approx(1.0)
+    assert [s for _, s in top] == sorted((s for _, s in top), reverse=True)
+
+    odd = index.search(VECTORS[4], k=5, tsc=['CC6'])[0]
+    assert all(int(key[1:]) % 2 for key, _ in odd)
+    assert len(index.search(VECTORS[0], k=50, requires_auth=True)[0]) == 10
+    assert index.search(VECTORS[0], tsc=['unknown']) == [[]]
+    with pytest.raises(ValueError):
+        index.search(np.ones(8))
+
+    path = str(tmp_path / 'embeddings.npy')
+    records = ({'section': 'attack_patterns', 'key': k, 'text': k, 'embedding': v} for k, v in zip(KEYS, VECTORS))
+    write_store_streaming(path, records, len(KEYS), VECTORS.shape[1], {})
+    assert EmbeddingIndex.from_file(path).search(VECTORS[7], k=1)[0][0][0] == 'A7'
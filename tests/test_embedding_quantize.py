@@ -0,0 +1,77 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+import embedding_quantize
+from embedding_quantize import PQ_MIN_POINTS_PER_CENTROID, dequantize, evaluate, load_quantized, quantize, \
+    write_evaluated, write_quantized
+from embedding_reduce import mock_embeddings
+from embedding_store import write_store_streaming
+
+
+def records(count):
+    return [{'section': 'attack_patterns', 'key': str(i)} for i in range(count)]
+
+
+@pytest.mark.parametrize('method, tolerance', [('float16', 1e-3), ('int8', 1e-2)])
+def test_scalar_methods_round_trip(tmp_path, method, tolerance):
+    matrix = mock_embeddings([str(i) for i in range(50)], 32)
+    approx = dequantize(quantize(matrix, method), method)
+    assert np.abs(approx - matrix).max() < tolerance
+
+    path = str(tmp_path / f"embeddings.{method}.npz")
+    sizes = write_quantized(path, matrix, method)
+    assert sizes['codes'] < matrix.nbytes
+    assert np.array_equal(load_quantized(path), approx)
+
+
+def test_int8_handles_zero_rows():
+    codes = quantize(np.zeros((2, 4)), 'int8')
+    assert np.array_equal(dequantize(codes, 'int8'), np.zeros((2, 4)))
+
+
+def test_pq_needs_enough_training_vectors():
+    matrix = mock_embeddings([str(i) for i in range(100)], 16)
+    with pytest.raises(ValueError, match='training vectors'):
+        quantize(matrix, 'pq', subvectors=4, centroids=16)
+    with pytest.raises(ValueError):
+        quantize(matrix, 'pq', subvectors=5)
+    with pytest.raises(ValueError):
+        quantize(matrix, 'binary')
+
+
+def test_pq_is_scored_on_held_out_vectors():
+    count = PQ_MIN_POINTS_PER_CENTROID * 4 * 2
+    matrix = mock_embeddings([str(i) for i in range(count)], 16)
+    rows, evaluated = evaluate(matrix, 'pq', records(count), k=5, subvectors=4, centroids=4)
+    assert evaluated == f"{int(count * 0.2)} held-out vectors"
+    assert rows[0]['count'] == int(count * 0.2)
+    assert 0.0 <= rows[0]['topk_overlap'] <= 1.0
+
+    rows, evaluated = evaluate(matrix, 'float16', records(count))
+    assert evaluated == f"all {count} vectors"
+    assert rows[0]['topk_overlap'] > 0.95
+
+
+def test_pq_that_fits_all_rows_but_not_the_training_split_is_skipped(tmp_path, monkeypatch, capsys):
+    # 170 rows fit 4 centroids (156 needed) but the 80% training split has only 136
+    count = PQ_MIN_POINTS_PER_CENTROID * 4 + 14
+    matrix = mock_embeddings([str(i) for i in range(count)], 16)
+    quantize(matrix, 'pq', subvectors=4, centroids=4)
+    path = str(tmp_path / 'embeddings.pq.npz')
+    with pytest.raises(ValueError, match='got 136'):
+        write_evaluated(path, matrix, 'pq', records(count), subvectors=4, centroids=4)
+    assert not os.path.exists(path)
+
+    store = str(tmp_path / 'embeddings.npy')
+    write_store_streaming(store, ({'section': 'attack_patterns', 'key': str(i), 'text': str(i), 'embedding': v}
+                                  for i, v in enumerate(matrix)), count, 16, {})
+    monkeypatch.setattr(sys, 'argv', ['embedding_quantize.py', '--input', store, '--method', 'pq',
+                                      '--method', 'int8', '--subvectors', '4', '--centroids', '4'])
+    embedding_quantize.main()
+    output = capsys.readouterr().out
+    assert 'pq — not applicable' in output
+    assert not os.path.exists(str(tmp_path / 'embeddings.pq.npz'))
+    assert os.path.exists(str(tmp_path / 'embeddings.int8.npz'))
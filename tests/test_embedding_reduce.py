@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from embedding_reduce import PCAReducer, conform, make_reducer, mock_embeddings
+
+
+def test_mock_embeddings_are_deterministic_unit_vectors():
+    first = mock_embeddings(['a', 'b', 'a'], 64)
+    assert first.shape == (3, 64) and first.dtype == np.float32
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+    assert np.array_equal(first[0], first[2])
+    assert not np.allclose(first[0], first[1])
+    assert np.array_equal(mock_embeddings(['b'], 64)[0], first[1])
+
+
+def test_truncate_keeps_the_prefix_and_renormalises():
+    reducer = make_reducer('truncate', 2)
+    assert not reducer.needs_fit()
+    assert np.allclose(conform([3.0, 4.0, 12.0], 2, reducer), [0.6, 0.8])
+    assert conform([1.0, 2.0], 2, reducer).tolist() == [1.0, 2.0]
+    with pytest.raises(ValueError):
+        conform([1.0], 2, reducer)
+    with pytest.raises(ValueError):
+        make_reducer('umap', 2)
+
+
+def test_pca_finds_the_dominant_directions_from_partial_fits(tmp_path):
+    rng = np.random.default_rng(0)
+    # Variance lives in the first two of eight dimensions
+    vectors = np.hstack([rng.normal(size=(400, 2)) * [5.0, 3.0], rng.normal(size=(400, 6)) * 0.01])
+    reducer = PCAReducer(2)
+    assert reducer.needs_fit()
+    with pytest.raises(ValueError):
+        reducer.finish_fit()
+    for chunk in np.array_split(vectors, 4):
+        reducer.partial_fit(chunk)
+    assert reducer.finish_fit() == 400
+    assert np.allclose(np.abs(reducer.components[:, :2]), np.eye(2), atol=0.01)
+
+    path = str(tmp_path / 'pca.npz')
+    reducer.save(path)
+    loaded = PCAReducer.load(path)
+    assert np.allclose(loaded.transform(vectors[:5]), reducer.transform(vectors[:5]))
+    assert conform(vectors[0], 2, loaded).shape == (2,)
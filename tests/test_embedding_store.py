@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pytest
+
+from embedding_store import (EmbeddingCheckpoint, load_embeddings, load_store, sidecar_path, text_digest,
+                             write_json_streaming, write_store_streaming)
+
+
+def record(key, vector, section='attack_patterns', **extra):
+    return dict({'section': section, 'key': key, 'text': f"text for {key}", 'embedding': vector}, **extra)
+
+
+RECORDS = [record('A1', [1.0, 0.0, 0.0], metadata={'tsc': ['CC6']}),
+           record('A2', [0.0, 1.0, 0.0]),
+           record('CC6.1', [0.0, 0.0, 1.0], section='cc_descriptions')]
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / 'embeddings.npy')
+    assert write_store_streaming(path, iter(RECORDS), 3, 3, {'model': 'm'}, dtype='float16') == 3
+
+    store = load_store(path)
+    assert len(store) == 3
+    assert store.metadata['dimension'] == 3 and store.metadata['dtype'] == 'float16'
+    assert store.matrix.dtype == np.float16
+    assert store.rows('attack_patterns') == [0, 1]
+    assert store.get('cc_descriptions', 'CC6.1').tolist() == [0.0, 0.0, 1.0]
+    assert store.get('attack_patterns', 'missing') is None
+    legacy = store.to_dict()
+    assert legacy['attack_patterns']['A1'] == {'text': 'text for A1', 'embedding': [1.0, 0.0, 0.0],
+                                               'metadata': {'tsc': ['CC6']}}
+    assert legacy['tsc_descriptions'] == {}
+
+
+def test_store_rejects_wrong_dimensions_and_unknown_dtypes(tmp_path):
+    path = str(tmp_path / 'embeddings.npy')
+    with pytest.raises(ValueError, match='A2 has 1 dimensions'):
+        write_store_streaming(path, iter([record('A1', [1.0, 2.0]), record('A2', [1.0])]), 2, 2, {})
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(ValueError):
+        write_store_streaming(path, iter(RECORDS), 3, 3, {}, dtype='int8')
+
+
+def test_streaming_writers_match_the_in_memory_layout(tmp_path):
+    matrix_path = str(tmp_path / 'streamed.npy')
+    write_store_streaming(matrix_path, iter(RECORDS), 3, 3, {'model': 'm'})
+    json_path = str(tmp_path / 'streamed.json')
+    assert write_json_streaming(json_path, lambda: iter(RECORDS), {'model': 'm'}) == 3
+
+    assert load_embeddings(json_path) == dict(load_store(matrix_path).to_dict(),
+                                              metadata={'model': 'm'})
+    with open(sidecar_path(matrix_path)) as f:
+        assert json.load(f)['metadata']['count'] == 3
+
+
+def test_checkpoint_resume(tmp_path):
+    path = str(tmp_path / 'partial.jsonl')
+    checkpoint = EmbeddingCheckpoint(path, flush_every=1)
+    checkpoint.open(resume=False)
+    checkpoint.append(record('A1', [1.0, 0.0]))
+    checkpoint.append(record('A2', [0.0, 1.0], mock=True))
+    checkpoint.append(record('A1', [0.5, 0.5]))
+    checkpoint.close()
+    with open(path, 'a') as f:
+        f.write('{"section": "attack_patterns", "key": "A3", "te')  # torn by a crash
+
+    resumed = EmbeddingCheckpoint(path)
+    done = resumed.completed()
+    assert done == {('attack_patterns', 'A1', text_digest('text for A1'))}
+    assert resumed.retryable == 1
+    with open(path) as f:
+        assert f.read().endswith('}\n')
+
+    resumed.open()
+    resumed.append(record('A2', [0.0, 1.0]))
+    resumed.close()
+    assert EmbeddingCheckpoint(path).completed() == done | {('attack_patterns', 'A2', text_digest('text for A2'))}
+
+    lines, dimensions = resumed.latest({('attack_patterns', 'A1'), ('attack_patterns', 'A2')})
+    assert dimensions == {2}
+    assert [(r['key'], r['embedding'], r.get('mock')) for r in resumed.records(lines)] == [
+        ('A1', [0.5, 0.5], None), ('A2', [0.0, 1.0], None)]
+    assert resumed.latest({('attack_patterns', 'A2')})[0] == [3]
+
+    resumed.remove()
+    assert EmbeddingCheckpoint(path).completed() == set()
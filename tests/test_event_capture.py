@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+from event_capture import EventCapture, EventSummary, iter_capture
+from event_model import EventDecoder
+
+
+def read_messages(capture):
+    return [record['message'] for record in iter_capture(capture.files)]
+
+
+@pytest.mark.parametrize('compression', ['none', 'gzip'])
+def test_round_trip(tmp_path, compression):
+    capture = EventCapture(str(tmp_path / 'cap'), compression)
+    messages = [{'type': 'finding', 'seq': i} for i in range(5)]
+    for i, msg in enumerate(messages):
+        capture.write(msg, 1000.0 + i)
+    capture.close()
+    assert read_messages(capture) == messages
+    assert [r['receivedAt'] for r in iter_capture(capture.files)] == [1000.0 + i for i in range(5)]
+
+
+def test_raw_frames_are_written_verbatim(tmp_path):
+    capture = EventCapture(str(tmp_path / 'cap'), 'none')
+    frame = '{"type": "ai:thinking",  "content": "spacing kept"}'
+    capture.write(EventDecoder('json')(frame), 1.0, frame)
+    capture.write({'type': 'finding'}, 2.0, 'not one line\n')
+    capture.close()
+    with open(capture.files[0]) as f:
+        lines = f.read().splitlines()
+    assert lines[0] == '{"receivedAt":1.0,"message":' + frame + '}'
+    assert json.loads(lines[1])['message'] == {'type': 'finding'}
+
+
+def test_rotates_at_max_bytes(tmp_path):
+    capture = EventCapture(str(tmp_path / 'cap'), 'none', max_bytes=200)
+    for i in range(20):
+        capture.write({'type': 'finding', 'description': 'x' * 40, 'seq': i}, float(i))
+    capture.close()
+    assert len(capture.files) > 1
+    assert all(os.path.getsize(path) <= 200 for path in capture.files)
+    assert [m['seq'] for m in read_messages(capture)] == list(range(20))
+
+
+def test_truncated_plain_file_stops_at_last_complete_line(tmp_path):
+    path = tmp_path / 'cap-0001.jsonl'
+    path.write_text('{"receivedAt": 1, "message": {"seq": 1}}\n{"receivedAt": 2, "message": {"se')
+    assert [r['message']['seq'] for r in iter_capture([str(path)])] == [1]
+
+
+def test_truncated_gzip_file_keeps_flushed_events(tmp_path):
+    capture = EventCapture(str(tmp_path / 'cap'), 'gzip', flush_interval=0)
+    for i in range(10):
+        capture.write({'seq': i}, float(i))
+    path = capture.files[0]
+    with open(path, 'rb') as f:
+        data = f.read()
+    # No gzip trailer, as after a crash; the last record is cut off too
+    (tmp_path / 'cut.jsonl.gz').write_bytes(data[:-3])
+    records = list(iter_capture([str(tmp_path / 'cut.jsonl.gz')]))
+    assert [r['message']['seq'] for r in records] == list(range(len(records)))
+    assert len(records) >= 9
+    capture.close()
+
+
+def test_later_files_are_read_after_a_truncated_one(tmp_path):
+    first, second = tmp_path / 'cap-0001.jsonl', tmp_path / 'cap-0002.jsonl'
+    first.write_text('{"receivedAt": 1, "message": {"seq": 1}}\n{"receivedAt": 2, "mess')
+    second.write_text('{"receivedAt": 3, "message": {"seq": 3}}\n')
+    assert [r['message']['seq'] for r in iter_capture([str(first), str(second)])] == [1, 3]
+
+
+def test_flush_if_due_flushes_only_after_the_interval(tmp_path):
+    capture = EventCapture(str(tmp_path / 'cap'), 'gzip', flush_interval=10.0)
+    capture.write({'seq': 1}, 100.0)  # the first write is due straight away
+    capture.write({'seq': 2}, 101.0)
+    assert [m['seq'] for m in read_messages(capture)] == [1]
+    assert not capture.flush_if_due(105.0)
+    assert capture.flush_if_due(111.0)
+    assert [m['seq'] for m in read_messages(capture)] == [1, 2]
+    assert not capture.flush_if_due(130.0)  # nothing new since the last flush
+    capture.close()
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        EventCapture(str(tmp_path / 'cap'), 'lz4')
+
+
+def test_summary_counts_without_keeping_everything():
+    summary = EventSummary(recent=2)
+    for i in range(5):
+        summary.add({'type': 'ai:thinking', 'phase': 'analysis', 'content': f"t{i}"}, 1000.0 + i)
+    summary.add({'type': 'finding', 'severity': 'high'}, 1010.0)
+    summary.add({'type': 'test:plan', 'plan': {'steps': []}}, 1011.0)
+
+    assert summary.thoughts == 5
+    assert [e['thought'] for e in summary.recent_thought_entries()] == ['t3', 't4']
+    assert summary.findings_by_severity == {'high': 1}
+    assert summary.test_plan == {'steps': []}
+    assert summary.to_dict()['byType'] == {'ai:thinking': 5, 'finding': 1, 'test:plan': 1}
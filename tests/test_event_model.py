@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+import event_model
+from event_model import (Dispatcher, Event, EventDecoder, Finding, Thinking, benchmark, kept_after_capture,
+                         make_event, sample_messages, scan_object)
+
+TRICKY = {
+    'type': 'ai:thinking',
+    'content': 'quote " backslash \\ unicode é ' + 'x' * 50,
+    'short': 'a\\"b',
+    'esc\\"key': 1,
+    'nested': {'steps': [1, 2, {'a': None}]},
+    'flag': True,
+    'number': -1.5e3,
+    'empty': ''
+}
+
+
+@pytest.mark.parametrize('text', [
+    json.dumps(TRICKY),
+    json.dumps(TRICKY, indent=2),
+    json.dumps(TRICKY, separators=(',', ':'), ensure_ascii=False),
+    '{}',
+    ' { } '
+])
+def test_scan_object_matches_json_loads(text):
+    data = scan_object(text, lazy_chars=10)
+    event = Event(data, text)
+    assert dict(event) == json.loads(text)
+
+
+def test_scan_object_leaves_long_strings_as_spans():
+    text = json.dumps(TRICKY)
+    data = scan_object(text, lazy_chars=10)
+    assert isinstance(data['content'], tuple)
+    assert data['short'] == 'a\\"b'
+    assert data['nested'] == TRICKY['nested']
+
+
+@pytest.mark.parametrize('text', ['[1, 2]', '{"a": 1,}', '{"a": "unterminated}', '{"a": 1} extra', '{"a" 1}'])
+def test_scan_object_rejects_bad_json(text):
+    with pytest.raises(ValueError):
+        scan_object(text)
+
+
+def test_lazy_type_still_selects_the_event_class():
+    text = json.dumps({'type': 'workflow:complete', 'status': 'failed'})
+    event = EventDecoder('json', lazy_bytes=1, lazy_chars=4)(text)
+    assert type(event).__name__ == 'WorkflowComplete'
+    assert event.status == 'failed'
+
+
+def test_lazy_members_decode_on_first_read():
+    text = json.dumps({'type': 'ai:thinking', 'phase': 'analysis', 'content': 'y' * 100})
+    event = EventDecoder('json', lazy_bytes=1, lazy_chars=10)(text)
+    assert isinstance(event, Thinking)
+    assert event.lazy == 1
+    assert event.phase == 'analysis'
+    assert event.content == 'y' * 100
+    assert event.lazy == 0
+
+
+def test_release_keeps_the_frame_while_members_are_lazy():
+    text = json.dumps({'type': 'ai:thinking', 'content': 'y' * 100})
+    event = EventDecoder('json', lazy_bytes=1, lazy_chars=10)(text)
+    event.release()
+    assert event.raw is text
+    assert event.content == 'y' * 100
+    event.release()
+    assert event.raw is None
+
+    eager = EventDecoder('json', lazy_bytes=0)(text)
+    eager.release()
+    assert eager.raw is None
+    assert eager['content'] == 'y' * 100
+
+
+def test_decoder_accepts_bytes_and_rejects_non_objects():
+    decoder = EventDecoder('json')
+    assert decoder(b'{"type": "finding", "severity": "high"}').severity == 'high'
+    with pytest.raises(ValueError):
+        decoder('[1]')
+    with pytest.raises(ValueError):
+        EventDecoder('msgpack')
+
+
+def test_events_behave_like_dicts():
+    event = make_event({'type': 'finding', 'severity': 'critical', 'workflowId': 'w'})
+    assert isinstance(event, Finding)
+    assert event == {'type': 'finding', 'severity': 'critical', 'workflowId': 'w'}
+    assert event.get('missing', 'default') == 'default'
+    assert event.description == 'N/A'
+    assert make_event(event) is event
+    assert type(make_event({'type': 'something:new'})) is Event
+    assert make_event({'type': 7}).type == 7
+
+
+def test_test_plan_steps_accept_both_shapes():
+    steps = make_event({'type': 'test:plan', 'plan': {'target': 'https://a', 'steps': [{'tool': 'nmap'}]}}).steps
+    assert steps[0].tool == 'nmap' and steps[0].target == 'https://a'
+    recommendations = {'recommendations': [{'name': 'ffuf', 'description': 'Fuzz'}]}
+    step = make_event({'type': 'test:plan', 'plan': recommendations}).steps[0]
+    assert isinstance(make_event({'type': 'test:plan'}), event_model.TestPlan)
+    assert (step.tool, step.purpose, step.target) == ('ffuf', 'Fuzz', 'N/A')
+
+
+def test_dispatcher_routes_by_type():
+    seen = []
+    dispatch = Dispatcher({'finding': lambda e: seen.append('finding')}, default=lambda e: seen.append('other'))
+    dispatch.on('ai:thinking', lambda e: seen.append('thinking'))
+    for msg_type in ('finding', 'ai:thinking', 'test:start'):
+        dispatch(make_event({'type': msg_type}))
+    assert seen == ['finding', 'thinking', 'other']
+
+
+def test_benchmark_charges_events_for_the_frames_they_keep():
+    frames = sample_messages(200, payload_size=2000)
+    decoder = EventDecoder('json', lazy_bytes=0)
+    results = {r['variant']: r for r in benchmark(frames, {
+        'keeps frame': decoder,
+        'releases frame': kept_after_capture(decoder)
+    }, repeat=1)}
+    average = sum(len(frame) for frame in frames) / len(frames)
+    saved = results['keeps frame']['bytes_per_event'] - results['releases frame']['bytes_per_event']
+    assert saved > average / 2
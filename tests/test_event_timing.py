@@ -0,0 +1,44 @@
+import pytest
+
+from event_timing import EventTiming, accumulate
+
+
+def test_milestones_lag_and_gaps():
+    timing = EventTiming(test_type='quick')
+    timing.submitted(100.0)
+    timing.add({'type': 'ai:thinking', 'phase': 'analysis', 'timestamp': 101.0}, 101.5)
+    timing.add({'type': 'ai:thinking', 'phase': 'analysis', 'timestamp': 102.0}, 102.2)
+    timing.add({'type': 'test:plan', 'timestamp': 104.0}, 104.1)
+    timing.add({'type': 'test:start', 'timestamp': 105.0}, 104.9)  # monitor clock behind
+
+    assert timing.first_seen == pytest.approx({'ai:thinking': 1.5, 'test:plan': 4.1, 'test:start': 4.9})
+    assert timing.skewed == 1
+    assert timing.stage == 'testing'
+
+    view = timing.recorder.view('scenario')
+    assert view['test:plan']['server_interval'].percentile(50) == pytest.approx(3.0, rel=0.01)
+    assert view['ai:thinking']['receive_lag'].total_count == 2
+    assert 'receive_lag' not in view['test:start']
+    assert view['analysis']['gap'].total_count == 1
+    assert view['planning']['gap'].total_count == 1  # test:plan carries no phase
+    assert view['testing']['gap'].total_count == 1
+
+
+def test_first_event_is_the_origin_without_a_submission_time():
+    timing = EventTiming(measure_lag=False)
+    timing.add({'type': 'ai:thinking', 'timestamp': '2025-01-01T00:00:00Z'}, 50.0)
+    timing.add({'type': 'workflow:complete'}, 58.0)
+    assert timing.first_seen == {'ai:thinking': 0.0, 'workflow:complete': 8.0}
+    assert 'receive_lag' not in timing.recorder.view()['all']
+
+
+def test_accumulate_merges_runs(tmp_path):
+    path = str(tmp_path / 'timing.json')
+    for received in (1.0, 2.0):
+        timing = EventTiming(measure_lag=False)
+        timing.submitted(0.0)
+        timing.add({'type': 'ai:thinking'}, received)
+        combined = accumulate(timing.recorder, path)
+    histogram = combined.view('scenario')['ai:thinking']['since_submit']
+    assert histogram.total_count == 2
+    assert histogram.percentile(100) == pytest.approx(2.0)
@@ -0,0 +1,121 @@
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+from conftest import load_script
+from embedding_cache import EmbeddingCache
+from embedding_reduce import mock_embeddings
+
+DIMENSION = 8
+
+
+def vector_for(text):
+    """What the stub embeds a text as: stable, and distinct from the mock fallback"""
+    return [float(len(text))] + [float(ord(c)) for c in text[:DIMENSION - 1].ljust(DIMENSION - 1)]
+
+
+class StubEmbeddings(BaseHTTPRequestHandler):
+    """POST /v1/embeddings in the OpenAI shape, answering items out of order"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append({'path': self.path, 'input': body['input'],
+                                     'authorization': self.headers.get('Authorization')})
+        if any('rejected' in text for text in body['input']):
+            self.send_response(400)
+            self.end_headers()
+            self.wfile.write(b'{"error": "bad input"}')
+            return
+
+        data = [{'object': 'embedding', 'index': i, 'embedding': vector_for(text)}
+                for i, text in enumerate(body['input'])]
+        random.Random(len(self.server.requests)).shuffle(data)
+        payload = json.dumps({'object': 'list', 'data': data}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubEmbeddings)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def generate(stub_server, monkeypatch):
+    # The script reads its configuration from the environment at import time
+    monkeypatch.setenv('EMBEDDING_API_URL', f"http://127.0.0.1:{stub_server.server_port}/v1/embeddings")
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    return load_script('scripts/generate-embeddings.py', 'generate_embeddings')
+
+
+def run(generate, items, **kwargs):
+    results = {}
+
+    def on_result(key, text, embedding, mocked):
+        results[key] = (list(embedding), mocked)
+
+    kwargs = dict({'concurrency': 2, 'requests_per_minute': 0, 'tokens_per_minute': 0,
+                   'dimension': DIMENSION}, **kwargs)
+    return generate.embed_items(iter(items), on_result, **kwargs), results
+
+
+def test_make_batches_respects_size_and_token_budget(generate):
+    items = [(i, 'x' * 40) for i in range(7)]  # 10 estimated tokens each
+    assert [len(b) for b in generate.make_batches(items, batch_size=3, token_budget=1000)] == [3, 3, 1]
+    assert [len(b) for b in generate.make_batches(items, batch_size=10, token_budget=25)] == [2, 2, 2, 1]
+    # A single item over the budget still gets a batch of its own
+    assert [len(b) for b in generate.make_batches([(0, 'x' * 400)], token_budget=10)] == [1]
+
+
+def test_batches_are_sent_to_the_stub_and_mapped_back_by_index(generate, stub_server):
+    items = [(f"key-{i}", f"text number {i}") for i in range(10)]
+    counts, results = run(generate, items, batch_size=4)
+
+    assert counts == {'cached': 0, 'embedded': 10, 'mocked': 0, 'batches': 3}
+    assert sorted(len(r['input']) for r in stub_server.requests) == [2, 4, 4]
+    assert all(r['path'] == '/v1/embeddings' for r in stub_server.requests)
+    assert all(r['authorization'] == 'Bearer test-key' for r in stub_server.requests)
+    assert results == {key: (vector_for(text), False) for key, text in items}
+
+
+def test_failed_batches_fall_back_to_mock_embeddings(generate, stub_server):
+    items = [('good', 'fine text'), ('bad', 'rejected text')]
+    counts, results = run(generate, items, batch_size=1)
+
+    assert counts == {'cached': 0, 'embedded': 1, 'mocked': 1, 'batches': 2}
+    assert len(stub_server.requests) == 2  # a 400 is not retried
+    assert results['good'] == (vector_for('fine text'), False)
+    embedding, mocked = results['bad']
+    assert mocked
+    assert np.allclose(embedding, mock_embeddings(['rejected text'], DIMENSION)[0])
+
+
+def test_cached_texts_skip_the_api(generate, stub_server, tmp_path):
+    cache = EmbeddingCache(str(tmp_path / 'cache.sqlite'), model='m', dimension=DIMENSION)
+    items = [(i, f"cached text {i}") for i in range(5)]
+    first, _ = run(generate, items + [('bad', 'rejected text')], batch_size=1, cache=cache)
+    requests_after_first = len(stub_server.requests)
+    second, results = run(generate, items + [('bad', 'rejected text')], batch_size=1, cache=cache)
+    cache.close()
+
+    assert first['embedded'] == 5 and first['mocked'] == 1
+    assert second == {'cached': 5, 'embedded': 0, 'mocked': 1, 'batches': 1}
+    # Only the mocked text, which is never cached, is asked for again
+    assert [r['input'] for r in stub_server.requests[requests_after_first:]] == [['rejected text']]
+    assert results[3] == (vector_for('cached text 3'), False)
@@ -0,0 +1,66 @@
+import pytest
+
+from latency_histogram import LatencyHistogram, LatencyRecorder
+
+
+def test_percentiles_stay_within_relative_error():
+    histogram = LatencyHistogram()
+    values = [i / 1000 for i in range(1, 1001)]  # 1ms .. 1s
+    for value in values:
+        histogram.record(value)
+
+    assert histogram.total_count == 1000
+    for p in (50, 90, 99, 99.9):
+        exact = values[int(-(-p * len(values) // 100)) - 1]
+        assert histogram.percentile(p) == pytest.approx(exact, rel=2 ** -7)
+    assert histogram.percentile(100) == pytest.approx(1.0)
+    assert histogram.summary()['min'] == pytest.approx(0.001)
+
+
+def test_empty_histogram_reports_zero():
+    assert LatencyHistogram().percentile(99) == 0.0
+    assert LatencyHistogram().mean == 0.0
+
+
+def test_merge_matches_recording_everything_once():
+    left, right, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i in range(500):
+        left.record(i / 1000)
+        combined.record(i / 1000)
+    for i in range(500, 2000):
+        right.record(i / 10000)
+        combined.record(i / 10000)
+
+    merged = left.merge(right)
+    assert merged.to_dict() == combined.to_dict()
+    assert merged.percentile(90) == combined.percentile(90)
+
+
+def test_merge_rejects_different_precision():
+    with pytest.raises(ValueError):
+        LatencyHistogram(bits=8).merge(LatencyHistogram(bits=6))
+
+
+def test_dict_round_trip_is_lossless():
+    histogram = LatencyHistogram()
+    for value in (0.0004, 0.02, 0.02, 1.5, 30.0):
+        histogram.record(value)
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.to_dict() == histogram.to_dict()
+    assert restored.percentile(50) == histogram.percentile(50)
+
+
+def test_recorder_views_merge_by_scenario_and_type():
+    recorder = LatencyRecorder()
+    recorder.record('Login', 'quick', {'total': 0.1, 'ttfb': 0.05})
+    recorder.record('Login', 'full', {'total': 0.3})
+    recorder.record('Search', 'quick', {'total': 0.2, 'unknown_phase': 9.0})
+
+    overall = recorder.view()['all']
+    assert overall['total'].total_count == 3
+    assert 'unknown_phase' not in overall
+    assert recorder.view('scenario')['Login']['total'].total_count == 2
+    assert recorder.view('testType')['quick']['total'].total_count == 2
+
+    restored = LatencyRecorder.from_json(recorder.to_json())
+    assert restored.view()['all']['total'].to_dict() == overall['total'].to_dict()
@@ -0,0 +1,101 @@
+import argparse
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from load_generator import (LoadGenerator, LoadProfile, ScenarioMix, build_mix, find_saturation, positive_rate,
+                            positive_users, timeline)
+
+
+def scenario(name, test_type='quick', weight=1):
+    return {'scenario': name, 'input': {'testType': test_type}, 'weight': weight}
+
+
+def test_profile_stages():
+    profile = LoadProfile(10, ramp_up=2, hold=4, ramp_down=2)
+    assert profile.duration == 8
+    assert [profile.level_at(t) for t in (-1, 0, 1, 3, 6, 7, 8)] == [0, 0, 5, 10, 10, 5, 0]
+
+
+def test_mix_follows_weights_and_seed():
+    mix = ScenarioMix([scenario('a', weight=3), scenario('b')], seed=1)
+    counts = Counter(mix.pick()['scenario'] for _ in range(4000))
+    assert counts['a'] / 4000 == pytest.approx(0.75, abs=0.03)
+    first, second = (ScenarioMix([scenario('a', weight=3), scenario('b')], seed=2) for _ in range(2))
+    assert [first.pick()['scenario'] for _ in range(50)] == [second.pick()['scenario'] for _ in range(50)]
+
+
+def test_build_mix_adds_batches_and_filters():
+    inputs = {'test_scenarios': [scenario('full one', 'comprehensive'), scenario('quick one')],
+              'performance_test_batch': [{'testType': 'quick', 'description': 'batch'}],
+              'edge_cases': [scenario('edge', 'quick')]}
+    assert [s['scenario'] for s in build_mix(inputs).scenarios] == ['full one', 'quick one', 'Performance Batch 1']
+    quick = build_mix(inputs, include_edge_cases=True, quick_only=True)
+    assert [s['scenario'] for s in quick.scenarios] == ['quick one', 'Performance Batch 1', 'edge']
+    with pytest.raises(ValueError):
+        build_mix({'test_scenarios': [scenario('full', 'comprehensive')]}, quick_only=True)
+
+
+def test_open_loop_offers_the_profile_rate_and_measures_from_intended_start():
+    def submit(_):
+        time.sleep(0.01)
+        return {'success': True}
+
+    profile = LoadProfile(200, hold=1.0)
+    generator = LoadGenerator(submit, ScenarioMix([scenario('a')]), profile, workers=16, seed=5)
+    results = generator.run()
+    assert generator.offered == len(results)
+    assert 150 < len(results) < 250
+    assert all(r['response_time'] >= r['schedule_lag'] + 0.009 for r in results)
+    assert results == sorted(results, key=lambda r: r['offset'])
+
+
+def test_closed_loop_caps_concurrency_at_the_user_count():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def submit(_):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return {'success': True}
+
+    generator = LoadGenerator(submit, ScenarioMix([scenario('a')]), LoadProfile(3, hold=0.3), mode='closed')
+    results = generator.run()
+    assert peak[0] == 3
+    assert len(results) >= 30
+
+
+def test_zero_peak_offers_nothing():
+    generator = LoadGenerator(lambda _: {'success': True}, ScenarioMix([scenario('a')]), LoadProfile(0, hold=1))
+    assert list(generator._arrivals()) == []
+
+
+def test_timeline_and_saturation():
+    profile = LoadProfile(10, hold=20)
+    results = []
+    for i in range(200):
+        offset = i / 10
+        slow = offset >= 15
+        results.append({'offset': offset, 'finished': offset + (1.0 if slow else 0.1), 'success': True,
+                        'response_time': 1.0 if slow else 0.1, 'schedule_lag': 0.0})
+    windows = timeline(results, profile, window=5)
+    assert [w['requests'] for w in windows] == [50, 50, 50, 50]
+    assert windows[0]['p95'] == pytest.approx(0.1)
+    saturated = find_saturation(windows)
+    assert saturated is not None and saturated['start'] == 15
+    assert find_saturation(windows[:3]) is None
+
+
+@pytest.mark.parametrize('parse, value', [(positive_rate, '0'), (positive_rate, '-1'), (positive_users, '0')])
+def test_argument_types_reject_non_positive_levels(parse, value):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--level', type=parse)
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--level', value])
+    assert positive_rate('2.5') == 2.5 and positive_users('4') == 4
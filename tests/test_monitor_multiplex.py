@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from monitor_multiplex import MultiplexMonitor, WorkflowState, parse_attach
+from stub_backend import StubBackend
+
+
+def test_parse_attach():
+    assert parse_attach(['a,b', ' c ', 'd,,']) == ['a', 'b', 'c', 'd']
+    assert parse_attach(None) == []
+
+
+def test_state_follows_the_event_stream():
+    state = WorkflowState('w1', 'https://example.com')
+    events = [
+        {'type': 'ai:thinking', 'phase': 'recon'},
+        {'type': 'ai:classification', 'intent': 'audit'},
+        {'type': 'test:plan', 'plan': {'recommendations': [1, 2, 3]}},
+        {'type': 'test:start', 'test': 'SQL Injection'},
+        {'type': 'finding', 'severity': 'high'},
+        {'type': 'finding', 'severity': 'unheard-of'},
+        {'type': 'workflow:complete', 'status': 'failed'},
+    ]
+    for msg in events:
+        state.apply(msg)
+    assert (state.thoughts, state.phase, state.intent, state.plan_steps) == (1, 'recon', 'audit', 3)
+    assert state.current_test == 'SQL Injection'
+    assert state.findings['high'] == 1 and state.findings['info'] == 1
+    assert state.done and state.status == 'failed'
+    assert state.to_dict()['events'] == 7
+
+
+def test_dispatch_counts_unrouted_events_and_finishes_when_all_are_done():
+    async def run():
+        monitor = MultiplexMonitor('ws://stub', connections=3)
+        await monitor.attach('w1')
+        await monitor.attach('w2')
+        assert await monitor.attach('w1') is monitor.workflows['w1']
+        assert sum(len(ids) for ids in monitor._assigned.values()) == 2
+        monitor.dispatch({'type': 'finding', 'workflowId': 'stranger'})
+        monitor.dispatch({'type': 'workflow:complete', 'workflowId': 'w1'})
+        first_done = monitor._all_done.is_set()
+        monitor.mark('w2', 'rejected')
+        return monitor, first_done
+
+    monitor, first_done = asyncio.run(run())
+    assert monitor.unrouted == 1 and monitor.total_events == 2
+    assert not first_done and monitor._all_done.is_set()
+    assert monitor._slot('w1') == MultiplexMonitor('ws://stub', connections=3)._slot('w1')
+
+
+def test_monitors_stub_workflows_over_a_connection_pool(tmp_path):
+    async def run():
+        backend = StubBackend(latency=0, jitter=0, event_rate=50, findings=1, seed=8)
+        url = await backend.start()
+        try:
+            monitor = MultiplexMonitor(url.replace('http', 'ws'), connections=2)
+            for i in range(4):
+                workflow = backend._create_workflow({'target': f"https://{i}"})
+                await monitor.attach(workflow['workflowId'], workflow['target'])
+            await asyncio.wait_for(monitor.run(), 15)
+            return monitor
+        finally:
+            await backend.stop()
+
+    monitor = asyncio.run(run())
+    assert all(w.status == 'completed' and sum(w.findings.values()) == 1 for w in monitor.workflows.values())
+    assert monitor.unrouted == 0
+    with open(monitor.save_summary(str(tmp_path / 'summary.json'))) as f:
+        summary = json.load(f)
+    assert len(summary['workflows']) == 4
+    assert summary['totalEvents'] == sum(w.events for w in monitor.workflows.values())
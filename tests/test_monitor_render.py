@@ -0,0 +1,97 @@
+import asyncio
+import io
+
+import pytest
+from rich.console import Console
+
+from event_model import make_event
+from monitor_render import RenderPipeline, RenderQueue, coalesce
+
+
+def thought(i, phase='analysis'):
+    return {'type': 'ai:thinking', 'phase': phase, 'content': f"thought {i}"}
+
+
+def test_put_accepts_until_capacity():
+    queue = RenderQueue(capacity=3)
+    assert all(queue.put(thought(i)) for i in range(3))
+    assert len(queue) == 3
+    assert queue.dropped == 0
+
+
+def test_drop_policy_refuses_coalescible_overflow():
+    queue = RenderQueue(capacity=3, policy='drop')
+    for i in range(3):
+        queue.put(thought(i))
+    assert not queue.put(thought(3))
+    assert queue.dropped == 1
+    assert [m['content'] for m in queue.drain()] == ['thought 0', 'thought 1', 'thought 2']
+
+
+def test_sample_policy_keeps_one_in_n():
+    queue = RenderQueue(capacity=2, policy='sample', sample_every=3)
+    queue.put(thought(0))
+    queue.put(thought(1))
+    accepted = [queue.put(thought(i)) for i in range(2, 8)]
+    assert accepted == [False, False, True, False, False, True]
+    assert len(queue) == 2
+    assert queue.dropped == 6
+    assert [m['content'] for m in queue.drain()] == ['thought 4', 'thought 7']
+
+
+def test_important_messages_evict_coalescible_ones():
+    queue = RenderQueue(capacity=2)
+    queue.put(thought(0))
+    queue.put({'type': 'finding', 'severity': 'high'})
+    assert queue.put({'type': 'workflow:complete'})
+    assert [m['type'] for m in queue.drain()] == ['finding', 'workflow:complete']
+    assert queue.dropped == 1
+
+
+def test_hard_limit_bounds_important_messages():
+    queue = RenderQueue(capacity=2)
+    for i in range(10):
+        assert queue.put({'type': 'finding', 'id': i})
+    assert len(queue) == 4
+    assert queue.drain()[0]['id'] == 6
+    assert queue.high_water == 4
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        RenderQueue(policy='block')
+
+
+def test_coalesce_merges_runs_in_the_same_phase():
+    batch = [thought(0), thought(1), thought(2, 'planning'), {'type': 'test:start', 'test': 'nmap'},
+             {'type': 'test:start', 'test': 'ffuf'}, {'type': 'finding'}]
+    merged = coalesce(batch)
+    assert [m['type'] for m in merged] == ['ai:thinking', 'ai:thinking', 'test:start', 'finding']
+    assert merged[0]['content'] == 'thought 1' and merged[0]['_coalesced'] == 2
+    assert merged[2]['test'] == 'ffuf' and merged[2]['_coalesced'] == 2
+    assert '_coalesced' not in merged[1]
+
+
+def test_coalesce_keeps_typed_events_typed():
+    merged = coalesce([make_event(thought(0)), make_event(thought(1))])
+    assert len(merged) == 1
+    assert type(merged[0]).__name__ == 'Thinking'
+    assert merged[0].repeated == 2
+
+
+def test_pipeline_renders_everything_queued_on_close():
+    rendered = []
+
+    async def run():
+        pipeline = RenderPipeline(rendered.append, lambda: '', Console(file=io.StringIO()), fps=100)
+        pipeline.start()
+        for i in range(5):
+            pipeline.submit(thought(i))
+        pipeline.submit({'type': 'workflow:complete'})
+        await pipeline.close()
+        return pipeline.stats()
+
+    stats = asyncio.run(run())
+    assert rendered[-1]['type'] == 'workflow:complete'
+    assert stats['received'] == 6
+    assert stats['rendered'] + stats['coalesced'] == 6
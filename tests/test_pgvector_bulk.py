@@ -0,0 +1,33 @@
+import io
+
+from pgvector_bulk import array_literal, attack_row, control_row, copy_escape, split_pattern_text, \
+    write_sql_script
+
+
+def test_escaping():
+    assert copy_escape('a\tb\nc\\d\r') == 'a\\tb\\nc\\\\d\\r'
+    assert array_literal(['CC6.1', 'say "hi"']) == '{"CC6.1","say \\"hi\\""}'
+    assert split_pattern_text('SQL Injection: tampering with queries') == ('SQL Injection',
+                                                                           'tampering with queries')
+    assert split_pattern_text('no separator') == ('no separator', 'no separator')
+
+
+def test_rows():
+    attack = {'section': 'attack_patterns', 'key': 'A1', 'text': 'XSS: script\tinjection',
+              'embedding': [0.5, -1.0], 'metadata': {'tsc': ['CC6'], 'requires_auth': True}}
+    assert attack_row(attack).split('\t') == ['A1', 'XSS', 'script\\tinjection', 'XSS', '[0.5,-1.0]',
+                                              '{"CC6"}', '{}', 't', 'f\n']
+    control = {'section': 'tsc_descriptions', 'key': 'CC6', 'text': 'Logical access', 'embedding': [1.0]}
+    assert control_row(control) == 'tsc\tCC6\tLogical access\t[1.0]\n'
+
+
+def test_script_wraps_copy_blocks_in_one_transaction():
+    out = io.StringIO()
+    attacks = [{'section': 'attack_patterns', 'key': f"A{i}", 'text': 'X: y', 'embedding': [0.0]}
+               for i in range(3)]
+    controls = [{'section': 'cc_descriptions', 'key': 'CC1', 'text': 'z', 'embedding': [1.0]}]
+    assert write_sql_script(out, iter(attacks), iter(controls), 'now') == (3, 1)
+    script = out.getvalue()
+    assert script.index('BEGIN;') < script.index('COPY attack_patterns_staging') < script.index('COMMIT;')
+    assert script.count('\\.\n') == 2
+    assert 'cc\tCC1\tz\t[1.0]\n' in script
@@ -0,0 +1,35 @@
+import requests
+
+from request_timing import mount_timed_adapter
+from stub_backend import StubBackend
+
+
+def test_timings_split_new_and_reused_connections():
+    backend = StubBackend(latency=0, jitter=0, seed=1)
+    url = backend.start_in_thread()
+    try:
+        with requests.Session() as session:
+            mount_timed_adapter(session, pool_size=1)
+            first = session.get(url + '/api/queue/metrics')
+            second = session.get(url + '/api/queue/metrics')
+            streamed = session.get(url + '/api/queue/metrics', stream=True)
+            streamed.close()
+    finally:
+        backend.stop_thread()
+
+    assert first.ok and second.ok
+    assert set(first.timings) == {'dns', 'connect', 'ttfb', 'total'}
+    assert 0 <= first.timings['dns'] <= first.timings['connect'] <= first.timings['ttfb'] <= first.timings['total']
+    # Keep-alive: the second request reuses the pooled connection
+    assert set(second.timings) == {'ttfb', 'total'}
+    assert set(streamed.timings) == {'ttfb', 'total'}
+
+
+def test_plain_adapters_are_untouched():
+    backend = StubBackend(latency=0, jitter=0, seed=1)
+    url = backend.start_in_thread()
+    try:
+        response = requests.get(url + '/api/queue/metrics')
+    finally:
+        backend.stop_thread()
+    assert not hasattr(response, 'timings')
@@ -0,0 +1,147 @@
+import csv
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from soak_test import COLUMNS, SoakSampler, evaluate, linear_fit, mann_kendall
+from stub_backend import StubBackend
+
+
+def samples(rss, interval=60.0, requests_made=100, errors=0):
+    return [{'elapsed_s': i * interval, 'requests': requests_made, 'errors': errors, 'rss_mb': value,
+             'queue_depth': i % 3, 'p95_ms': 50.0 + i % 2} for i, value in enumerate(rss)]
+
+
+class Unauthorized(BaseHTTPRequestHandler):
+    """A metrics endpoint behind JWT-only auth, as seen by a client without a token"""
+
+    def do_GET(self):
+        self.server.headers_seen.append(dict(self.headers))
+        body = json.dumps({'error': 'Authentication required'}).encode()
+        self.send_response(401)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_mann_kendall_detects_monotonic_growth_only():
+    _, growing = mann_kendall([float(i) for i in range(20)])
+    _, flat = mann_kendall([5.0] * 20)
+    _, falling = mann_kendall([float(-i) for i in range(20)])
+    assert growing < 1e-6
+    assert flat == 1.0 and falling == 1.0
+    assert mann_kendall([1.0, 2.0]) == (0.0, 1.0)
+
+
+def test_a_single_spike_is_not_a_trend():
+    values = [100.0] * 30
+    values[25] = 400.0
+    _, p_value = mann_kendall(values)
+    assert p_value > 0.05
+
+
+def test_linear_fit():
+    assert linear_fit([0, 1, 2, 3], [1, 3, 5, 7]) == pytest.approx((2.0, 1.0))
+    assert linear_fit([1, 1], [2, 4]) == (0.0, 3.0)
+
+
+def test_leak_fails_and_noise_passes():
+    rng = random.Random(1)
+    leak = evaluate(samples([200 + i * 2 + rng.uniform(-1, 1) for i in range(60)]), warmup=0)
+    noise = evaluate(samples([200 + rng.uniform(-5, 5) for _ in range(60)]), warmup=0)
+    assert leak['verdict'] == 'fail'
+    assert leak['trends']['rss_mb']['status'] == 'growing'
+    assert 'backend RSS grew' in leak['reasons'][0]
+    assert noise['verdict'] == 'pass'
+    assert 'heap_mb' not in noise['trends']  # optional and never reported
+
+
+def test_missing_series_and_failed_scrapes_are_inconclusive():
+    rows = samples([200.0] * 20)
+    assert evaluate(rows, warmup=0, scrape_errors=2)['verdict'] == 'inconclusive'
+    for row in rows:
+        del row['rss_mb'], row['queue_depth']
+    verdict = evaluate(rows, warmup=0)
+    assert verdict['verdict'] == 'inconclusive'
+    assert verdict['trends']['rss_mb']['status'] == 'missing'
+    assert verdict['reasons'] == ['backend RSS was never reported', 'queue depth was never reported']
+    # A real failure still wins over missing data
+    assert evaluate(samples([1.0] * 20, errors=50), warmup=0, scrape_errors=1)['verdict'] == 'fail'
+
+
+def test_warmup_growth_is_ignored():
+    rss = [50 + i * 20 for i in range(10)] + [250.0] * 40
+    assert evaluate(samples(rss), warmup=600)['verdict'] == 'pass'
+    assert evaluate(samples(rss), warmup=0)['trends']['rss_mb']['pValue'] < 0.01
+
+
+def test_too_few_samples_are_inconclusive_and_errors_fail():
+    assert evaluate(samples([1.0, 2.0, 3.0]), warmup=0)['verdict'] == 'inconclusive'
+    verdict = evaluate(samples([1.0, 2.0, 3.0], errors=10), warmup=0)
+    assert verdict['trends']['rss_mb']['status'] == 'inconclusive'
+    assert verdict['verdict'] == 'fail'
+    assert 'error rate' in verdict['reasons'][0]
+    assert evaluate(samples([1.0] * 10, requests_made=0), warmup=0)['reasons'] == ['no submissions completed']
+
+
+def test_sampler_scrapes_the_stub_backend(tmp_path):
+    backend = StubBackend(seed=1)
+    url = backend.start_in_thread()
+    sampler = SoakSampler(url + '/api', str(tmp_path / 'soak.csv'), interval=0.1)
+    try:
+        sampler.start()
+        for i in range(20):
+            sampler.record({'latency': 0.01 * (i + 1), 'success': i % 10 != 0})
+        time.sleep(0.25)
+    finally:
+        sampler.stop()
+        backend.stop_thread()
+
+    with open(tmp_path / 'soak.csv') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(sampler.samples) >= 2
+    assert tuple(rows[0]) == COLUMNS
+    assert sum(int(row['requests']) for row in rows) == 20
+    assert sum(int(row['errors']) for row in rows) == 2
+    assert all(float(row['rss_mb']) > 0 for row in rows)
+    assert sampler.scrape_errors == 0
+
+
+def test_sampler_counts_rejected_scrapes(tmp_path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Unauthorized)
+    server.headers_seen = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    sampler = SoakSampler(f"http://127.0.0.1:{server.server_port}/api", str(tmp_path / 'soak.csv'),
+                          interval=0.05, headers={'X-API-Key': 'key'})
+    try:
+        sampler.start()
+        for _ in range(10):
+            sampler.record({'latency': 0.01, 'success': True})
+        time.sleep(0.2)
+        sampler.stop()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert sampler.scrape_errors == len(sampler.samples) >= 2
+    assert all(h.get('X-API-Key') == 'key' for h in server.headers_seen)
+    assert not any('rss_mb' in row for row in sampler.samples)
+    verdict = evaluate(sampler.samples, warmup=0, scrape_errors=sampler.scrape_errors)
+    assert verdict['verdict'] == 'inconclusive'
+    assert verdict['reasons'][0] == f"{sampler.scrape_errors} of {len(sampler.samples)} metrics scrapes failed"
+
+
+def test_sampler_survives_an_unreachable_backend(tmp_path):
+    sampler = SoakSampler('http://127.0.0.1:1/api', str(tmp_path / 'soak.csv'), interval=60)
+    sampler.start()
+    sampler.stop()
+    assert sampler.scrape_errors == 1
+    assert 'rss_mb' not in sampler.samples[0]
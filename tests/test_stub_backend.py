@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import aiohttp
+
+from stub_backend import StubBackend
+
+
+async def watch(session, url, workflow_id, **resume):
+    """Subscribe to one workflow and collect its events until workflow:complete"""
+    events = []
+    async with session.ws_connect(url.replace('http', 'ws') + '/ws') as ws:
+        await ws.send_str(json.dumps(dict({'type': 'subscribe', 'workflowId': workflow_id}, **resume)))
+        async for message in ws:
+            msg = json.loads(message.data)
+            if msg['type'] == 'subscribed':
+                continue
+            events.append(msg)
+            if msg['type'] == 'workflow:complete':
+                return events
+
+
+def test_submission_status_and_events():
+    async def run():
+        backend = StubBackend(latency=0, jitter=0, event_rate=0, findings=3, seed=1)
+        url = await backend.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url + '/api/run-soc2-workflow', json={'target': 'https://a'}) as response:
+                    assert response.status == 202
+                    workflow_id = (await response.json())['workflowId']
+                async with session.post(url + '/api/workflows/run', json={}) as response:
+                    assert response.status == 400
+                events = await watch(session, url, workflow_id)
+                async with session.get(f"{url}/api/workflows/{workflow_id}/status") as response:
+                    status = await response.json()
+                async with session.get(url + '/api/queue/metrics') as response:
+                    metrics = await response.json()
+            return events, status, metrics, backend.stats
+        finally:
+            await backend.stop()
+
+    events, status, metrics, stats = asyncio.run(run())
+    assert [e['seq'] for e in events] == list(range(1, len(events) + 1))
+    assert events[0]['type'] == 'ai:thinking'
+    assert sum(1 for e in events if e['type'] == 'finding') == 3
+    assert status['status'] == 'completed' and status['results']['totalFindings'] == 3
+    assert metrics['queue']['completed'] == 1
+    assert stats['submissions'] == 2 and stats['rejected'] == 1
+
+
+def test_late_subscriber_resumes_after_last_seq():
+    async def run():
+        backend = StubBackend(latency=0, jitter=0, event_rate=0, seed=2)
+        url = await backend.start()
+        try:
+            workflow = backend._create_workflow({'target': 'https://a'})
+            async with aiohttp.ClientSession() as session:
+                everything = await watch(session, url, workflow['workflowId'])
+                rest = await watch(session, url, workflow['workflowId'], lastSeq=3)
+            return everything, rest
+        finally:
+            await backend.stop()
+
+    everything, rest = asyncio.run(run())
+    assert rest == everything[3:]
+
+
+def test_failure_injection_is_seeded():
+    async def submit_all(seed):
+        backend = StubBackend(latency=0, jitter=0, failure_rate=0.5, event_rate=0, seed=seed)
+        url = await backend.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                codes = []
+                for _ in range(20):
+                    async with session.post(url + '/api/workflows/run', json={'target': 'https://a'}) as response:
+                        codes.append(response.status)
+            return codes
+        finally:
+            await backend.stop()
+
+    first, second = asyncio.run(submit_all(7)), asyncio.run(submit_all(7))
+    assert first == second
+    assert set(first) == {202, 500}
+
+
+def test_finished_workflows_are_evicted_after_retain():
+    async def run():
+        backend = StubBackend(latency=0, jitter=0, event_rate=0, retain=0.05, seed=4)
+        await backend.start()
+        try:
+            for _ in range(20):
+                backend._create_workflow({'target': 'https://a'})
+            await asyncio.sleep(0.01)
+            finished = len(backend.workflows)
+            await asyncio.sleep(0.2)
+            return finished, len(backend.workflows), backend.stats['evicted']
+        finally:
+            await backend.stop()
+
+    assert asyncio.run(run()) == (20, 0, 20)
+
+
+def test_replay_mode_plays_the_recording_for_any_subscriber():
+    recording = [(0.0, {'type': 'ai:thinking', 'content': 'recorded'}),
+                 (0.1, {'type': 'workflow:complete', 'status': 'failed'})]
+
+    async def run():
+        backend = StubBackend(recording=recording, speed=0)
+        url = await backend.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                return await watch(session, url, 'never-submitted')
+        finally:
+            await backend.stop()
+
+    events = asyncio.run(run())
+    assert [(e['type'], e.get('content'), e.get('status')) for e in events] == [
+        ('ai:thinking', 'recorded', None), ('workflow:complete', None, 'failed')]
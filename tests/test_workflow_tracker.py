@@ -0,0 +1,61 @@
+import asyncio
+
+from stub_backend import StubBackend
+from workflow_tracker import TrackedWorkflow, WorkflowTracker, default_ws_url
+
+
+def test_default_ws_url():
+    assert default_ws_url('http://localhost:3000/api') == 'ws://localhost:3000/ws'
+    assert default_ws_url('https://example.com/api/') == 'wss://example.com/ws'
+
+
+def test_status_and_event_folding():
+    tracker = WorkflowTracker('http://stub/api')
+    workflow = TrackedWorkflow('w1', submitted_at=0)
+    tracker.workflows = {'w1': workflow}
+    assert tracker._apply_status(workflow, {'status': 'running', 'progress': 10})
+    assert not tracker._apply_status(workflow, {'status': 'running', 'progress': 10})
+    assert tracker._apply_status(workflow, {'status': 'running', 'progress': 10,
+                                            'results': {'findings': [{}, {}]}})
+    assert workflow.findings == 2 and workflow.first_finding is not None
+
+    tracker._apply_event({'type': 'finding', 'workflowId': 'w1'})
+    tracker._apply_event({'type': 'finding', 'workflowId': 'someone-else'})
+    assert workflow.findings == 3 and workflow.events == 1
+    tracker._apply_event({'type': 'workflow:complete', 'workflowId': 'w1', 'status': 'bogus'})
+    assert workflow.status == 'completed' and workflow.done.is_set()
+    assert workflow.to_dict()['time_to_completion'] == workflow.completion
+
+
+def track_stub(use_websocket):
+    async def run():
+        backend = StubBackend(latency=0, jitter=0, event_rate=50, findings=2, seed=6)
+        url = await backend.start()
+        try:
+            workflows = [backend._create_workflow({'target': f"https://{i}"}) for i in range(5)]
+            submissions = [(w['workflowId'], w['startTime'], 's', 'quick') for w in workflows]
+            tracker = WorkflowTracker(url + '/api', min_interval=0.05, max_interval=0.2, timeout=15,
+                                      use_websocket=use_websocket)
+            tracked = await tracker.track(submissions)
+            snapshot = await tracker.snapshot([w['workflowId'] for w in workflows] + ['unknown'])
+            return tracker, tracked, snapshot
+        finally:
+            await backend.stop()
+
+    return asyncio.run(run())
+
+
+def test_tracks_stub_workflows_over_the_websocket():
+    tracker, tracked, snapshot = track_stub(use_websocket=True)
+    assert tracker.used_websocket
+    assert len(tracked) == 5
+    assert all(w.status == 'completed' and w.findings == 2 and w.events > 0 for w in tracked)
+    assert all(w.first_finding is not None and w.completion is not None for w in tracked)
+    assert snapshot['unknown'] == {'status': None}
+    assert all(snapshot[w.workflow_id]['status'] == 'completed' for w in tracked)
+
+
+def test_tracks_stub_workflows_by_polling_alone():
+    tracker, tracked, _ = track_stub(use_websocket=False)
+    assert not tracker.used_websocket
+    assert all(w.status == 'completed' and w.events == 0 and w.polls >= 1 for w in tracked)
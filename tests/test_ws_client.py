@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from stub_backend import StubBackend
+from ws_client import ResilientWebSocket, StreamPosition
+
+
+def test_sequenced_replays_are_duplicates():
+    position = StreamPosition()
+    assert not position.is_duplicate({'seq': 1, 'timestamp': 't1'})
+    assert not position.is_duplicate({'seq': 2, 'timestamp': 't2'})
+    assert position.is_duplicate({'seq': 2, 'timestamp': 't2'})
+    assert position.is_duplicate({'seq': 1, 'timestamp': 't1'})
+    assert position.resume_fields() == {'lastSeq': 2, 'since': 't2'}
+
+
+def test_unsequenced_events_are_only_dropped_while_resuming():
+    position = StreamPosition()
+    first = {'type': 'ai:thinking', 'timestamp': '2025-01-01T00:00:01Z'}
+    second = {'type': 'finding', 'timestamp': '2025-01-01T00:00:01Z'}
+    assert not position.is_duplicate(first)
+    # Without a reconnect, identical messages are legitimate repeats
+    assert not position.is_duplicate(first)
+
+    position.resuming = True
+    assert position.is_duplicate(first)
+    assert position.is_duplicate({'type': 'old', 'timestamp': '2025-01-01T00:00:00Z'})
+    assert not position.is_duplicate(second)
+    assert not position.is_duplicate({'type': 'new', 'timestamp': '2025-01-01T00:00:02Z'})
+    assert not position.resuming
+
+
+def test_messages_without_position_pass_through():
+    position = StreamPosition()
+    assert not position.is_duplicate({'type': 'pong'})
+    assert position.resume_fields() == {}
+
+
+def test_backoff_is_capped_with_jitter():
+    client = ResilientWebSocket('ws://127.0.0.1:1/ws', min_backoff=0.5, max_backoff=4.0)
+    for attempt, ceiling in ((1, 0.5), (3, 2.0), (10, 4.0)):
+        delay = client._backoff(attempt)
+        assert ceiling / 2 <= delay <= ceiling
+
+
+def test_gives_up_after_max_attempts():
+    async def run():
+        client = ResilientWebSocket('ws://127.0.0.1:1/ws', min_backoff=0.001, max_backoff=0.001, max_attempts=2)
+        async for _ in client:
+            pass
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run())
+
+
+def test_receives_a_workflow_from_the_stub_backend():
+    async def run():
+        backend = StubBackend(latency=0, jitter=0, event_rate=0, seed=1)
+        url = await backend.start()
+        try:
+            workflow = backend._create_workflow({'target': 'https://example.com'})
+            client = ResilientWebSocket(url.replace('http', 'ws') + '/ws', [workflow['workflowId']])
+            seqs = []
+            async for msg in client:
+                if msg.get('type') == 'subscribed':
+                    continue
+                seqs.append(msg['seq'])
+                if msg['type'] == 'workflow:complete':
+                    await client.close()
+            return seqs
+        finally:
+            await backend.stop()
+
+    seqs = asyncio.run(asyncio.wait_for(run(), 10))
+    assert seqs == list(range(1, len(seqs) + 1))
+    assert len(seqs) > 3
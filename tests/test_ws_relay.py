@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import websockets
+
+from event_model import EventDecoder
+from stub_backend import StubBackend
+from ws_relay import SLOW_CONSUMER, Relay, RelayClient
+
+decode = EventDecoder('json')
+
+
+class FakeSocket:
+    """Stands in for a consumer's WebSocketResponse; a stuck one never finishes a send"""
+
+    def __init__(self, stuck=False):
+        self.stuck = stuck
+        self.closed = False
+        self.close_code = None
+        self.sent = []
+
+    async def send_str(self, data):
+        if self.stuck:
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(data))
+
+    async def close(self, code=None, message=b''):
+        self.closed = True
+        self.close_code = code
+
+
+def event(seq, workflow_id='w1', **fields):
+    return decode(json.dumps(dict({'type': 'finding', 'workflowId': workflow_id, 'seq': seq,
+                                   'timestamp': f"2025-01-01T00:00:{seq:02d}Z"}, **fields)))
+
+
+async def connect(relay, msg, stuck=False):
+    client = RelayClient(FakeSocket(stuck), relay.client_queue)
+    relay._spawn(client.drain())
+    await relay.subscribe(client, dict({'type': 'subscribe', 'workflowId': 'w1'}, **msg))
+    return client
+
+
+def test_slow_consumer_is_evicted_without_stalling_others():
+    async def run():
+        relay = Relay('ws://127.0.0.1:1/ws', client_queue=8, replay=5)
+        fast = await connect(relay, {})
+        slow = await connect(relay, {}, stuck=True)
+        for seq in range(1, 31):
+            relay.publish(event(seq))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        await relay.stop()
+        return relay, fast, slow
+
+    relay, fast, slow = asyncio.run(run())
+    assert [m.get('seq') for m in fast.ws.sent[1:]] == list(range(1, 31))
+    assert slow.evicted
+    assert slow.ws.close_code == SLOW_CONSUMER
+    assert relay.stats['evicted'] == 1
+    assert relay.topics['w1'].clients == {fast}
+
+
+def test_late_joiners_get_the_buffered_history_after_their_position():
+    async def run():
+        relay = Relay('ws://127.0.0.1:1/ws', client_queue=4, replay=5)
+        for seq in range(1, 11):
+            relay.publish(event(seq))  # nobody subscribed yet: not routed
+        await connect(relay, {})
+        for seq in range(1, 11):
+            relay.publish(event(seq))
+        from_start = await connect(relay, {})
+        resumed = await connect(relay, {'lastSeq': 8})
+        since = await connect(relay, {'since': '2025-01-01T00:00:09Z'})
+        await asyncio.sleep(0.01)
+        await relay.stop()
+        return relay, from_start, resumed, since
+
+    relay, from_start, resumed, since = asyncio.run(run())
+    assert relay.stats['unrouted'] == 10
+    assert from_start.ws.sent[0] == {'type': 'subscribed', 'workflowId': 'w1'}
+    # The backlog is larger than client_queue but replayed history is never counted against it
+    assert [m['seq'] for m in from_start.ws.sent[1:]] == [6, 7, 8, 9, 10]
+    assert not from_start.evicted
+    assert [m['seq'] for m in resumed.ws.sent[1:]] == [9, 10]
+    assert [m['seq'] for m in since.ws.sent[1:]] == [10]
+
+
+def test_history_is_forwarded_verbatim():
+    async def run():
+        relay = Relay('ws://127.0.0.1:1/ws', replay=2)
+        await connect(relay, {})
+        relay.publish(event(1, content='kept verbatim'))
+        late = await connect(relay, {})
+        await asyncio.sleep(0.01)
+        await relay.stop()
+        return late
+
+    assert asyncio.run(run()).ws.sent[1]['content'] == 'kept verbatim'
+
+
+def test_consumers_share_one_upstream_subscription():
+    async def run():
+        backend = StubBackend(latency=0, jitter=0, event_rate=20, seed=3)
+        backend_url = await backend.start()
+        relay = Relay(backend_url.replace('http', 'ws') + '/ws', replay=50)
+        relay_url = await relay.start()
+        pump = asyncio.create_task(relay.run())
+        try:
+            workflow = backend._create_workflow({'target': 'https://example.com'})
+
+            async def consume():
+                seqs = []
+                async with websockets.connect(relay_url + '/ws') as ws:
+                    await ws.send(json.dumps({'type': 'subscribe', 'workflowId': workflow['workflowId']}))
+                    async for raw in ws:
+                        msg = json.loads(raw)
+                        if msg.get('type') == 'subscribed':
+                            continue
+                        seqs.append(msg['seq'])
+                        if msg['type'] == 'workflow:complete':
+                            return seqs
+
+            results = await asyncio.wait_for(asyncio.gather(consume(), consume(), consume()), 15)
+            return results, backend.stats['ws_clients'], relay.snapshot()
+        finally:
+            pump.cancel()
+            await relay.stop()
+            await backend.stop()
+
+    results, upstream_clients, snapshot = asyncio.run(run())
+    for seqs in results:
+        assert seqs == list(range(1, len(seqs) + 1))
+    assert upstream_clients == 1
+    assert snapshot['upstream']['subscriptions'] == 1
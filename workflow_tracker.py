@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+"""
+Workflow Tracker - follows submitted workflows to completion concurrently
+Adaptive status polling, optionally driven by a WebSocket subscription, with end-to-end pipeline timings
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+TERMINAL_STATUSES = {'completed', 'complete', 'failed', 'cancelled', 'rejected', 'error', 'timeout'}
+FINDING_EVENTS = {'finding', 'realtime:finding'}
+COMPLETE_EVENTS = {'workflow:complete', 'workflow:completed'}
+
+
+def default_ws_url(api_url: str) -> str:
+    """http://host:3000/api -> ws://host:3000/ws"""
+    base = api_url.rstrip('/')
+    if base.endswith('/api'):
+        base = base[:-4]
+    return base.replace('https://', 'wss://', 1).replace('http://', 'ws://', 1) + '/ws'
+
+
+class TrackedWorkflow:
+    """State and pipeline timings for one workflow, measured from its submission"""
+
+    def __init__(self, workflow_id: str, submitted_at: float, scenario: str = '', test_type: str = ''):
+        self.workflow_id = workflow_id
+        self.submitted_at = submitted_at
+        self.scenario = scenario
+        self.test_type = test_type
+        self.status: Optional[str] = None
+        self.progress = 0
+        self.findings = 0
+        self.first_finding: Optional[float] = None
+        self.completion: Optional[float] = None
+        self.polls = 0
+        self.events = 0
+        self.interval = 0.0
+        self.done = asyncio.Event()
+
+    def _elapsed(self) -> float:
+        return time.time() - self.submitted_at
+
+    def observe_finding(self, count: int = 1) -> None:
+        if count <= 0:
+            return
+        self.findings = max(self.findings, count)
+        if self.first_finding is None:
+            self.first_finding = self._elapsed()
+
+    def observe_status(self, status: Optional[str]) -> bool:
+        """Record a status; returns True when it changed"""
+        changed = status != self.status
+        self.status = status
+        if status in TERMINAL_STATUSES and not self.done.is_set():
+            self.completion = self._elapsed()
+            self.done.set()
+        return changed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'workflowId': self.workflow_id,
+            'scenario': self.scenario,
+            'testType': self.test_type,
+            'status': self.status,
+            'progress': self.progress,
+            'findings': self.findings,
+            'time_to_first_finding': self.first_finding,
+            'time_to_completion': self.completion,
+            'polls': self.polls,
+            'events': self.events
+        }
+
+
+class WorkflowTracker:
+    """Follow many workflows at once until they reach a terminal state.
+
+    Each workflow is polled on its own schedule: the interval starts at
+    `min_interval`, grows by `backoff` while nothing changes and resets when
+    status, progress or findings move. A semaphore bounds concurrent GETs
+    across all workflows. When the WebSocket endpoint is reachable, one
+    connection subscribes to every workflow; events then drive completion and
+    first-finding times, and polling drops to `max_interval` as a safety net.
+    """
+
+    def __init__(self, api_url: str, ws_url: Optional[str] = None, concurrency: int = 20,
+                 min_interval: float = 0.5, max_interval: float = 10.0, backoff: float = 1.5,
+                 timeout: float = 600.0, use_websocket: bool = True):
+        self.api_url = api_url.rstrip('/')
+        self.ws_url = ws_url or default_ws_url(api_url)
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.use_websocket = use_websocket
+        self.websocket_connected = False
+        self.used_websocket = False
+        self.workflows: Dict[str, TrackedWorkflow] = {}
+
+    async def _fetch_status(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                            workflow: TrackedWorkflow) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            workflow.polls += 1
+            try:
+                async with session.get(f"{self.api_url}/workflows/{workflow.workflow_id}/status") as response:
+                    if response.status == 404:
+                        return {'status': None}
+                    if response.status >= 400:
+                        return None
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                return None
+
+    def _apply_status(self, workflow: TrackedWorkflow, data: Dict[str, Any]) -> bool:
+        """Fold a status payload into the workflow; returns True if anything moved"""
+        progress = data.get('progress') or 0
+        results = data.get('results') or {}
+        findings = results.get('totalFindings') or len(results.get('findings') or [])
+        moved = progress != workflow.progress or findings > workflow.findings
+        workflow.progress = progress
+        workflow.observe_finding(findings)
+        return workflow.observe_status(data.get('status')) or moved
+
+    async def _poll(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                    workflow: TrackedWorkflow) -> None:
+        workflow.interval = self.min_interval
+        while not workflow.done.is_set():
+            data = await self._fetch_status(session, semaphore, workflow)
+            if data is not None and self._apply_status(workflow, data):
+                workflow.interval = self.min_interval
+            else:
+                workflow.interval = min(self.max_interval, workflow.interval * self.backoff)
+            if workflow.done.is_set():
+                return
+
+            interval = self.max_interval if self.websocket_connected else workflow.interval
+            try:
+                # Jitter spreads polls so many workflows do not hit the API in lockstep
+                await asyncio.wait_for(workflow.done.wait(), interval * random.uniform(0.8, 1.2))
+            except asyncio.TimeoutError:
+                pass
+
+    def _apply_event(self, msg: Dict[str, Any]) -> None:
+        workflow = self.workflows.get(msg.get('workflowId') or '')
+        if workflow is None:
+            return
+        workflow.events += 1
+        msg_type = msg.get('type', '')
+        data = msg.get('data') if isinstance(msg.get('data'), dict) else {}
+
+        if msg_type in FINDING_EVENTS:
+            workflow.observe_finding(workflow.findings + 1)
+        elif msg_type in COMPLETE_EVENTS:
+            status = msg.get('status') or data.get('status')
+            workflow.observe_status(status if status in TERMINAL_STATUSES else 'completed')
+        elif msg_type == 'realtime:status':
+            workflow.observe_finding(data.get('findings') or 0)
+            if data.get('overall'):
+                workflow.observe_status(data['overall'])
+
+    async def _listen(self, session: aiohttp.ClientSession) -> None:
+        try:
+            async with session.ws_connect(self.ws_url, heartbeat=30) as ws:
+                for workflow_id in self.workflows:
+                    await ws.send_str(json.dumps({'type': 'subscribe', 'workflowId': workflow_id}))
+                self.websocket_connected = self.used_websocket = True
+                async for message in ws:
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    try:
+                        self._apply_event(json.loads(message.data))
+                    except (ValueError, AttributeError):
+                        continue
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+            pass
+        finally:
+            self.websocket_connected = False
+
+    async def track(self, submissions: Iterable[Tuple[str, float, str, str]]) -> List[TrackedWorkflow]:
+        """Follow (workflowId, submitted_at, scenario, testType) tuples until done or timed out"""
+        self.workflows = {
+            workflow_id: TrackedWorkflow(workflow_id, submitted_at, scenario, test_type)
+            for workflow_id, submitted_at, scenario, test_type in submissions
+            if workflow_id
+        }
+        if not self.workflows:
+            return []
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=30)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            listener = asyncio.create_task(self._listen(session)) if self.use_websocket else None
+            pollers = [asyncio.create_task(self._poll(session, semaphore, w)) for w in self.workflows.values()]
+            try:
+                await asyncio.wait_for(asyncio.gather(*pollers), self.timeout)
+            except asyncio.TimeoutError:
+                for poller in pollers:
+                    poller.cancel()
+            if listener:
+                listener.cancel()
+                await asyncio.gather(listener, return_exceptions=True)
+        return list(self.workflows.values())
+
+    async def snapshot(self, workflow_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Fetch the current status of every workflow once, concurrently"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=30)
+        workflows = [TrackedWorkflow(workflow_id, time.time()) for workflow_id in workflow_ids if workflow_id]
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            statuses = await asyncio.gather(*(self._fetch_status(session, semaphore, w) for w in workflows))
+        return {w.workflow_id: status for w, status in zip(workflows, statuses)}
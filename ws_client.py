@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+"""
+Resilient WebSocket client - reconnecting workflow subscriptions for the Python monitors
+Exponential backoff with jitter, resubscribe-and-resume after reconnects, ping-based liveness and bounded buffering
+"""
+
+import asyncio
+import json
+import random
+from collections.abc import Mapping
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
+
+import websockets
+
+
+class StreamPosition:
+    """Last event seen on one workflow's stream, used to resume and to drop replays.
+
+    Servers that number events (`seq`, as the stub backend does) are resumed
+    with `lastSeq` and anything at or below it is a duplicate. Otherwise the
+    `timestamp` is sent as `since`; while resuming, events older than the
+    last one seen, or equal to an event already seen at that timestamp, are
+    dropped until the stream moves past it.
+    """
+
+    def __init__(self):
+        self.seq: Optional[int] = None
+        self.timestamp: Optional[str] = None
+        self.resuming = False
+        self._at_timestamp: List[Dict[str, Any]] = []
+
+    def resume_fields(self) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {}
+        if self.seq is not None:
+            fields['lastSeq'] = self.seq
+        if self.timestamp is not None:
+            fields['since'] = self.timestamp
+        return fields
+
+    def is_duplicate(self, msg: Dict[str, Any]) -> bool:
+        """Check a message against the position, advancing the position if it is new"""
+        seq = msg.get('seq')
+        if isinstance(seq, int):
+            if self.seq is not None and seq <= self.seq:
+                return True
+            self.seq = seq
+
+        timestamp = msg.get('timestamp')
+        if not isinstance(timestamp, str):
+            return False
+        if self.timestamp is None or timestamp > self.timestamp:
+            self.timestamp = timestamp
+            self._at_timestamp = [msg]
+            self.resuming = False
+        elif timestamp == self.timestamp:
+            if not isinstance(seq, int) and self.resuming and msg in self._at_timestamp:
+                return True
+            self._at_timestamp.append(msg)
+        elif not isinstance(seq, int) and self.resuming:
+            return True
+        return False
+
+
+class ResilientWebSocket:
+    """Subscribe to workflows on `url` and iterate their events across reconnects.
+
+    A dropped connection is retried after min_backoff * 2**attempt seconds
+    (capped at max_backoff, with jitter in the upper half), and every
+    subscription is re-sent with its resume position. The attempt count
+    resets once a message arrives, and `max_attempts` consecutive failures
+    raise ConnectionError (None retries forever). Liveness relies on protocol
+    pings every `heartbeat` seconds; a pong missing for `heartbeat_timeout`
+    drops the connection and triggers a reconnect. At most `max_queue`
+    messages are buffered: a consumer that stops iterating stops socket
+    reads, and TCP flow control then slows the server, so memory stays bounded.
+    Frames are decoded with `decode` (json.loads unless, say, an
+    event_model.EventDecoder is passed); frames it rejects with ValueError,
+    or that are not objects, are skipped.
+    """
+
+    def __init__(self, url: str, workflow_ids: Iterable[str] = (), min_backoff: float = 0.5,
+                 max_backoff: float = 30.0, max_attempts: Optional[int] = None, heartbeat: float = 20.0,
+                 heartbeat_timeout: float = 20.0, max_queue: int = 64,
+                 on_connect: Optional[Callable[[int], None]] = None,
+                 on_disconnect: Optional[Callable[[int, float, Optional[BaseException]], None]] = None,
+                 decode: Callable[[Union[str, bytes]], Any] = json.loads):
+        self.url = url
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.heartbeat = heartbeat
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_queue = max_queue
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.decode = decode
+        self.positions: Dict[str, StreamPosition] = {workflow_id: StreamPosition() for workflow_id in workflow_ids}
+        self.connections = 0
+        self.duplicates = 0
+        self._ws = None
+        self._closed = False
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def subscribe(self, workflow_id: str) -> None:
+        """Follow another workflow; sent now if connected, otherwise on the next connect"""
+        if workflow_id in self.positions:
+            return
+        self.positions[workflow_id] = StreamPosition()
+        if self._ws is not None:
+            await self._send_subscribe(self._ws, workflow_id)
+
+    async def unsubscribe(self, workflow_id: str) -> None:
+        """Stop following a workflow and forget its resume position"""
+        if self.positions.pop(workflow_id, None) is None:
+            return
+        if self._ws is not None:
+            try:
+                await self._ws.send(json.dumps({'type': 'unsubscribe', 'workflowId': workflow_id}))
+            except websockets.ConnectionClosed:
+                pass  # Not resubscribed on reconnect, as it is no longer in positions
+
+    async def _send_subscribe(self, ws, workflow_id: str) -> None:
+        message = {'type': 'subscribe', 'workflowId': workflow_id}
+        message.update(self.positions[workflow_id].resume_fields())
+        await ws.send(json.dumps(message))
+
+    def _is_duplicate(self, msg: Mapping) -> bool:
+        position = self.positions.get(msg.get('workflowId') or '')
+        return position is not None and position.is_duplicate(msg)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.min_backoff * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+    async def __aiter__(self) -> AsyncIterator[Mapping]:
+        attempt = 0
+        while not self._closed:
+            error: Optional[BaseException] = None
+            try:
+                async with websockets.connect(self.url, max_size=None, max_queue=self.max_queue,
+                                              ping_interval=self.heartbeat,
+                                              ping_timeout=self.heartbeat_timeout) as ws:
+                    # Snapshot subscriptions in the same step as publishing the socket,
+                    # so a concurrent subscribe() is sent exactly once
+                    self._ws, pending = ws, list(self.positions)
+                    self.connections += 1
+                    if self.connections > 1:
+                        for position in self.positions.values():
+                            position.resuming = True
+                    for workflow_id in pending:
+                        await self._send_subscribe(ws, workflow_id)
+                    if self.on_connect:
+                        self.on_connect(self.connections)
+
+                    async for raw in ws:
+                        attempt = 0
+                        try:
+                            msg = self.decode(raw)
+                        except ValueError:
+                            continue
+                        if not isinstance(msg, Mapping):
+                            continue
+                        if self._is_duplicate(msg):
+                            self.duplicates += 1
+                            continue
+                        yield msg
+            except websockets.InvalidURI:
+                raise
+            except (websockets.WebSocketException, OSError, asyncio.TimeoutError) as e:
+                error = e
+            finally:
+                self._ws = None
+
+            if self._closed:
+                return
+            attempt += 1
+            if self.max_attempts is not None and attempt > self.max_attempts:
+                raise ConnectionError(f"Gave up on {self.url} after {self.max_attempts} attempts") from error
+            delay = self._backoff(attempt)
+            if self.on_disconnect:
+                self.on_disconnect(attempt, delay, error)
+            await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._ws is not None:
+            await self._ws.close()
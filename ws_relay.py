@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+
+"""
+WebSocket Relay - local fan-out for workflow event streams
+Holds one upstream subscription per workflow and fans events out to any number of local consumers,
+with bounded per-client queues, slow-consumer eviction and a short replay buffer for late joiners
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+from aiohttp import WSMsgType, web
+
+from event_model import DECODERS, LAZY_BYTES, Event, EventDecoder
+from ws_client import ResilientWebSocket
+
+# Upstream acknowledgements the relay answers itself rather than forwarding
+CONTROL_TYPES = {'welcome', 'subscribed', 'unsubscribed', 'pong'}
+# Close code for evicted consumers ("try again later"), so reconnecting clients back off
+SLOW_CONSUMER = 1013
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class RelayClient:
+    """One local consumer: its subscriptions and an outbox drained by its own writer task.
+
+    Live frames are refused once `limit` of them are waiting. Replayed
+    history and acknowledgements are always queued, so a late joiner is not
+    evicted for the backlog the relay itself handed it.
+    """
+
+    def __init__(self, ws: web.WebSocketResponse, limit: int):
+        self.ws = ws
+        self.limit = limit
+        self.subscriptions: Set[str] = set()
+        self.outbox: Deque[str] = deque()
+        self.backlog = 0
+        self.sent = 0
+        self.evicted = False
+        self._ready = asyncio.Event()
+
+    def offer(self, data: str) -> bool:
+        """Queue a live frame; False if the consumer is `limit` frames behind"""
+        if len(self.outbox) - self.backlog >= self.limit:
+            return False
+        self.outbox.append(data)
+        self._ready.set()
+        return True
+
+    def push(self, frames: Iterable[str]) -> None:
+        """Queue frames outside the limit (acknowledgements and replayed history)"""
+        before = len(self.outbox)
+        self.outbox.extend(frames)
+        self.backlog += len(self.outbox) - before
+        self._ready.set()
+
+    async def drain(self) -> None:
+        while not self.ws.closed:
+            await self._ready.wait()
+            self._ready.clear()
+            while self.outbox:
+                try:
+                    await self.ws.send_str(self.outbox.popleft())
+                except ConnectionResetError:
+                    return
+                self.sent += 1
+                if self.backlog:
+                    self.backlog -= 1
+
+
+class Topic:
+    """One workflow: its upstream subscription, local subscribers and most recent events"""
+
+    def __init__(self, workflow_id: str, replay: int):
+        self.workflow_id = workflow_id
+        self.clients: Set[RelayClient] = set()
+        self.recent: Deque[Event] = deque(maxlen=replay)
+        self.events = 0
+        self.idle_since: Optional[float] = None
+
+    def history(self, last_seq: Any = None, since: Any = None) -> List[str]:
+        """Buffered frames after a resume position (`lastSeq` or `since`), oldest first"""
+        frames = []
+        for event in self.recent:
+            seq, timestamp = event.seq, event.timestamp
+            if isinstance(last_seq, int) and isinstance(seq, int) and seq <= last_seq:
+                continue
+            if isinstance(since, str) and isinstance(timestamp, str) and timestamp <= since:
+                continue
+            frames.append(event.raw)
+        return frames
+
+
+class Relay:
+    """Share one upstream WebSocket between any number of local consumers.
+
+    Local clients speak the backend's protocol (subscribe, unsubscribe and
+    ping) to `/ws`. The first subscriber to a workflow opens its upstream
+    subscription on a single ResilientWebSocket, so reconnects and resume
+    positions are handled once, not per consumer; later subscribers share
+    it and first receive up to `replay` buffered events. Frames are
+    forwarded byte-for-byte, and fan-out never waits on a consumer: each
+    client has its own writer task, and one that falls `client_queue`
+    frames behind is disconnected with code 1013 instead of stalling the
+    stream or growing without bound. A workflow nobody has watched for
+    `linger` seconds is unsubscribed upstream and its buffer dropped.
+    """
+
+    def __init__(self, upstream_url: str, client_queue: int = 256, replay: int = 200, linger: float = 60.0,
+                 decoder: str = 'auto', lazy_bytes: int = LAZY_BYTES, max_reconnects: Optional[int] = None):
+        self.upstream_url = upstream_url
+        self.client_queue = client_queue
+        self.replay = replay
+        self.linger = linger
+        self.upstream = ResilientWebSocket(upstream_url, max_attempts=max_reconnects,
+                                           on_connect=self.on_connect, on_disconnect=self.on_disconnect,
+                                           decode=EventDecoder(decoder, lazy_bytes))
+        self.topics: Dict[str, Topic] = {}
+        self.clients: Set[RelayClient] = set()
+        self.stats = {'clients': 0, 'events': 0, 'delivered': 0, 'replayed': 0, 'evicted': 0, 'unrouted': 0}
+        self.app = self.create_app()
+        self.url = ''
+        self._runner: Optional[web.AppRunner] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/ws', self.websocket)
+        app.router.add_get('/relay/stats', self.relay_stats)
+        return app
+
+    def on_connect(self, connections: int) -> None:
+        if connections > 1:
+            print(f"🔄 Upstream reconnected ({connections} connections so far), subscriptions resumed")
+
+    def on_disconnect(self, attempt: int, delay: float, error: Optional[BaseException]) -> None:
+        print(f"⚠️  Upstream lost ({error or 'closed'}), retry {attempt} in {delay:.1f}s")
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def subscribe(self, client: RelayClient, msg: Dict[str, Any]) -> None:
+        workflow_id = msg['workflowId']
+        topic = self.topics.get(workflow_id)
+        if topic is None:
+            topic = self.topics[workflow_id] = Topic(workflow_id, self.replay)
+        # Acknowledge, replay and join in one step, so no event is missed or sent twice
+        history = topic.history(msg.get('lastSeq'), msg.get('since'))
+        client.push([json.dumps({'type': 'subscribed', 'workflowId': workflow_id})] + history)
+        self.stats['replayed'] += len(history)
+        topic.clients.add(client)
+        topic.idle_since = None
+        client.subscriptions.add(workflow_id)
+        await self.upstream.subscribe(workflow_id)
+
+    def unsubscribe(self, client: RelayClient, workflow_id: str) -> None:
+        client.subscriptions.discard(workflow_id)
+        topic = self.topics.get(workflow_id)
+        if topic is not None:
+            topic.clients.discard(client)
+            if not topic.clients:
+                topic.idle_since = time.monotonic()
+
+    def publish(self, event: Event) -> None:
+        """Fan one upstream event out to the workflow's subscribers without waiting on any of them"""
+        topic = self.topics.get(event.workflow_id or '')
+        if topic is None or event.type in CONTROL_TYPES:
+            self.stats['unrouted'] += 1
+            return
+        self.stats['events'] += 1
+        topic.events += 1
+        topic.recent.append(event)
+        data = event.raw
+        for client in list(topic.clients):
+            if client.offer(data):
+                self.stats['delivered'] += 1
+            else:
+                self.evict(client)
+
+    def evict(self, client: RelayClient) -> None:
+        client.evicted = True
+        self.stats['evicted'] += 1
+        for workflow_id in list(client.subscriptions):
+            self.unsubscribe(client, workflow_id)
+        self._spawn(client.ws.close(code=SLOW_CONSUMER, message=b'Slow consumer'))
+
+    async def _pump(self) -> None:
+        async for event in self.upstream:
+            self.publish(event)
+
+    async def _reap(self) -> None:
+        """Drop workflows that have had no subscribers for `linger` seconds"""
+        while True:
+            await asyncio.sleep(max(1.0, self.linger / 4))
+            now = time.monotonic()
+            for workflow_id, topic in list(self.topics.items()):
+                if topic.idle_since is not None and now - topic.idle_since >= self.linger:
+                    del self.topics[workflow_id]
+                    await self.upstream.unsubscribe(workflow_id)
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        client = RelayClient(ws, self.client_queue)
+        self.clients.add(client)
+        self.stats['clients'] += 1
+        writer = self._spawn(client.drain())
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    break
+                try:
+                    msg = json.loads(message.data)
+                except ValueError:
+                    client.push([json.dumps({'type': 'error', 'error': 'Invalid message format'})])
+                    continue
+                if not isinstance(msg, dict) or client.evicted:
+                    continue
+                workflow_id = msg.get('workflowId')
+
+                if msg.get('type') == 'subscribe' and workflow_id:
+                    await self.subscribe(client, msg)
+                elif msg.get('type') == 'unsubscribe' and workflow_id:
+                    self.unsubscribe(client, workflow_id)
+                    client.push([json.dumps({'type': 'unsubscribed', 'workflowId': workflow_id})])
+                elif msg.get('type') == 'ping':
+                    client.push([json.dumps({'type': 'pong', 'timestamp': _timestamp()})])
+                elif msg.get('type') in ('subscribe', 'unsubscribe'):
+                    # Channel and event-type subscriptions are backend broadcasts the relay does not carry
+                    client.push([json.dumps({'type': 'error', 'error': 'The relay only forwards workflow '
+                                                                       'subscriptions; send a workflowId'})])
+                else:
+                    client.push([json.dumps({'type': 'error', 'error': f"Unknown message type: {msg.get('type')}"})])
+        finally:
+            writer.cancel()
+            for workflow_id in list(client.subscriptions):
+                self.unsubscribe(client, workflow_id)
+            self.clients.discard(client)
+        return ws
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            connected=len(self.clients),
+            upstream={'url': self.upstream_url, 'connected': self.upstream.connected,
+                      'connections': self.upstream.connections, 'subscriptions': len(self.upstream.positions)},
+            workflows={workflow_id: {'subscribers': len(topic.clients), 'events': topic.events,
+                                     'buffered': len(topic.recent)}
+                       for workflow_id, topic in self.topics.items()}
+        )
+
+    async def relay_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot())
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"ws://{host}:{port}"
+        return self.url
+
+    async def run(self) -> None:
+        """Relay until the upstream gives up (after `max_reconnects` failed attempts) or the task is cancelled"""
+        reaper = self._spawn(self._reap())
+        try:
+            await self._pump()
+        finally:
+            reaper.cancel()
+
+    async def stop(self) -> None:
+        await self.upstream.close()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._runner:
+            await self._runner.cleanup()
+
+
+async def serve_forever(relay: Relay, host: str, port: int) -> None:
+    url = await relay.start(host, port)
+    print(f"📡 Relay listening on {url}/ws for {relay.upstream_url}")
+    print(f"   Point consumers at --ws {url}   Stats: {url.replace('ws', 'http', 1)}/relay/stats")
+    try:
+        await relay.run()
+    finally:
+        await relay.stop()
+        stats = relay.stats
+        print(f"📊 {stats['events']} upstream events, {stats['delivered']} delivered, "
+              f"{stats['replayed']} replayed to {stats['clients']} clients, {stats['evicted']} evicted")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Share one backend WebSocket subscription per workflow '
+                                                 'between any number of local monitors')
+    parser.add_argument('--upstream', default='ws://localhost:8001/ws', help='Backend WebSocket URL')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--client-queue', type=int, default=256,
+                        help='Frames a consumer may fall behind before it is disconnected')
+    parser.add_argument('--replay', type=int, default=200,
+                        help='Recent events per workflow sent to late joiners')
+    parser.add_argument('--linger', type=float, default=60.0,
+                        help='Seconds to keep an unwatched workflow subscribed and buffered')
+    parser.add_argument('--decoder', choices=DECODERS, default='auto',
+                        help='JSON decoder for upstream frames; auto uses orjson when it is installed')
+    parser.add_argument('--lazy-bytes', type=int, default=LAZY_BYTES,
+                        help='Decode upstream frames at least this large lazily (0 disables)')
+    parser.add_argument('--max-reconnects', type=int,
+                        help='Give up after this many failed upstream reconnects (default: retry forever)')
+    args = parser.parse_args()
+
+    relay = Relay(args.upstream, client_queue=args.client_queue, replay=args.replay, linger=args.linger,
+                  decoder=args.decoder, lazy_bytes=args.lazy_bytes, max_reconnects=args.max_reconnects)
+    try:
+        asyncio.run(serve_forever(relay, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Relay stopped")
+    except ConnectionError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()